@@ -87,6 +87,20 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     
     return user
 
+
+def get_current_user_id(token: str = Depends(oauth2_scheme)) -> uuid.UUID:
+    """User id from a valid token without loading the user (cheap polling endpoints)."""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        return uuid.UUID(payload.get("sub"))
+    except (JWTError, TypeError, ValueError):
+        raise credentials_exception
+
 def get_user_roles(user: models.User, db: Session) -> list[str]:
     """Determine all roles for a user based on profiles and base role field"""
     roles = []
@@ -113,6 +127,22 @@ def get_user_role(user: models.User, db: Session) -> str:
     return roles[0] if roles else "unknown"
 
 
+# Accounts allowed to call operator endpoints (POST /notifications/broadcast).
+# Registration only creates passengers and drivers, so operators are configured here.
+OPERATOR_USER_IDS = frozenset(
+    user_id.strip() for user_id in os.getenv("OPERATOR_USER_IDS", "").split(",") if user_id.strip()
+)
+
+
+def require_operator(current_user: models.User = Depends(get_current_user)):
+    if str(current_user.id) not in OPERATOR_USER_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Operator access required"
+        )
+    return current_user
+
+
 def require_role(allowed_roles: list):
     def role_checker(current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
         user_roles = get_user_roles(current_user, db)
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.pool import StaticPool
 from dotenv import load_dotenv
@@ -10,18 +10,21 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL environment variable is not set")
 
-engine_kwargs = {
-    "pool_pre_ping": True,
-    "pool_recycle": 3600,
-}
-if DATABASE_URL.startswith("sqlite"):
-    engine_kwargs = {
-        "connect_args": {"check_same_thread": False},
+def engine_options(url: str) -> dict:
+    """create_engine() keyword arguments for *url* (shared with the read replicas)."""
+    if url.startswith("sqlite"):
+        options = {
+            "connect_args": {"check_same_thread": False},
+        }
+        if url.endswith(":memory:"):
+            options["poolclass"] = StaticPool
+        return options
+    return {
+        "pool_pre_ping": True,
+        "pool_recycle": 3600,
     }
-    if DATABASE_URL.endswith(":memory:"):
-        engine_kwargs["poolclass"] = StaticPool
 
-engine = create_engine(DATABASE_URL, **engine_kwargs)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -32,3 +35,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def check_database() -> None:
+    """Startup check from ``main.lifespan``: the database answers and has a schema."""
+    with SessionLocal() as db:
+        db.execute(text("SELECT 1"))
+        if not inspect(db.connection()).has_table("users"):
+            raise RuntimeError("Database schema is missing; run `python init_db.py` before starting the app")
@@ -0,0 +1,25 @@
+"""Bring the database schema up to date: ``python init_db.py``.
+
+Same as ``alembic upgrade head`` (revisions live in ``migrations/``).  The
+app does not touch the schema when it starts, so run this once per deploy
+before the workers start.  The Dockerfile and docker-compose commands
+already do.  A database built by the old ``create_all`` on import can be
+upgraded as it is.
+"""
+import os
+
+from alembic import command
+from alembic.config import Config
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+
+def main(database_url=None):
+    config = Config(ALEMBIC_INI)
+    if database_url:
+        config.attributes["database_url"] = database_url
+    command.upgrade(config, "head")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,80 +1,104 @@
 from fastapi import FastAPI, Depends, HTTPException, status, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from sqlalchemy.orm import Session
 from contextlib import asynccontextmanager
+from anyio import to_thread
 from dotenv import load_dotenv
 import asyncio
 import os
 import logging
 
-from database import engine, get_db, Base
-import models
+from database import check_database, get_db
+from utils.json_codec import FastJSONResponse
+from utils import loop_monitor, metrics, outbox, query_stats, read_replicas, unread_counts
+from utils.logging_config import AccessLogMiddleware, configure_logging
 
 load_dotenv()
 from rate_limiter import rate_limit
+from services.geofence_boundary import warm_boundary_cache
+from services import google_identity, notification_retention, ride_expiry, seat_holds
 
 from routers import auth_router, rides_router, bids_router, otp_router, websocket_router, payment_methods_router, wallet_router, websocket_trips, geofence_router, notifications_router
 
-# Configure logging to console (Render handles log capture)
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
-)
+# Configure logging to console (Render handles log capture); records are
+# written by a background thread so the event loop never blocks on stdout
+configure_logging()
 logger = logging.getLogger(__name__)
 logger.info("Logging initialized to stdout.")
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Database workers (outbox, unread counters, retention, seat holds, ride expiry) open their
+# own sessions; the test suite turns them off and drives them directly
+BACKGROUND_WORKERS = os.getenv("BACKGROUND_WORKERS_ENABLED", "1") == "1"
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Modern lifespan handler replacing deprecated on_event('startup')."""
     app.state.notification_loop = asyncio.get_running_loop()
+    # Fail fast when the database is unreachable or unmigrated (tables come from init_db.py)
+    await to_thread.run_sync(check_database)
+    # Pre-encode the geofence boundary so map loads never build GeoJSON per request
+    warm_boundary_cache()
+    # Loop lag / threadpool saturation metrics; sizes the threadpool from THREADPOOL_SIZE
+    await loop_monitor.start_monitor()
+    if BACKGROUND_WORKERS:
+        # Deliver notifications / WebSocket events committed to the outbox
+        await outbox.start_dispatcher()
+        # Periodically correct cached unread-notification counters
+        await unread_counts.start_reconciler()
+        # Purge notifications past their TTL (and roll monthly partitions if enabled)
+        await notification_retention.start_worker()
+        # Give seats from unconfirmed reservations back to their rides
+        await seat_holds.start_reaper()
+        # Cancel pending rides whose start time has passed
+        await ride_expiry.start_worker()
+    # Health-check DATABASE_REPLICA_URLS and take lagging replicas out of read rotation
+    await read_replicas.start_monitor()
+    # Keep Google's ID-token signing keys cached so logins verify locally
+    if os.getenv("GOOGLE_CLIENT_ID"):
+        await google_identity.start_refresher()
     yield
+    await google_identity.stop_refresher()
+    await read_replicas.stop_monitor()
+    await ride_expiry.stop_worker()
+    await seat_holds.stop_reaper()
+    await notification_retention.stop_worker()
+    await unread_counts.stop_reconciler()
+    await outbox.stop_dispatcher()
+    await loop_monitor.stop_monitor()
+
+
+app = FastAPI(
+    title="Commuto API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
 
-
-app = FastAPI(title="Commuto API", version="1.0.0", lifespan=lifespan)
-
-# 1. Diagnostic Error & Header Logging Middleware
+# 1. Error handling middleware (the access log below records every request once)
 @app.middleware("http")
 async def error_handling_middleware(request: Request, call_next):
-    method = request.method
-    url = str(request.url)
-    origin = request.headers.get("origin")
-    
-    # Preflight special log
-    if method == "OPTIONS":
-        logger.info(f"PREFLIGHT: OPTIONS {url} from origin {origin}")
-        
+    if request.method == "OPTIONS":
+        logger.debug("PREFLIGHT: OPTIONS %s from origin %s", request.url.path, request.headers.get("origin"))
+
     try:
-        response = await call_next(request)
-        
-        # Log outgoing CORS headers for debugging
-        if origin:
-            logger.info(f"RESPONSE: {method} {url} -> {response.status_code}")
-            logger.info(f"CORS Check: Origin={origin} Header={response.headers.get('access-control-allow-origin')}")
-            
-        return response
+        return await call_next(request)
     except HTTPException as http_exc:
-        logger.warning(f"HTTP Exception {http_exc.status_code}: {http_exc.detail}")
+        logger.warning("HTTP Exception %s: %s", http_exc.status_code, http_exc.detail)
         return JSONResponse(
             status_code=http_exc.status_code,
             content={"detail": http_exc.detail, "type": "http_error"}
         )
     except Exception as exc:
-        logger.error(f"CRITICAL: Unhandled exception during {method} {url}", exc_info=True)
+        logger.error("CRITICAL: Unhandled exception during %s %s", request.method, request.url, exc_info=True)
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={"detail": str(exc), "type": "internal_error"}
         )
 
-# 2. CORS Middleware (Outermost to wrap all responses including errors)
+# 2. CORS Middleware (wraps all responses including errors)
 # Specific origins and headers required when allow_credentials=True
 allow_origins = os.getenv(
     "CORS_ALLOW_ORIGINS",
@@ -88,8 +112,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
     allow_headers=["Authorization", "Content-Type", "Accept", "X-Requested-With"],
+    expose_headers=query_stats.RESPONSE_HEADERS,
 )
 
+# 3. Per-request SQL statement accounting and N+1 warnings (see utils.query_stats)
+query_stats.install()
+app.add_middleware(query_stats.QueryStatsMiddleware)
+
+# 4. Request latency histograms and in-flight gauge, exported at /metrics (see utils.metrics)
+app.add_middleware(metrics.MetricsMiddleware)
+
+# 5. One access log line per request with timing and CORS fields (see utils.logging_config)
+app.add_middleware(AccessLogMiddleware)
+
+# 6. Keep a user's reads on the primary for READ_YOUR_WRITES_SECONDS after they write (see utils.read_replicas)
+if read_replicas.pool.replicas:
+    app.add_middleware(read_replicas.ReadYourWritesMiddleware)
+
 @app.get("/api/debug-cors")
 def debug_cors(request: Request):
     return {
@@ -111,7 +150,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         msg = error.get("msg", "Validation error")
         detail.append(f"{loc}: {msg}")
     
-    logger.warning(f"Validation error: {detail}")
+    logger.warning("Validation error: %s", detail)
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
@@ -136,6 +175,14 @@ app.include_router(notifications_router.router)
 def root():
     return {"message": "Commuto API is running"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint(request: Request):
+    """Prometheus scrape endpoint; set METRICS_TOKEN to require a bearer token."""
+    token = os.getenv("METRICS_TOKEN")
+    if token and request.headers.get("authorization") != f"Bearer {token}":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/health")
 @rate_limit(max_requests=10, window_seconds=60)
 def health_check(request: Request, db: Session = Depends(get_db)):
@@ -145,7 +192,7 @@ def health_check(request: Request, db: Session = Depends(get_db)):
         db.execute(text("SELECT 1"))
         return {"status": "healthy", "database": "connected", "api": "active"}
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
+        logger.error("Health check failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=f"Database connection failed: {str(e)}"
@@ -153,4 +200,4 @@ def health_check(request: Request, db: Session = Depends(get_db)):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, access_log=False)
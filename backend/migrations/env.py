@@ -0,0 +1,69 @@
+"""Alembic environment: migrates DATABASE_URL against ``models`` metadata.
+
+Each revision runs in its own transaction (``transaction_per_migration``).
+On PostgreSQL every transaction starts with ``SET lock_timeout``
+(``MIGRATION_LOCK_TIMEOUT``, default 5s). A DDL statement stuck behind a
+long-running query then fails and can be retried. Without the timeout it
+would wait in the lock queue and block all the traffic queued behind it.
+Revisions use ``migrations/online.py`` for the patterns that must not lock
+a live table.
+"""
+import os
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, text
+
+from database import DATABASE_URL, Base, engine_options
+import models  # noqa: F401  (registers the tables on Base.metadata)
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+LOCK_TIMEOUT = os.getenv("MIGRATION_LOCK_TIMEOUT", "5s")
+
+
+def _url() -> str:
+    return config.attributes.get("database_url") or DATABASE_URL
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        transaction_per_migration=True,
+    )
+    if context.get_context().dialect.name == "postgresql":
+        context.execute(f"SET lock_timeout = '{LOCK_TIMEOUT}'")
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    url = _url()
+    connectable = create_engine(url, **engine_options(url))
+    with connectable.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            # Session-level, so it also covers each revision's transaction
+            connection.execute(text(f"SET lock_timeout = '{LOCK_TIMEOUT}'"))
+            connection.commit()
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            transaction_per_migration=True,
+            # Type autogenerate diffs are reliable only against PostgreSQL, the production database
+            compare_type=connection.dialect.name == "postgresql",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+    connectable.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
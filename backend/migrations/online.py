@@ -0,0 +1,152 @@
+"""
+online – migration helpers that do not lock live tables.
+
+Revisions in ``migrations/versions`` import these instead of calling the
+blocking ``op`` equivalents directly:
+
+* ``create_index_concurrently`` runs ``CREATE INDEX CONCURRENTLY IF NOT
+  EXISTS`` outside the revision's transaction.  Reads and writes continue
+  while it builds.  An INVALID index left by an interrupted build is
+  dropped first, so a rerun does not skip it.
+* ``backfill`` updates rows in batches of ``BACKFILL_BATCH_SIZE`` (default
+  1000).  Each batch commits on its own and is followed by a pause of
+  ``BACKFILL_PAUSE_MS`` (default 100).  Row locks stay short and replicas
+  keep up.
+* ``add_check_constraint`` adds the constraint ``NOT VALID`` (a brief
+  lock, no table scan), then runs ``VALIDATE CONSTRAINT`` in a separate
+  transaction.  The validation scan takes a lock that lets reads and
+  writes continue.
+* ``add_column_if_missing`` adds a column unless it already exists.  On
+  PostgreSQL 11+ a nullable column, or one with a constant default, is a
+  catalog-only change.
+
+PostgreSQL gets the non-blocking forms.  Other dialects (SQLite in
+development) get the plain equivalent.  SQLite cannot add constraints to
+an existing table, so on SQLite they only exist in tables created from
+the models.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from typing import Optional, Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+logger = logging.getLogger("alembic.online")
+
+BATCH_SIZE = int(os.getenv("BACKFILL_BATCH_SIZE", "1000"))
+PAUSE = int(os.getenv("BACKFILL_PAUSE_MS", "100")) / 1000
+
+
+def is_postgresql() -> bool:
+    return op.get_context().dialect.name == "postgresql"
+
+
+def _offline() -> bool:
+    return op.get_context().as_sql
+
+
+def add_column_if_missing(table: str, column: sa.Column) -> bool:
+    """Add *column* to *table*; ``False`` if it was already there."""
+    if not _offline() and column.name in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}:
+        return False
+    op.add_column(table, column)
+    return True
+
+
+def create_index_concurrently(
+    name: str,
+    table: str,
+    columns: Sequence[str],
+    *,
+    unique: bool = False,
+    where: Optional[str] = None,
+):
+    if not is_postgresql():
+        dialect_where = {"sqlite_where": sa.text(where)} if where else {}
+        op.create_index(name, table, list(columns), unique=unique, if_not_exists=True, **dialect_where)
+        return
+    statement = "CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns}){where}".format(
+        unique="UNIQUE " if unique else "",
+        name=name,
+        table=table,
+        columns=", ".join(columns),
+        where=f" WHERE {where}" if where else "",
+    )
+    with op.get_context().autocommit_block():
+        if not _offline():
+            _drop_invalid_index(name)
+        op.execute(statement)
+
+
+def drop_index_concurrently(name: str, table: str):
+    if not is_postgresql():
+        op.drop_index(name, table_name=table, if_exists=True)
+        return
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def _drop_invalid_index(name: str):
+    invalid = op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).scalar()
+    if invalid:
+        logger.warning("Dropping invalid index %s left by an interrupted build", name)
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def backfill(
+    table: str,
+    assignments: str,
+    where: str,
+    *,
+    key: str = "id",
+    batch_size: Optional[int] = None,
+    pause: Optional[float] = None,
+) -> int:
+    """``UPDATE table SET assignments`` in committed batches of rows matching *where*.
+
+    *where* must stop matching a row once it is updated (e.g. ``col IS
+    NULL``), or the loop never ends.  Returns the number of rows updated.
+    """
+    batch_size = batch_size or BATCH_SIZE
+    pause = PAUSE if pause is None else pause
+    statement = (
+        f"UPDATE {table} SET {assignments} WHERE {key} IN "
+        f"(SELECT {key} FROM {table} WHERE {where} LIMIT {batch_size})"
+    )
+    if _offline():
+        # --sql output cannot loop; emit one unbounded statement for review
+        op.execute(f"UPDATE {table} SET {assignments} WHERE {where}")
+        return 0
+
+    total = 0
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        while True:
+            updated = bind.execute(sa.text(statement)).rowcount
+            total += updated
+            if updated < batch_size:
+                break
+            logger.info("Backfilled %d rows of %s", total, table)
+            time.sleep(pause)
+    logger.info("Backfill of %s done: %d rows", table, total)
+    return total
+
+
+def add_check_constraint(name: str, table: str, condition: str):
+    if not is_postgresql():
+        logger.info("Skipping %s on %s: %s cannot add constraints in place", name, table, op.get_context().dialect.name)
+        return
+    with op.get_context().autocommit_block():
+        exists = not _offline() and op.get_bind().execute(sa.text(
+            "SELECT 1 FROM pg_constraint WHERE conname = :name AND conrelid = CAST(:table AS regclass)"
+        ), {"name": name, "table": table}).scalar()
+        if not exists:
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} CHECK ({condition}) NOT VALID")
+        op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
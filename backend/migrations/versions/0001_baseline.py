@@ -0,0 +1,298 @@
+"""Baseline schema: the tables create_all and the old migrate scripts built
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+Every object is created only if it does not exist yet.  A database that was
+built by ``Base.metadata.create_all`` or the old ``migrate*.py`` scripts can
+then run ``alembic upgrade head`` as it is, with no ``alembic stamp``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('users',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('phone_number', sa.String(length=20), nullable=True),
+        sa.Column('full_name', sa.String(length=255), nullable=False),
+        sa.Column('avatar_url', sa.Text(), nullable=True),
+        sa.Column('hashed_password', sa.Text(), nullable=False),
+        sa.Column('role', sa.String(length=20), nullable=False),
+        sa.Column('is_verified', sa.Boolean(), nullable=True),
+        sa.Column('is_phone_verified', sa.Boolean(), nullable=True),
+        sa.Column('profile_completed', sa.Boolean(), nullable=True),
+        sa.Column('verification_token', sa.String(length=64), nullable=True),
+        sa.Column('verification_token_expires', sa.DateTime(), nullable=True),
+        sa.Column('phone_otp', sa.String(length=6), nullable=True),
+        sa.Column('phone_otp_expires', sa.DateTime(), nullable=True),
+        sa.Column('gender', sa.String(length=20), nullable=True),
+        sa.Column('date_of_birth', sa.Date(), nullable=True),
+        sa.Column('bio', sa.Text(), nullable=True),
+        sa.Column('address', sa.Text(), nullable=True),
+        sa.Column('emergency_contact', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True, if_not_exists=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False, if_not_exists=True)
+    op.create_table('drivers',
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('license_number', sa.String(length=50), nullable=True),
+        sa.Column('license_url', sa.Text(), nullable=True),
+        sa.Column('license_photo_url', sa.Text(), nullable=True),
+        sa.Column('insurance_expiry', sa.Date(), nullable=True),
+        sa.Column('insurance_status', sa.String(length=20), nullable=True),
+        sa.Column('rating', sa.Numeric(precision=3, scale=2), nullable=True),
+        sa.Column('total_trips', sa.Integer(), nullable=True),
+        sa.Column('rating_count', sa.Integer(), nullable=True),
+        sa.Column('is_online', sa.Boolean(), nullable=True),
+        sa.Column('last_seen', sa.DateTime(), nullable=True),
+        sa.Column('max_passengers', sa.Integer(), nullable=True),
+        sa.Column('route_radius', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id'),
+        if_not_exists=True,
+    )
+    op.create_table('notifications',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=False),
+        sa.Column('link', sa.String(length=255), nullable=True),
+        sa.Column('is_read', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index(op.f('ix_notifications_id'), 'notifications', ['id'], unique=False, if_not_exists=True)
+    op.create_table('passengers',
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('preferences', sa.JSON(), nullable=True),
+        sa.Column('accessibility_needs', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id'),
+        if_not_exists=True,
+    )
+    op.create_table('payment_methods',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('type', sa.String(length=20), nullable=False),
+        sa.Column('provider', sa.String(length=50), nullable=False),
+        sa.Column('last4', sa.String(length=4), nullable=True),
+        sa.Column('is_default', sa.Boolean(), nullable=True),
+        sa.Column('razorpay_token', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index(op.f('ix_payment_methods_id'), 'payment_methods', ['id'], unique=False, if_not_exists=True)
+    op.create_table('saved_places',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=True),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('address', sa.Text(), nullable=False),
+        sa.Column('latitude', sa.Numeric(), nullable=True),
+        sa.Column('longitude', sa.Numeric(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index(op.f('ix_saved_places_id'), 'saved_places', ['id'], unique=False, if_not_exists=True)
+    op.create_table('wallets',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('balance', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id'),
+        if_not_exists=True,
+    )
+    op.create_index(op.f('ix_wallets_id'), 'wallets', ['id'], unique=False, if_not_exists=True)
+    op.create_table('transactions',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('wallet_id', sa.UUID(), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('type', sa.String(length=20), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('razorpay_order_id', sa.String(length=100), nullable=True),
+        sa.Column('razorpay_payment_id', sa.String(length=100), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['wallet_id'], ['wallets.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index(op.f('ix_transactions_id'), 'transactions', ['id'], unique=False, if_not_exists=True)
+    op.create_table('vehicles',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('driver_id', sa.UUID(), nullable=True),
+        sa.Column('make', sa.String(length=100), nullable=False),
+        sa.Column('model', sa.String(length=100), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=True),
+        sa.Column('plate_number', sa.String(length=50), nullable=False),
+        sa.Column('capacity', sa.Integer(), nullable=False),
+        sa.Column('color', sa.String(length=50), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['driver_id'], ['drivers.user_id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index(op.f('ix_vehicles_id'), 'vehicles', ['id'], unique=False, if_not_exists=True)
+    op.create_table('trips',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('driver_id', sa.UUID(), nullable=True),
+        sa.Column('vehicle_id', sa.UUID(), nullable=True),
+        sa.Column('creator_passenger_id', sa.UUID(), nullable=True),
+        sa.Column('origin_address', sa.Text(), nullable=False),
+        sa.Column('origin_lat', sa.Numeric(), nullable=False),
+        sa.Column('origin_lng', sa.Numeric(), nullable=False),
+        sa.Column('dest_address', sa.Text(), nullable=False),
+        sa.Column('dest_lat', sa.Numeric(), nullable=False),
+        sa.Column('dest_lng', sa.Numeric(), nullable=False),
+        sa.Column('start_time', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('total_price', sa.Numeric(), nullable=False),
+        sa.Column('price_per_seat', sa.Numeric(), nullable=False),
+        sa.Column('total_seats', sa.Integer(), nullable=False),
+        sa.Column('available_seats', sa.Integer(), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('start_otp', sa.String(length=6), nullable=True),
+        sa.Column('completion_otp', sa.String(length=6), nullable=True),
+        sa.Column('otp_verified', sa.Boolean(), nullable=True),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('cancelled_at', sa.DateTime(), nullable=True),
+        sa.Column('cancelled_by', sa.UUID(), nullable=True),
+        sa.Column('cancellation_reason', sa.Text(), nullable=True),
+        sa.Column('cancellation_penalty', sa.Numeric(), nullable=True),
+        sa.Column('payment_intent_id', sa.String(length=255), nullable=True),
+        sa.Column('payment_status', sa.String(length=20), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['cancelled_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['creator_passenger_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['driver_id'], ['drivers.user_id'], ),
+        sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index(op.f('ix_trips_id'), 'trips', ['id'], unique=False, if_not_exists=True)
+    op.create_table('bookings',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('trip_id', sa.UUID(), nullable=True),
+        sa.Column('passenger_id', sa.UUID(), nullable=True),
+        sa.Column('seats_booked', sa.Integer(), nullable=True),
+        sa.Column('total_price', sa.Numeric(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('payment_status', sa.String(length=20), nullable=True),
+        sa.Column('otp_verified', sa.Boolean(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['passenger_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index(op.f('ix_bookings_id'), 'bookings', ['id'], unique=False, if_not_exists=True)
+    op.create_table('live_locations',
+        sa.Column('trip_id', sa.UUID(), nullable=False),
+        sa.Column('latitude', sa.Numeric(), nullable=False),
+        sa.Column('longitude', sa.Numeric(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('trip_id'),
+        if_not_exists=True,
+    )
+    op.create_table('trip_bids',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('trip_id', sa.UUID(), nullable=True),
+        sa.Column('driver_id', sa.UUID(), nullable=True),
+        sa.Column('bid_amount', sa.Numeric(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('message', sa.String(length=500), nullable=True),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('parent_bid_id', sa.UUID(), nullable=True),
+        sa.Column('is_counter_bid', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['driver_id'], ['drivers.user_id'], ),
+        sa.ForeignKeyConstraint(['parent_bid_id'], ['trip_bids.id'], ),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index(op.f('ix_trip_bids_id'), 'trip_bids', ['id'], unique=False, if_not_exists=True)
+    op.create_table('trip_locations',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('trip_id', sa.UUID(), nullable=True),
+        sa.Column('latitude', sa.Numeric(), nullable=False),
+        sa.Column('longitude', sa.Numeric(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index(op.f('ix_trip_locations_id'), 'trip_locations', ['id'], unique=False, if_not_exists=True)
+    op.create_table('trip_passengers',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('trip_id', sa.UUID(), nullable=False),
+        sa.Column('passenger_id', sa.UUID(), nullable=False),
+        sa.Column('joined_at', sa.DateTime(), nullable=True),
+        sa.Column('seats_booked', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['passenger_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index(op.f('ix_trip_passengers_id'), 'trip_passengers', ['id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_trip_passengers_id'), table_name='trip_passengers')
+    op.drop_table('trip_passengers')
+    op.drop_index(op.f('ix_trip_locations_id'), table_name='trip_locations')
+    op.drop_table('trip_locations')
+    op.drop_index(op.f('ix_trip_bids_id'), table_name='trip_bids')
+    op.drop_table('trip_bids')
+    op.drop_table('live_locations')
+    op.drop_index(op.f('ix_bookings_id'), table_name='bookings')
+    op.drop_table('bookings')
+    op.drop_index(op.f('ix_trips_id'), table_name='trips')
+    op.drop_table('trips')
+    op.drop_index(op.f('ix_vehicles_id'), table_name='vehicles')
+    op.drop_table('vehicles')
+    op.drop_index(op.f('ix_transactions_id'), table_name='transactions')
+    op.drop_table('transactions')
+    op.drop_index(op.f('ix_wallets_id'), table_name='wallets')
+    op.drop_table('wallets')
+    op.drop_index(op.f('ix_saved_places_id'), table_name='saved_places')
+    op.drop_table('saved_places')
+    op.drop_index(op.f('ix_payment_methods_id'), table_name='payment_methods')
+    op.drop_table('payment_methods')
+    op.drop_table('passengers')
+    op.drop_index(op.f('ix_notifications_id'), table_name='notifications')
+    op.drop_table('notifications')
+    op.drop_table('drivers')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
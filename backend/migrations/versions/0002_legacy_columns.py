@@ -0,0 +1,91 @@
+"""Columns added by the old migrate scripts, with batched backfills
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+Replaces migrate.py, migrate_total_price.py, migrate_profile_completed.py,
+migrate_pg_profile_completed.py and update_db_shared_commute.py.  Each
+column is added only where it is missing.  fix_schema.py's "add whatever
+is missing" pass is now ``alembic check``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations import online
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LEGACY_COLUMNS = {
+    "users": [
+        sa.Column("gender", sa.String(length=20), nullable=True),
+        sa.Column("date_of_birth", sa.Date(), nullable=True),
+        sa.Column("bio", sa.Text(), nullable=True),
+        sa.Column("address", sa.Text(), nullable=True),
+        sa.Column("emergency_contact", sa.JSON(), nullable=True),
+        sa.Column("verification_token", sa.String(length=64), nullable=True),
+        sa.Column("verification_token_expires", sa.DateTime(), nullable=True),
+        sa.Column("phone_otp", sa.String(length=6), nullable=True),
+        sa.Column("phone_otp_expires", sa.DateTime(), nullable=True),
+    ],
+    "drivers": [
+        sa.Column("insurance_status", sa.String(length=20), nullable=True, server_default="pending"),
+        sa.Column("max_passengers", sa.Integer(), nullable=True, server_default="4"),
+        sa.Column("route_radius", sa.Integer(), nullable=True, server_default="10"),
+        sa.Column("rating_count", sa.Integer(), nullable=True, server_default="0"),
+    ],
+    "passengers": [
+        sa.Column("accessibility_needs", sa.Boolean(), nullable=True, server_default=sa.false()),
+    ],
+    "trips": [
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("completion_otp", sa.String(length=6), nullable=True),
+        sa.Column("creator_passenger_id", sa.UUID(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("available_seats", sa.Integer(), nullable=False, server_default="0"),
+    ],
+    "trip_bids": [
+        sa.Column("message", sa.String(length=500), nullable=True),
+    ],
+    "bookings": [
+        sa.Column("notes", sa.Text(), nullable=True),
+    ],
+}
+
+
+def upgrade() -> None:
+    for table, columns in LEGACY_COLUMNS.items():
+        for column in columns:
+            online.add_column_if_missing(table, column)
+    online.create_index_concurrently("ix_users_verification_token", "users", ["verification_token"])
+    # The old scripts' copy of the same index: DROP INDEX CONCURRENTLY IF EXISTS
+    online.drop_index_concurrently("idx_users_verification_token", "users")
+
+    if online.add_column_if_missing("users", sa.Column("profile_completed", sa.Boolean(), nullable=True, server_default=sa.false())):
+        # Users who had already filled in the profile fields before the flag existed
+        online.backfill(
+            "users",
+            "profile_completed = true",
+            "profile_completed = false AND gender IS NOT NULL "
+            "AND date_of_birth IS NOT NULL AND emergency_contact IS NOT NULL",
+        )
+
+    if online.add_column_if_missing("trips", sa.Column("total_price", sa.Numeric(), nullable=True)):
+        # Old rides only had a per-seat price; use it as the ride total
+        online.backfill("trips", "total_price = price_per_seat", "total_price IS NULL")
+        if online.is_postgresql():
+            # A validated CHECK lets SET NOT NULL skip its full-table scan (PostgreSQL 12+)
+            online.add_check_constraint("ck_trips_total_price_not_null", "trips", "total_price IS NOT NULL")
+            op.alter_column("trips", "total_price", nullable=False)
+            op.drop_constraint("ck_trips_total_price_not_null", "trips", type_="check")
+
+
+def downgrade() -> None:
+    # The baseline already has these columns; dropping them would lose data
+    online.drop_index_concurrently("ix_users_verification_token", "users")
@@ -0,0 +1,70 @@
+"""Outbox, seat holds and auto-accept rule tables
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+New, empty tables: their indexes are built in the same transaction.  The
+foreign keys briefly lock ``trips``/``users`` against writes; lock_timeout
+(migrations/env.py) bounds that wait.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('outbox_events',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('kind', sa.String(length=30), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('dispatched_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index('ix_outbox_events_pending', 'outbox_events', ['created_at'], unique=False, postgresql_where=sa.text('dispatched_at IS NULL'), sqlite_where=sa.text('dispatched_at IS NULL'), if_not_exists=True)
+    op.create_table('trip_auto_accept_rules',
+        sa.Column('trip_id', sa.UUID(), nullable=False),
+        sa.Column('max_price', sa.Numeric(), nullable=False),
+        sa.Column('min_rating', sa.Numeric(precision=3, scale=2), nullable=True),
+        sa.Column('deadline', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('trip_id'),
+        if_not_exists=True,
+    )
+    op.create_table('seat_holds',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('trip_id', sa.UUID(), nullable=False),
+        sa.Column('passenger_id', sa.UUID(), nullable=False),
+        sa.Column('seats', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['passenger_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index('ix_seat_holds_expiry', 'seat_holds', ['expires_at'], unique=False, postgresql_where=sa.text("status = 'held'"), if_not_exists=True)
+    op.create_index('ix_seat_holds_trip_passenger', 'seat_holds', ['trip_id', 'passenger_id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_seat_holds_trip_passenger', table_name='seat_holds')
+    op.drop_index('ix_seat_holds_expiry', table_name='seat_holds', postgresql_where=sa.text("status = 'held'"))
+    op.drop_table('seat_holds')
+    op.drop_table('trip_auto_accept_rules')
+    op.drop_index('ix_outbox_events_pending', table_name='outbox_events', postgresql_where=sa.text('dispatched_at IS NULL'), sqlite_where=sa.text('dispatched_at IS NULL'))
+    op.drop_table('outbox_events')
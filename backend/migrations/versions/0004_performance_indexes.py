@@ -0,0 +1,44 @@
+"""Performance indexes on notifications, trips and trip_bids, built concurrently
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+These tables are written on every request path.  A plain CREATE INDEX
+would block inserts and updates for the whole build.
+"""
+from typing import Sequence, Union
+
+from migrations import online
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    # Unread badge counts: small, and only holds unread rows
+    ("ix_notifications_unread_user", "notifications", ["user_id"], "is_read = false"),
+    # Newest-50 list per user
+    ("ix_notifications_user_created", "notifications", ["user_id", "created_at"], None),
+    # Retention purge by type and age
+    ("ix_notifications_type_created", "notifications", ["type", "created_at"], None),
+    # Corridor matcher (services.ride_matching)
+    ("ix_trips_status_start_time", "trips", ["status", "start_time"], None),
+    ("ix_trips_origin_lat_lng", "trips", ["origin_lat", "origin_lng"], None),
+    ("ix_trips_dest_lat_lng", "trips", ["dest_lat", "dest_lng"], None),
+    # Per-trip bid order book
+    ("ix_trip_bids_book", "trip_bids", ["trip_id", "status", "bid_amount"], None),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns, where in INDEXES:
+        online.create_index_concurrently(name, table, columns, where=where)
+
+
+def downgrade() -> None:
+    for name, table, _, _ in reversed(INDEXES):
+        online.drop_index_concurrently(name, table)
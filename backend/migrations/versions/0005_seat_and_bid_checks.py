@@ -0,0 +1,41 @@
+"""CHECK constraints on trip seats and bid amounts, added NOT VALID then validated
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+Joins, leaves and seat holds change ``available_seats`` with guarded
+UPDATEs.  These constraints make the database enforce the same rules.  If
+VALIDATE finds old rows that break a rule, the migration stops there.  The
+NOT VALID constraint still rejects new bad rows.  Fix the old rows and run
+``alembic upgrade head`` again.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from migrations import online
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHECKS = [
+    ("ck_trips_available_seats_nonnegative", "trips", "available_seats >= 0"),
+    ("ck_trip_bids_amount_positive", "trip_bids", "bid_amount > 0"),
+]
+
+
+def upgrade() -> None:
+    for name, table, condition in CHECKS:
+        online.add_check_constraint(name, table, condition)
+
+
+def downgrade() -> None:
+    if not online.is_postgresql():
+        return
+    for name, table, _ in reversed(CHECKS):
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}")
@@ -0,0 +1,49 @@
+"""One open seat hold per passenger and trip, enforced by a partial unique index
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+Concurrent reserves from one account could each insert a hold and take a
+seat.  Duplicate open holds are expired first (keeping the newest) and
+their seats are returned to the trip; the index is then built concurrently.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from migrations import online
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Open holds with a newer open hold for the same passenger and trip
+DUPLICATE = (
+    "h.status = 'held' AND EXISTS (SELECT 1 FROM seat_holds n "
+    "WHERE n.trip_id = h.trip_id AND n.passenger_id = h.passenger_id AND n.status = 'held' "
+    "AND (n.created_at > h.created_at OR (n.created_at = h.created_at AND n.id > h.id)))"
+)
+
+
+def upgrade() -> None:
+    op.execute(
+        "UPDATE trips SET available_seats = available_seats + "
+        f"(SELECT COALESCE(SUM(h.seats), 0) FROM seat_holds h WHERE h.trip_id = trips.id AND {DUPLICATE}), "
+        "version = version + 1 "
+        f"WHERE id IN (SELECT h.trip_id FROM seat_holds h WHERE {DUPLICATE})"
+    )
+    op.execute(
+        "UPDATE seat_holds SET status = 'expired' WHERE id IN "
+        f"(SELECT h.id FROM seat_holds h WHERE {DUPLICATE})"
+    )
+    online.create_index_concurrently(
+        "ix_seat_holds_one_held", "seat_holds", ["trip_id", "passenger_id"], unique=True, where="status = 'held'",
+    )
+
+
+def downgrade() -> None:
+    online.drop_index_concurrently("ix_seat_holds_one_held", "seat_holds")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Enum, Text, Numeric, Date, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Enum, Text, Numeric, Date, JSON, Index, CheckConstraint, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from database import Base
@@ -94,6 +94,81 @@ class Notification(Base):
     # Relationships
     user = relationship("User", back_populates="notifications")
 
+    __table_args__ = (
+        # Unread badge counts: small, and only holds unread rows
+        Index(
+            "ix_notifications_unread_user",
+            "user_id",
+            postgresql_where=text("is_read = false"),
+            sqlite_where=text("is_read = false"),
+        ),
+        # Newest-50 list per user; one index range scan, no sort
+        Index("ix_notifications_user_created", "user_id", "created_at"),
+        # Retention purge: expired rows of one type without a table scan
+        Index("ix_notifications_type_created", "type", "created_at"),
+    )
+
+# AutoAcceptRule Model (passenger's standing order on a trip, evaluated by
+# bids_router.place_bid against each incoming bid)
+class AutoAcceptRule(Base):
+    __tablename__ = "trip_auto_accept_rules"
+
+    trip_id = Column(UUID(as_uuid=True), ForeignKey("trips.id"), primary_key=True)
+    max_price = Column(Numeric, nullable=False)
+    min_rating = Column(Numeric(3, 2), nullable=True)
+    deadline = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+# SeatHold Model (a seat taken off trips.available_seats by POST /rides/{id}/reserve
+# until it is confirmed into a booking or released by services.seat_holds' reaper)
+class SeatHold(Base):
+    __tablename__ = "seat_holds"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)  # the hold token
+    trip_id = Column(UUID(as_uuid=True), ForeignKey("trips.id"), nullable=False)
+    passenger_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    seats = Column(Integer, default=1, nullable=False)
+    status = Column(String(20), default="held", nullable=False)  # held, confirmed, expired
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_seat_holds_trip_passenger", "trip_id", "passenger_id"),
+        # At most one open hold per passenger and trip, however many reserves race
+        Index(
+            "ix_seat_holds_one_held",
+            "trip_id",
+            "passenger_id",
+            unique=True,
+            postgresql_where=text("status = 'held'"),
+            sqlite_where=text("status = 'held'"),
+        ),
+        # Reaper scan: holds still open past their expiry
+        Index("ix_seat_holds_expiry", "expires_at", postgresql_where=text("status = 'held'")),
+    )
+
+# OutboxEvent Model (notifications / WebSocket events written in the business
+# transaction, delivered by utils.outbox.OutboxDispatcher after commit)
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String(30), nullable=False)  # notification, trip, personal, drivers
+    payload = Column(JSON, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    dispatched_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_outbox_events_pending",
+            "created_at",
+            postgresql_where=text("dispatched_at IS NULL"),
+            sqlite_where=text("dispatched_at IS NULL"),
+        ),
+    )
+
 # Driver Model
 class Driver(Base):
     __tablename__ = "drivers"
@@ -196,6 +271,15 @@ class Trip(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Endpoint/time indexes used by the corridor matcher (services.ride_matching)
+    __table_args__ = (
+        Index("ix_trips_status_start_time", "status", "start_time"),
+        Index("ix_trips_origin_lat_lng", "origin_lat", "origin_lng"),
+        Index("ix_trips_dest_lat_lng", "dest_lat", "dest_lng"),
+        # Backstop for the guarded seat UPDATEs in services.trip_seats / seat_holds
+        CheckConstraint("available_seats >= 0", name="ck_trips_available_seats_nonnegative"),
+    )
+
     # Relationships
     driver = relationship("Driver", back_populates="trips", foreign_keys=[driver_id])
     vehicle = relationship("Vehicle", back_populates="trips")
@@ -264,6 +348,12 @@ class TripBid(Base):
     driver = relationship("Driver", back_populates="bids")
     parent_bid = relationship("TripBid", remote_side=[id], backref="counter_bids")
 
+    __table_args__ = (
+        # Per-trip order book: open bids of one trip, already in price order
+        Index("ix_trip_bids_book", "trip_id", "status", "bid_amount"),
+        CheckConstraint("bid_amount > 0", name="ck_trip_bids_amount_positive"),
+    )
+
 # SavedPlace Model
 class SavedPlace(Base):
     __tablename__ = "saved_places"
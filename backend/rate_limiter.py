@@ -17,6 +17,8 @@ from fastapi import Request, HTTPException, status
 from typing import Dict, Tuple
 import threading
 
+from utils.metrics import RATE_LIMIT_REJECTIONS
+
 # In-memory rate limit storage
 # Format: {key: (count, reset_time)}
 _rate_limit_storage: Dict[str, Tuple[int, float]] = {}
@@ -93,6 +95,7 @@ def rate_limit(max_requests: int, window_seconds: int, key_suffix: str = ""):
             is_limited, remaining, reset_after = is_rate_limited(key, max_requests, window_seconds)
 
             if is_limited:
+                RATE_LIMIT_REJECTIONS.inc(key_suffix or func.__name__)
                 raise HTTPException(
                     status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                     detail=f"Rate limit exceeded. Try again in {reset_after} seconds."
@@ -120,6 +123,7 @@ def rate_limit(max_requests: int, window_seconds: int, key_suffix: str = ""):
             is_limited, remaining, reset_after = is_rate_limited(key, max_requests, window_seconds)
 
             if is_limited:
+                RATE_LIMIT_REJECTIONS.inc(key_suffix or func.__name__)
                 raise HTTPException(
                     status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                     detail=f"Rate limit exceeded. Try again in {reset_after} seconds."
@@ -18,6 +18,7 @@ from services.emailjs_service import (
     send_verification_email_via_emailjs as _send_verification_email_emailjs_bg,
 )
 from services.sms_service import twilio_is_configured, send_phone_otp as _send_phone_otp_bg
+from services import google_identity, integrations
 
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 
@@ -449,17 +450,8 @@ def google_auth(
 ):
     """Verify Google token and login/register user"""
     import time
-    import requests as py_requests
-    try:
-        from google.oauth2 import id_token
-        from google.auth.transport import requests as google_requests
-    except ModuleNotFoundError:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Google auth dependencies are not installed",
-        )
+    py_requests = integrations.load("http")
 
-    google_request_adapter = google_requests.Request()
     start_time = time.time()
     try:
         email = ""
@@ -467,12 +459,8 @@ def google_auth(
         is_new_user = False
         # Determine if token is a JWT (ID Token) or an Access Token
         if auth_data.token.startswith("eyJ"):
-            # Verify the ID token
-            idinfo = id_token.verify_oauth2_token(
-                auth_data.token, 
-                google_request_adapter, 
-                GOOGLE_CLIENT_ID
-            )
+            # Verify the ID token against the cached Google signing keys
+            idinfo = google_identity.verify_id_token(auth_data.token, GOOGLE_CLIENT_ID)
             email = idinfo['email']
             full_name = idinfo.get('name', '')
             verify_time = time.time() - start_time
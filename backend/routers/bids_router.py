@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError, DBAPIError
 from database import get_db
@@ -11,12 +12,20 @@ import concurrent.futures
 import uuid
 import random
 import logging
-from typing import List, Optional
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Literal, Optional
 from uuid import UUID
-from routers.websocket_router import notify_new_bid, notify_bid_status_update
+from routers.websocket_router import notify_bid_status_update
+from services import auto_accept, bid_book, bid_feed
 from services.wallet_service import reconcile_booking_hold
+from services.fare_service import split_fare
+from services.ride_feed import RIDE_REMOVED, publish_ride_event
 from ride_states import RIDE_STATUS_ACCEPTED, RIDE_STATUS_REQUESTED, normalize_ride_status
-from utils.notifications import create_notification
+from utils import outbox
+from websocket_manager import manager
+from utils.metrics import NOTIFICATION_DISPATCH_FAILURES
 
 router = APIRouter(prefix="/bids", tags=["Bidding"])
 logger = logging.getLogger(__name__)
@@ -26,6 +35,7 @@ def _log_ws_future(future: concurrent.futures.Future) -> None:
     try:
         future.result()
     except Exception as exc:
+        NOTIFICATION_DISPATCH_FAILURES.inc("dispatch")
         logger.warning(f"WebSocket notification failed: {exc}")
 
 
@@ -40,11 +50,35 @@ def _dispatch_websocket_notification(coro, loop: Optional[asyncio.AbstractEventL
         running_loop = asyncio.get_running_loop()
         running_loop.create_task(coro)
     except RuntimeError:
+        NOTIFICATION_DISPATCH_FAILURES.inc("no_loop")
         logger.warning("No running event loop available for websocket notification")
     except Exception as exc:
+        NOTIFICATION_DISPATCH_FAILURES.inc("dispatch")
         logger.warning(f"WebSocket notification failed: {exc}")
 
 
+def _bid_status_messages(trip_id, accepted_bid: models.TripBid, rejected_driver_ids) -> dict:
+    """``bid_status_update`` frames for every driver whose bid an acceptance settled."""
+    messages = {
+        str(driver_id): {
+            "type": "bid_status_update",
+            "data": {"trip_id": str(trip_id), "status": "rejected"},
+        }
+        for driver_id in rejected_driver_ids
+        if driver_id != accepted_bid.driver_id
+    }
+    messages[str(accepted_bid.driver_id)] = {
+        "type": "bid_status_update",
+        "data": {
+            "trip_id": str(trip_id),
+            "bid_id": str(accepted_bid.id),
+            "status": "accepted",
+            "bid_amount": float(accepted_bid.bid_amount),
+        },
+    }
+    return messages
+
+
 @router.get("/my-bids", response_model=List[trip_schemas.DriverBidWithTrip])
 @rate_limit(max_requests=30, window_seconds=60, key_suffix="my_bids")
 def get_my_bids(
@@ -110,6 +144,137 @@ def get_my_bids(
     return result
 
 
+def _new_bid_notice(placed: List[tuple]) -> tuple:
+    """Title and body of the one notification a passenger gets for *placed* ``(bid, trip)`` pairs."""
+    if len(placed) == 1:
+        bid, trip = placed[0]
+        return "New Bid Received", f"A driver has bid ₹{bid.bid_amount} on your trip to {trip.dest_address}."
+    offers = ", ".join(f"₹{bid.bid_amount} to {trip.dest_address}" for bid, trip in placed)
+    return "New Bids Received", f"A driver has bid on {len(placed)} of your trips: {offers}."
+
+
+@router.post("/batch", response_model=List[trip_schemas.BatchBidResult])
+@rate_limit(max_requests=6, window_seconds=60, key_suffix="place_bid_batch")
+def place_bids_batch(
+    request: Request,
+    batch: trip_schemas.BatchBidCreate,
+    current_user: models.User = Depends(auth.require_role(["driver"])),
+    db: Session = Depends(get_db)
+):
+    """Bid on several rides at once (e.g. every pending ride along a corridor).
+
+    All rides are validated with set-based queries and the bids are written
+    with a single INSERT; each item gets its own result, so one ride that is
+    gone or already bid on doesn't fail the rest.  Passengers get one
+    notification each, however many of their rides the batch covers.
+    """
+    driver = db.query(models.Driver).filter(models.Driver.user_id == current_user.id).first()
+    if not driver:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Driver profile not found"
+        )
+
+    ride_ids = {item.ride_id for item in batch.bids}
+    trips = {
+        trip.id: trip
+        for trip in db.query(models.Trip).filter(
+            models.Trip.id.in_(ride_ids),
+            models.Trip.status.in_(["pending", "active"])
+        )
+    }
+    own_rides = {
+        trip_id for (trip_id,) in db.query(models.Booking.trip_id).filter(
+            models.Booking.trip_id.in_(ride_ids),
+            models.Booking.passenger_id == current_user.id
+        )
+    }
+    already_bid = {
+        trip_id for (trip_id,) in db.query(models.TripBid.trip_id).filter(
+            models.TripBid.trip_id.in_(ride_ids),
+            models.TripBid.driver_id == current_user.id,
+            models.TripBid.status == "pending"
+        )
+    }
+
+    now = datetime.utcnow()
+    results: List[dict] = []
+    new_bids: List[models.TripBid] = []
+    for item in batch.bids:
+        error = None
+        if item.ride_id not in trips:
+            error = "Trip not found or no longer accepting bids"
+        elif item.ride_id in own_rides:
+            error = "Cannot bid on your own trip"
+        elif item.ride_id in already_bid:
+            error = "You already have a pending bid on this trip"
+        if error:
+            results.append({"ride_id": item.ride_id, "error": error})
+            continue
+
+        already_bid.add(item.ride_id)  # a ride repeated in the batch gets one bid
+        bid = models.TripBid(
+            id=uuid.uuid4(), trip_id=item.ride_id, driver_id=current_user.id,
+            bid_amount=Decimal(str(item.amount)), status="pending", message=item.message,
+            version=0, parent_bid_id=None, is_counter_bid=False, created_at=now, updated_at=now,
+        )
+        new_bids.append(bid)
+        results.append({"ride_id": item.ride_id, "bid": bid})
+
+    if not new_bids:
+        return results
+
+    columns = ("id", "trip_id", "driver_id", "bid_amount", "status", "message", "version",
+               "parent_bid_id", "is_counter_bid", "created_at", "updated_at")
+    try:
+        db.execute(insert(models.TripBid).values([
+            {column: getattr(bid, column) for column in columns} for bid in new_bids
+        ]))
+
+        # Auto-accept rules of the covered rides, exactly as place_bid applies them
+        rules = auto_accept.load_rules(db, [bid.trip_id for bid in new_bids])
+        acceptances = {}
+        for bid in new_bids:
+            rule = rules.get(bid.trip_id)
+            if rule and auto_accept.qualifies(rule, bid.bid_amount, driver.rating, now):
+                acceptance = _try_auto_accept(db, bid, trips[bid.trip_id])
+                if acceptance is not None:
+                    acceptances[bid.id] = acceptance
+                    bid.status = acceptance.bid.status
+
+        placed_by_passenger = {}
+        for bid in new_bids:
+            if bid.id not in acceptances:
+                trip = trips[bid.trip_id]
+                placed_by_passenger.setdefault(trip.creator_passenger_id, []).append((bid, trip))
+        for passenger_id, placed in placed_by_passenger.items():
+            title, message = _new_bid_notice(placed)
+            link = f"/passenger/trips/{placed[0][1].id}" if len(placed) == 1 else "/passenger/trips"
+            outbox.enqueue_notification(db, [passenger_id], title, message, "new_bid", link)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        logger.error(f"Integrity error placing batch bids: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Bid conflict detected. Please try again."
+        )
+
+    dispatch_loop = getattr(request.app.state, "notification_loop", None)
+    for bid in new_bids:
+        bid_book.invalidate(bid.trip_id)
+        if bid.id in acceptances:
+            _publish_acceptance(request, acceptances[bid.id])
+        else:
+            _dispatch_websocket_notification(bid_feed.publish_bid_added(bid, current_user, driver), dispatch_loop)
+
+    logger.info(
+        "Batch bids by driver %s: %d placed, %d auto-accepted, %d refused",
+        current_user.id, len(new_bids), len(acceptances), len(results) - len(new_bids),
+    )
+    return results
+
+
 @router.post("/{ride_id}", response_model=trip_schemas.BidResponse, status_code=status.HTTP_201_CREATED)
 @rate_limit(max_requests=6, window_seconds=60, key_suffix="place_bid")
 def place_bid(
@@ -179,24 +344,35 @@ def place_bid(
     
     try:
         db.add(new_bid)
+
+        # The passenger's auto-accept rule (if any) is settled in this same
+        # transaction, through the locked accept path
+        acceptance = None
+        if auto_accept.matching_rule(db, ride_id, new_bid.bid_amount, driver.rating):
+            acceptance = _try_auto_accept(db, new_bid, trip)
+
+        if acceptance is None:
+            outbox.enqueue_notification(
+                db,
+                [trip.creator_passenger_id],
+                "New Bid Received",
+                f"A driver has bid ₹{new_bid.bid_amount} on your trip to {trip.dest_address}.",
+                "new_bid",
+                f"/passenger/trips/{ride_id}"
+            )
         db.commit()
+        bid_book.invalidate(ride_id)
         db.refresh(new_bid)
 
-        if trip.creator_passenger_id:
-            dispatch_loop = getattr(request.app.state, "notification_loop", None)
+        if acceptance is not None:
+            _publish_acceptance(request, acceptance)
+            logger.info("Bid %s auto-accepted for trip %s", new_bid.id, ride_id)
+        else:
             _dispatch_websocket_notification(
-                create_notification(
-                    db,
-                    str(trip.creator_passenger_id),
-                    "New Bid Received",
-                    f"A driver has bid ₹{new_bid.bid_amount} on your trip to {trip.dest_address}.",
-                    "new_bid",
-                    f"/passenger/trips/{ride_id}"
-                ),
-                dispatch_loop,
+                bid_feed.publish_bid_added(new_bid, current_user, driver),
+                getattr(request.app.state, "notification_loop", None),
             )
-
-        logger.info(f"Bid created: {new_bid.id} by driver {current_user.id} for trip {ride_id}")
+        logger.info("Bid created: %s by driver %s for trip %s", new_bid.id, current_user.id, ride_id)
         return new_bid
     except IntegrityError as e:
         db.rollback()
@@ -207,67 +383,215 @@ def place_bid(
         )
 
 
+def _require_trip_passenger(db: Session, ride_id: UUID, current_user: models.User):
+    """One indexed booking lookup on the polling path; the trip is only loaded to tell 404 from 403."""
+    is_passenger = db.query(models.Booking.id).filter(
+        models.Booking.trip_id == ride_id,
+        models.Booking.passenger_id == current_user.id
+    ).first() is not None
+    if is_passenger:
+        return
+
+    if not db.query(models.Trip.id).filter(models.Trip.id == ride_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trip not found"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Only the trip creator can view bids"
+    )
+
+
 @router.get("/{ride_id}/all", response_model=List[trip_schemas.BidWithDriver])
 @rate_limit(max_requests=30, window_seconds=60, key_suffix="get_bids")
 def get_ride_bids(
+    request: Request,
+    ride_id: UUID,
+    order: Literal["newest", "price", "rating"] = Query(bid_book.ORDER_NEWEST, description="newest, price (cheapest first) or rating (best-rated first)"),
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the open bids for a trip from its cached order book (passenger only)"""
+    _require_trip_passenger(db, ride_id, current_user)
+
+    # Only active pending bids are listed. Older offers are marked rejected
+    # whenever either side counters, so they should not remain actionable on
+    # the passenger screen.
+    bids = bid_book.get_book(db, ride_id).ordered(order)
+    return bids[:limit] if limit else bids
+
+
+@router.get("/{ride_id}/best", response_model=Optional[trip_schemas.BidWithDriver])
+@rate_limit(max_requests=60, window_seconds=60, key_suffix="best_bid")
+def get_best_bid(
     request: Request,
     ride_id: UUID,
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all bids for a trip (passenger only)"""
+    """Top of book: the cheapest open bid on a trip, or null (passenger only)"""
+    _require_trip_passenger(db, ride_id, current_user)
+    return bid_book.get_book(db, ride_id).best
+
+
+@dataclass
+class _Acceptance:
+    trip: models.Trip
+    bid: models.TripBid
+    otp: str
+    rejected_driver_ids: List[UUID]
+
+
+def _accept_bid_locked(db: Session, bid_id: UUID, acting_user_id: UUID) -> _Acceptance:
+    """Accept a bid inside the caller's transaction: the bid and trip rows are
+    locked, every other pending bid is rejected and the bookings are repriced.
+
+    Shared by ``accept_bid`` and auto-accept in ``place_bid``; the caller
+    commits, or rolls back on the ``HTTPException``/``ValueError`` raised here.
+    """
+    # Get bid with lock to prevent concurrent modifications
+    bid = db.query(models.TripBid).filter(
+        models.TripBid.id == bid_id
+    ).with_for_update().first()
     
-    # Check trip exists
-    trip = db.query(models.Trip).filter(models.Trip.id == ride_id).first()
-    if not trip:
+    if not bid:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Trip not found"
+            detail="Bid not found"
         )
     
-    # Check if user is the passenger
-    is_passenger = db.query(models.Booking).filter(
-        models.Booking.trip_id == ride_id,
-        models.Booking.passenger_id == current_user.id
-    ).first() is not None
+    # Get trip with lock
+    trip = db.query(models.Trip).filter(
+        models.Trip.id == bid.trip_id
+    ).with_for_update().first()
     
-    if not is_passenger:
+    is_passenger_accepting_driver_bid = trip.creator_passenger_id == acting_user_id
+    is_driver_accepting_counter_bid = (
+        getattr(bid, "is_counter_bid", False)
+        and bid.driver_id == acting_user_id
+    )
+
+    if not is_passenger_accepting_driver_bid and not is_driver_accepting_counter_bid:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only the trip creator can view bids"
+            detail="Only the trip creator or target driver can accept this offer"
         )
     
-    # Get only active pending bids with driver info. Older offers are marked
-    # rejected whenever either side counters, so they should not remain
-    # actionable on the passenger screen.
-    bids = db.query(models.TripBid, models.User, models.Driver).join(
-        models.Driver, models.TripBid.driver_id == models.Driver.user_id
-    ).join(
-        models.User, models.Driver.user_id == models.User.id
-    ).filter(
-        models.TripBid.trip_id == ride_id,
-        models.TripBid.status == "pending",
-        models.TripBid.is_counter_bid == False
-    ).order_by(models.TripBid.created_at.desc()).all()
+    # Check if trip is still available
+    if normalize_ride_status(trip.status) != RIDE_STATUS_REQUESTED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This trip is no longer accepting bids"
+        )
     
-    result = []
-    for bid, user, driver in bids:
-        result.append({
-            "id": bid.id,
-            "trip_id": bid.trip_id,
-            "driver_id": bid.driver_id,
-            "bid_amount": bid.bid_amount,
-            "status": bid.status,
-            "message": bid.message,
-            "created_at": bid.created_at,
-            "driver_name": user.full_name,
-            "driver_rating": driver.rating,
-            "driver_avatar": user.avatar_url,
-            "is_counter_bid": getattr(bid, "is_counter_bid", False),
-            "parent_bid_id": getattr(bid, "parent_bid_id", None)
-        })
+    # Check if bid is still pending
+    if bid.status != "pending":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Bid is already {bid.status}"
+        )
     
-    return result
+    # Optimistic locking check
+    current_version = trip.version
+    
+    # Update bid status
+    bid.status = "accepted"
+    bid.version += 1
+    
+    # Update trip with driver and price
+    trip.driver_id = bid.driver_id
+    trip.total_price = bid.bid_amount # Target is now the bid amount
+    trip.status = RIDE_STATUS_ACCEPTED
+    trip.version = current_version + 1  # Increment version for optimistic locking
+    
+    # Generate OTP for ride start (6 digits for better security)
+    otp = ''.join([str(random.randint(0, 9)) for _ in range(6)])
+    trip.start_otp = otp
+    trip.otp_verified = False
+    trip.payment_status = "pending"
+    
+    # Reject all other pending bids with one set-based UPDATE (it locks
+    # the rows it changes; nothing else in this session holds them)
+    rejected_driver_ids = db.execute(
+        update(models.TripBid)
+        .where(
+            models.TripBid.trip_id == bid.trip_id,
+            models.TripBid.id != bid_id,
+            models.TripBid.status == "pending"
+        )
+        .values(status="rejected", version=models.TripBid.version + 1)
+        .returning(models.TripBid.driver_id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+        
+    # Update ALL bookings on this trip with split price and confirmed status
+    all_bookings = db.query(models.Booking).filter(
+        models.Booking.trip_id == trip.id
+    ).with_for_update().all()
+    
+    passenger_count = len(all_bookings)
+    if passenger_count > 0:
+        new_split_fare = split_fare(bid.bid_amount, passenger_count)
+        trip.price_per_seat = new_split_fare
+        
+        for booking in all_bookings:
+            # In post-ride model, reconcile_booking_hold only updates the DB value
+            reconcile_booking_hold(
+                db,
+                booking,
+                new_split_fare * (booking.seats_booked or 1),
+                "Trip bid accepted (split update)",
+            )
+            booking.status = "confirmed"
+    
+    # Notify driver about acceptance (delivered by the outbox after commit)
+    outbox.enqueue_notification(
+        db,
+        [bid.driver_id if is_passenger_accepting_driver_bid else trip.creator_passenger_id],
+        "Offer Accepted!",
+        f"Your bid of ₹{bid.bid_amount} was accepted for the trip to {trip.dest_address}.",
+        "bid_accepted",
+        f"/{'driver' if is_passenger_accepting_driver_bid else 'passenger'}/trips/{trip.id}"
+    )
+    return _Acceptance(trip, bid, otp, rejected_driver_ids)
+
+
+def _try_auto_accept(db: Session, bid: models.TripBid, trip: models.Trip) -> Optional[_Acceptance]:
+    """Accept *bid* on behalf of the trip creator inside a savepoint; on any
+    refusal (trip already taken, wallet check) the bid simply stays pending."""
+    db.flush()
+    savepoint = db.begin_nested()
+    try:
+        acceptance = _accept_bid_locked(db, bid.id, trip.creator_passenger_id)
+        outbox.enqueue_notification(
+            db,
+            [trip.creator_passenger_id],
+            "Bid Auto-Accepted",
+            f"Your auto-accept rule accepted a bid of ₹{bid.bid_amount} for your trip to {trip.dest_address}.",
+            "bid_auto_accepted",
+            f"/passenger/trips/{trip.id}"
+        )
+        savepoint.commit()
+        return acceptance
+    except (HTTPException, ValueError) as exc:
+        savepoint.rollback()
+        logger.info("Auto-accept skipped for bid %s: %s", bid.id, getattr(exc, "detail", exc))
+        return None
+
+
+def _publish_acceptance(request: Request, acceptance: _Acceptance) -> None:
+    """After commit: drop the trip from the open feed, close its bid feed, tell the drivers."""
+    trip, bid = acceptance.trip, acceptance.bid
+    bid_book.invalidate(trip.id)
+    dispatch_loop = getattr(request.app.state, "notification_loop", None)
+    _dispatch_websocket_notification(publish_ride_event(RIDE_REMOVED, trip), dispatch_loop)
+    _dispatch_websocket_notification(bid_feed.publish_bids_closed(trip.id, bid), dispatch_loop)
+    _dispatch_websocket_notification(
+        manager.send_personal_messages(_bid_status_messages(trip.id, bid, acceptance.rejected_driver_ids)),
+        dispatch_loop,
+    )
 
 
 @router.post("/{bid_id}/accept", status_code=status.HTTP_200_OK)
@@ -284,126 +608,18 @@ def accept_bid(
         # Start transaction with serializable isolation for consistency
         db.begin_nested()
         
-        # Get bid with lock to prevent concurrent modifications
-        bid = db.query(models.TripBid).filter(
-            models.TripBid.id == bid_id
-        ).with_for_update().first()
-        
-        if not bid:
-            db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Bid not found"
-            )
-        
-        # Get trip with lock
-        trip = db.query(models.Trip).filter(
-            models.Trip.id == bid.trip_id
-        ).with_for_update().first()
-        
-        is_passenger_accepting_driver_bid = trip.creator_passenger_id == current_user.id
-        is_driver_accepting_counter_bid = (
-            getattr(bid, "is_counter_bid", False)
-            and bid.driver_id == current_user.id
-        )
+        acceptance = _accept_bid_locked(db, bid_id, current_user.id)
 
-        if not is_passenger_accepting_driver_bid and not is_driver_accepting_counter_bid:
-            db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Only the trip creator or target driver can accept this offer"
-            )
-        
-        # Check if trip is still available
-        if normalize_ride_status(trip.status) != RIDE_STATUS_REQUESTED:
-            db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="This trip is no longer accepting bids"
-            )
-        
-        # Check if bid is still pending
-        if bid.status != "pending":
-            db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Bid is already {bid.status}"
-            )
-        
-        # Optimistic locking check
-        current_version = trip.version
-        
-        # Update bid status
-        bid.status = "accepted"
-        bid.version += 1
-        
-        # Update trip with driver and price
-        trip.driver_id = bid.driver_id
-        trip.total_price = bid.bid_amount # Target is now the bid amount
-        trip.status = RIDE_STATUS_ACCEPTED
-        trip.version = current_version + 1  # Increment version for optimistic locking
-        
-        # Generate OTP for ride start (6 digits for better security)
-        otp = ''.join([str(random.randint(0, 9)) for _ in range(6)])
-        trip.start_otp = otp
-        trip.otp_verified = False
-        trip.payment_status = "pending"
-        
-        # Reject all other pending bids
-        other_bids = db.query(models.TripBid).filter(
-            models.TripBid.trip_id == bid.trip_id,
-            models.TripBid.id != bid_id,
-            models.TripBid.status == "pending"
-        ).with_for_update().all()
-        
-        for other_bid in other_bids:
-            other_bid.status = "rejected"
-            other_bid.version += 1
-            
-        # Update ALL bookings on this trip with split price and confirmed status
-        all_bookings = db.query(models.Booking).filter(
-            models.Booking.trip_id == trip.id
-        ).with_for_update().all()
-        
-        from decimal import Decimal, ROUND_DOWN
-        passenger_count = Decimal(str(len(all_bookings)))
-        if passenger_count > 0:
-            new_split_fare = (Decimal(str(bid.bid_amount)) / passenger_count).quantize(Decimal("0.01"), rounding=ROUND_DOWN)
-            trip.price_per_seat = new_split_fare
-            
-            for booking in all_bookings:
-                # In post-ride model, reconcile_booking_hold only updates the DB value
-                reconcile_booking_hold(
-                    db,
-                    booking,
-                    new_split_fare * (booking.seats_booked or 1),
-                    "Trip bid accepted (split update)",
-                )
-                booking.status = "confirmed"
-        
         # Commit the transaction
         db.commit()
+        _publish_acceptance(request, acceptance)
         
-        # Notify driver about acceptance
-        dispatch_loop = getattr(request.app.state, "notification_loop", None)
-        _dispatch_websocket_notification(
-            create_notification(
-                db,
-                str(bid.driver_id if is_passenger_accepting_driver_bid else trip.creator_passenger_id),
-                "Offer Accepted!",
-                f"Your bid of ₹{bid.bid_amount} was accepted for the trip to {trip.dest_address}.",
-                "bid_accepted",
-                f"/{'driver' if is_passenger_accepting_driver_bid else 'passenger'}/trips/{trip.id}"
-            ),
-            dispatch_loop
-        )
-        
-        logger.info(f"Bid {bid_id} accepted by user {current_user.id} for trip {trip.id}")
+        logger.info("Bid %s accepted by user %s for trip %s", bid_id, current_user.id, acceptance.trip.id)
         
         return {
             "message": "Bid accepted successfully",
-            "trip_id": str(trip.id),
-            "otp": otp
+            "trip_id": str(acceptance.trip.id),
+            "otp": acceptance.otp
         }
         
     except ValueError as exc:
@@ -500,25 +716,40 @@ def counter_bid(
         )
         
         db.add(counter_bid_obj)
-        db.commit()
-        db.refresh(counter_bid_obj)
 
-        dispatch_loop = getattr(request.app.state, "notification_loop", None)
         trip = db.query(models.Trip).filter(models.Trip.id == original_bid.trip_id).first()
         notify_user_id = original_bid.driver_id if is_passenger else (trip.creator_passenger_id if trip else original_bid.driver_id)
-        _dispatch_websocket_notification(
-            create_notification(
-                db,
-                str(notify_user_id),
-                "Counter Bid Received",
-                f"{'The passenger' if is_passenger else 'The driver'} countered with ₹{counter_bid_obj.bid_amount}.",
-                "counter_bid",
-                f"/{'driver' if is_passenger else 'passenger'}/trips/{original_bid.trip_id}"
-            ),
-            dispatch_loop,
+        outbox.enqueue_notification(
+            db,
+            [notify_user_id],
+            "Counter Bid Received",
+            f"{'The passenger' if is_passenger else 'The driver'} countered with ₹{counter_bid_obj.bid_amount}.",
+            "counter_bid",
+            f"/{'driver' if is_passenger else 'passenger'}/trips/{original_bid.trip_id}"
         )
+        db.commit()
+        bid_book.invalidate(original_bid.trip_id)
+        db.refresh(counter_bid_obj)
+
+        dispatch_loop = getattr(request.app.state, "notification_loop", None)
+        _dispatch_websocket_notification(bid_feed.publish_bid_removed(original_bid), dispatch_loop)
+        if is_passenger:
+            # Passenger counter-offers are for the driver, not the trip's book
+            _dispatch_websocket_notification(notify_bid_status_update(str(counter_bid_obj.driver_id), {
+                "bid_id": str(original_bid.id),
+                "trip_id": str(original_bid.trip_id),
+                "status": "countered",
+                "counter_bid_id": str(counter_bid_obj.id),
+                "counter_amount": float(counter_bid_obj.bid_amount),
+            }), dispatch_loop)
+        else:
+            driver = db.query(models.Driver).filter(models.Driver.user_id == current_user.id).first()
+            if driver:
+                _dispatch_websocket_notification(
+                    bid_feed.publish_bid_added(counter_bid_obj, current_user, driver), dispatch_loop
+                )
         
-        logger.info(f"Counter bid created: {counter_bid_obj.id} for trip {original_bid.trip_id}")
+        logger.info("Counter bid created: %s for trip %s", counter_bid_obj.id, original_bid.trip_id)
         
         return counter_bid_obj
         
@@ -3,17 +3,51 @@ Read-only router exposing the Commuto geofence polygon.
 
 The frontend fetches this at map init to render the shaded service-area overlay.
 No authentication required — the polygon is public data.
+
+Bodies are pre-encoded (see ``services.geofence_boundary``), so the handler
+only negotiates gzip and answers conditional requests with 304.
 """
 
-from fastapi import APIRouter, Request
+from typing import Optional
+
+from fastapi import APIRouter, Query, Request, Response, status
 from rate_limiter import rate_limit
-from services.geofence import get_service_area_geojson
+from services.geofence_boundary import get_boundary_payload
 
 router = APIRouter(prefix="/geofence", tags=["Geofence"])
 
+BOUNDARY_CACHE_CONTROL = "public, max-age=86400, stale-while-revalidate=604800"
+
+
+def _etag_matches(if_none_match: Optional[str], *etags: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return any(etag in candidates for etag in etags)
+
 
 @router.get("/boundary")
 @rate_limit(max_requests=60, window_seconds=60, key_suffix="geofence_boundary")
-def get_boundary(request: Request):
-    """Return the service-area polygon as a GeoJSON Feature."""
-    return get_service_area_geojson()
+async def get_boundary(
+    request: Request,
+    zoom: Optional[int] = Query(default=None, ge=0, le=24, description="Map zoom; selects a simplified outline"),
+):
+    """Return the service-area polygon(s) as GeoJSON."""
+    payload = get_boundary_payload(zoom)
+    use_gzip = "gzip" in request.headers.get("accept-encoding", "").lower()
+    etag = payload.gzip_etag if use_gzip else payload.etag
+    headers = {
+        "ETag": etag,
+        "Cache-Control": BOUNDARY_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+
+    if _etag_matches(request.headers.get("if-none-match"), payload.etag, payload.gzip_etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=payload.gzipped, media_type="application/json", headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
@@ -1,16 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List
+from sqlalchemy import desc, or_, select
+from typing import List, Set
+from datetime import datetime, timedelta
 import models, schemas, auth
 from database import get_db
+from rate_limiter import rate_limit
+from services.geofence import get_geofence_engine
+from utils.notifications import NotificationTemplate, create_notifications_bulk
+from utils import unread_counts
+from utils.read_replicas import get_read_db
 from uuid import UUID
+from anyio import to_thread
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
 @router.get("/", response_model=List[schemas.NotificationResponse])
 def get_notifications(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
     """Get recent notifications for the current user"""
@@ -18,6 +25,14 @@ def get_notifications(
         models.Notification.user_id == current_user.id
     ).order_by(desc(models.Notification.created_at)).limit(50).all()
 
+@router.get("/unread-count")
+def get_unread_count(
+    db: Session = Depends(get_db),
+    user_id: UUID = Depends(auth.get_current_user_id)
+):
+    """Badge count: served from the per-user counter cache, one COUNT on a miss"""
+    return {"unread": unread_counts.get_unread_count(db, user_id)}
+
 @router.post("/{notification_id}/read")
 def mark_as_read(
     notification_id: UUID,
@@ -33,8 +48,11 @@ def mark_as_read(
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
     
+    was_unread = not notification.is_read
     notification.is_read = True
     db.commit()
+    if was_unread:
+        unread_counts.cache.decr(current_user.id)
     return {"message": "Notification marked as read"}
 
 @router.post("/read-all")
@@ -49,6 +67,7 @@ def mark_all_as_read(
     ).update({"is_read": True}, synchronize_session=False)
     
     db.commit()
+    unread_counts.cache.reset(current_user.id)
     return {"message": "All notifications marked as read"}
 
 @router.delete("/")
@@ -62,4 +81,62 @@ def clear_notifications(
     ).delete(synchronize_session=False)
     
     db.commit()
+    unread_counts.cache.reset(current_user.id)
     return {"message": "Notifications cleared"}
+
+
+def _region_user_ids(db: Session, region_name: str, since: datetime) -> Set[UUID]:
+    """Users with a trip starting or ending inside the named geofence region since *since*."""
+    area = next((a for a in get_geofence_engine().areas if a.name == region_name), None)
+    if area is None:
+        raise HTTPException(status_code=404, detail=f"Unknown region '{region_name}'")
+
+    min_lat, min_lng, max_lat, max_lng = area.bbox
+    Trip = models.Trip
+    candidates = db.execute(
+        select(Trip.id, Trip.origin_lat, Trip.origin_lng, Trip.dest_lat, Trip.dest_lng,
+               Trip.creator_passenger_id, Trip.driver_id)
+        .where(
+            Trip.start_time >= since,
+            or_(
+                Trip.origin_lat.between(min_lat, max_lat) & Trip.origin_lng.between(min_lng, max_lng),
+                Trip.dest_lat.between(min_lat, max_lat) & Trip.dest_lng.between(min_lng, max_lng),
+            ),
+        )
+    ).all()
+
+    user_ids: Set[UUID] = set()
+    trip_ids = []
+    for trip_id, o_lat, o_lng, d_lat, d_lng, creator_id, driver_id in candidates:
+        if area.contains(float(o_lat), float(o_lng)) or area.contains(float(d_lat), float(d_lng)):
+            trip_ids.append(trip_id)
+            user_ids.update(uid for uid in (creator_id, driver_id) if uid)
+
+    for start in range(0, len(trip_ids), 1000):
+        user_ids.update(db.scalars(
+            select(models.Booking.passenger_id).where(models.Booking.trip_id.in_(trip_ids[start:start + 1000]))
+        ))
+    return user_ids
+
+
+@router.post("/broadcast", response_model=schemas.NotificationBroadcastResponse)
+@rate_limit(max_requests=5, window_seconds=60, key_suffix="notification_broadcast")
+async def broadcast_notification(
+    request: Request,
+    body: schemas.NotificationBroadcastRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.require_operator)
+):
+    """Operator service alert to every user, or to users active in one geofence region"""
+    def resolve_recipients():
+        if body.region:
+            since = datetime.utcnow() - timedelta(days=body.active_within_days)
+            return _region_user_ids(db, body.region, since)
+        return db.scalars(select(models.User.id)).all()
+
+    # Audience lookup and the bulk insert both run off the event loop
+    recipients = await to_thread.run_sync(resolve_recipients)
+
+    template = NotificationTemplate(body.title, body.message, body.type, body.link)
+    count = await create_notifications_bulk(db, recipients, template)
+    return {"recipients": count, "region": body.region}
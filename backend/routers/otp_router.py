@@ -102,7 +102,7 @@ def verify_otp_and_start_ride(
         
         db.commit()
         
-        logger.info(f"Trip {trip_id} started by driver {current_user.id}")
+        logger.info("Trip %s started by driver %s", trip_id, current_user.id)
         
         return {
             "message": "Ride started successfully",
@@ -232,7 +232,7 @@ def complete_ride(
 
         db.commit()
         
-        logger.info(f"Trip {trip_id} completed by driver {current_user.id}")
+        logger.info("Trip %s completed by driver %s", trip_id, current_user.id)
         
         return {
             "message": "Ride completed successfully",
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from database import get_db
 from rate_limiter import rate_limit
 import models
@@ -8,20 +9,25 @@ import schemas_trips as trip_schemas
 import auth
 import uuid
 from uuid import UUID
-from decimal import Decimal, ROUND_DOWN, ROUND_UP
+from decimal import Decimal
 from typing import List, Optional
 from pydantic import BaseModel, Field
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import asyncio
 import logging
 import os
-from websocket_manager import manager
 import schemas
 from services.rating_service import apply_driver_rating
 from services.billing_service import get_trip_receipt as _build_receipt
-from services.wallet_service import hold_wallet_funds_or_raise, release_wallet_funds, reconcile_booking_hold
+from services.fare_service import split_fare, split_fare_after_leave
+from services.wallet_service import hold_wallet_funds_or_raise, release_wallet_funds
 from services.geofence import validate_ride_coordinates
+from services import auto_accept, bid_book, bid_feed, ride_matching, seat_holds, trip_seats
+from services.ride_feed import RIDE_ADDED, RIDE_REMOVED, RIDE_UPDATED, is_open_ride, open_rides_query, publish_ride_event, publish_ride_event_async
 from ride_states import RIDE_STATUS_STARTED, normalize_ride_status
-from utils.notifications import create_notification
+from utils import outbox
+from utils.metrics import SEAT_CAS_CONFLICTS
+from utils.read_replicas import get_read_db
 
 router = APIRouter(prefix="/rides", tags=["Rides"])
 logger = logging.getLogger(__name__)
@@ -208,6 +214,21 @@ async def create_shared_ride(
         version=0
     )
     
+    # Optional standing order: bids that satisfy it are accepted as they arrive
+    auto_accept_rule = None
+    if trip_data.auto_accept:
+        auto_accept_rule = auto_accept.build_rule(
+            new_trip,
+            trip_data.auto_accept.max_price,
+            trip_data.auto_accept.min_rating,
+            trip_data.auto_accept.deadline,
+        )
+        if auto_accept_rule.deadline < _get_utcnow():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Auto-accept deadline must be in the future"
+            )
+
     # Creator is the first passenger
     booking = models.Booking(
         id=uuid.uuid4(),
@@ -234,6 +255,8 @@ async def create_shared_ride(
         db.add(new_trip)
         db.add(booking)
         db.add(trip_passenger)
+        if auto_accept_rule is not None:
+            db.add(auto_accept_rule)
 
         if _should_require_wallet_check(payment_method):
             # Check balance but don't deduct yet (post-ride charging model)
@@ -241,17 +264,11 @@ async def create_shared_ride(
             if not wallet or wallet.balance < Decimal(str(trip_data.total_price)):
                 raise ValueError("Insufficient wallet balance for this trip total")
 
-        db.commit()
-        db.refresh(new_trip)
-        new_trip.payment_method = payment_method
-        
-        # Broadcast to all drivers that a new ride is available
-        dispatch_loop = getattr(request.app.state, "notification_loop", None)
+        # Broadcast to all drivers that a new ride is available (sent by the outbox after commit)
         # Note: Broadcating to ALL drivers as a persistent notification might be noisy, 
         # but the real-time websocket is already doing it. 
         # For the Activity Log, we'll keep it to direct actions for now to avoid spamming drivers.
-        
-        await manager.send_to_drivers({
+        outbox.enqueue_drivers_message(db, {
             "type": "new_ride_available",
             "trip": {
                 "id": str(new_trip.id),
@@ -262,6 +279,12 @@ async def create_shared_ride(
                 "available_seats": new_trip.available_seats
             }
         })
+
+        db.commit()
+        db.refresh(new_trip)
+        new_trip.payment_method = payment_method
+
+        await publish_ride_event_async(RIDE_ADDED, new_trip)
         
         return new_trip
     except ValueError as exc:
@@ -282,22 +305,12 @@ async def create_shared_ride(
 def get_available_rides(
     request: Request,
     current_user: models.User = Depends(auth.get_current_user),
-    db: Session = Depends(get_db)
+    read_db: Session = Depends(get_read_db)
 ):
     """Get all public shared rides that have available seats and are in the future"""
     from datetime import datetime
     
-    # Lazy auto-cancel expired pending rides
-    expired_rides = db.query(models.Trip).filter(
-        models.Trip.status == "pending",
-        models.Trip.start_time < datetime.utcnow()
-    ).all()
-    if expired_rides:
-        for er in expired_rides:
-            er.status = "cancelled"
-        db.commit()
-    
-    rides = db.query(models.Trip).filter(
+    rides = read_db.query(models.Trip).filter(
         models.Trip.creator_passenger_id != None,
         models.Trip.status == "pending",
         models.Trip.available_seats > 0,
@@ -311,6 +324,51 @@ def get_available_rides(
     return rides
 
 
+@router.get("/match", response_model=List[trip_schemas.TripMatchResponse])
+@rate_limit(max_requests=100 if os.getenv("APP_ENV") == "development" else 30, window_seconds=60, key_suffix="match_rides")
+def match_rides(
+    request: Request,
+    from_lat: float = Query(..., ge=-90, le=90),
+    from_lng: float = Query(..., ge=-180, le=180),
+    to_lat: float = Query(..., ge=-90, le=90),
+    to_lng: float = Query(..., ge=-180, le=180),
+    departure: datetime = Query(..., description="Desired departure time (UTC)"),
+    window_minutes: int = Query(ride_matching.DEFAULT_WINDOW_MINUTES, ge=5, le=720),
+    max_detour_km: float = Query(ride_matching.DEFAULT_MAX_DETOUR_KM, gt=0, le=20),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Rank pending shared rides by how well their route and departure fit the request"""
+    if departure.tzinfo is not None:
+        departure = departure.astimezone(timezone.utc).replace(tzinfo=None)
+    pickup, dropoff = (from_lat, from_lng), (to_lat, to_lng)
+
+    candidates = ride_matching.candidate_trips_query(
+        db, current_user.id, pickup, dropoff, departure, window_minutes=window_minutes
+    ).all()
+    matches = ride_matching.top_matches(
+        candidates, pickup, dropoff, departure,
+        limit=limit, max_detour_km=max_detour_km, window_minutes=window_minutes,
+    )
+
+    trips_by_id = {trip.id: trip for trip in candidates}
+    rides = []
+    for match in matches:
+        ride = trips_by_id[match.trip_id]
+        ride.from_address = ride.origin_address
+        ride.to_address = ride.dest_address
+        ride.payment_method = _get_trip_payment_method(ride)
+        ride.match_score = match.score
+        ride.pickup_detour_km = match.pickup_detour_km
+        ride.dropoff_detour_km = match.dropoff_detour_km
+        ride.departure_offset_minutes = match.departure_offset_minutes
+        # Same split join_ride would apply with one more passenger aboard
+        ride.fare_if_joined = split_fare(ride.total_price, ride.total_seats - ride.available_seats + 1)
+        rides.append(ride)
+    return rides
+
+
 @router.get("/{trip_id}/details", response_model=trip_schemas.TripWithPassengers)
 def get_trip_details(
     trip_id: UUID,
@@ -359,6 +417,181 @@ def get_trip_details(
     return trip
 
 
+def _board_passenger(
+    db: Session,
+    trip: models.Trip,
+    current_user: models.User,
+    fare,
+    payment_method: str,
+    notes: Optional[str],
+) -> None:
+    """Add the passenger's trip seat and booking, and queue the seat update and creator notification."""
+    trip_id = trip.id
+    db.add(models.TripPassenger(
+        id=uuid.uuid4(),
+        trip_id=trip_id,
+        passenger_id=current_user.id,
+        seats_booked=1
+    ))
+    db.add(models.Booking(
+        id=uuid.uuid4(),
+        trip_id=trip_id,
+        passenger_id=current_user.id,
+        seats_booked=1,
+        total_price=fare,
+        status="confirmed",
+        payment_status=CASH_PAYMENT_METHOD if payment_method == CASH_PAYMENT_METHOD else "pending",
+        notes=notes
+    ))
+
+    # Seat update for the trip room and a notification for the creator,
+    # committed with the booking and delivered by the outbox
+    outbox.enqueue_trip_message(db, trip_id, {
+        "type": "seat_update",
+        "trip_id": str(trip_id),
+        "available_seats": trip.available_seats,
+        "price_per_seat": float(trip.price_per_seat) if trip.price_per_seat is not None else None,
+        "filled_seats": trip.total_seats - trip.available_seats,
+        "passenger": {
+            "id": str(current_user.id),
+            "full_name": current_user.full_name,
+            "avatar_url": current_user.avatar_url
+        }
+    })
+    outbox.enqueue_notification(
+        db,
+        [trip.creator_passenger_id],
+        "Passenger Joined",
+        f"{current_user.full_name} joined your ride to {trip.dest_address}.",
+        "passenger_joined",
+        f"/passenger/trips/{trip_id}"
+    )
+
+
+def _require_wallet_balance(db: Session, current_user: models.User, fare) -> None:
+    """Check balance but don't deduct yet (post-ride charging model)."""
+    wallet = db.query(models.Wallet).filter(models.Wallet.user_id == current_user.id).first()
+    if not wallet or wallet.balance < fare:
+        guidance = "Add money to wallet before joining this ride."
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Insufficient wallet balance to join this ride. {guidance}",
+        )
+
+
+def _join_once(db: Session, trip_id: UUID, current_user: models.User, join_notes: Optional[str]) -> Optional[models.Trip]:
+    """One optimistic join attempt; ``None`` if the trip changed under us (retry)."""
+    trip = db.query(models.Trip).filter(models.Trip.id == trip_id).first()
+
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    if trip.available_seats <= 0:
+        raise HTTPException(status_code=400, detail="Ride is full")
+
+    # Check if already joined
+    existing = db.query(models.TripPassenger).filter(
+        models.TripPassenger.trip_id == trip_id,
+        models.TripPassenger.passenger_id == current_user.id
+    ).first()
+
+    if existing:
+        raise HTTPException(status_code=400, detail="Already joined this ride")
+
+    payment_method = _get_trip_payment_method(trip)
+
+    # DYNAMIC PRICING: price per seat once this passenger is in
+    total_pax = trip_seats.booked_seats(db, trip_id) + 1
+    new_fare = split_fare(trip.total_price, total_pax)
+
+    if _should_require_wallet_check(payment_method):
+        _require_wallet_balance(db, current_user, new_fare)
+
+    # Take the seat only if nobody else changed the trip since we read it
+    if not trip_seats.swap_seats(db, trip, -1, new_fare):
+        db.rollback()
+        return None
+
+    # Existing riders' share drops to the new split (one UPDATE)
+    trip_seats.reprice_bookings(db, trip_id, new_fare)
+    _board_passenger(db, trip, current_user, new_fare, payment_method, join_notes)
+
+    db.commit()
+    return trip
+
+
+def _leave_once(db: Session, trip_id: UUID, current_user: models.User) -> Optional[models.Trip]:
+    """One optimistic leave attempt; ``None`` if the trip changed under us (retry)."""
+    trip = db.query(models.Trip).filter(models.Trip.id == trip_id).first()
+
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    # Creator cannot "leave" (they must cancel)
+    if trip.creator_passenger_id == current_user.id:
+        raise HTTPException(status_code=400, detail="Creator cannot leave. Use cancel instead.")
+
+    # Check if joined
+    tp = db.query(models.TripPassenger).filter(
+        models.TripPassenger.trip_id == trip_id,
+        models.TripPassenger.passenger_id == current_user.id
+    ).first()
+
+    if not tp:
+        raise HTTPException(status_code=400, detail="Not a passenger in this ride")
+
+    # DYNAMIC PRICING: Recalculate price for remaining passengers, rounded
+    # up (fair to the driver) and capped at the original total; see
+    # services.fare_service.
+    total_passengers = trip_seats.booked_seats(db, trip_id) - (tp.seats_booked or 1)
+    new_price_per_seat = trip.price_per_seat
+    if total_passengers > 0:
+        new_price_per_seat = split_fare_after_leave(trip.total_price, total_passengers)
+
+    if not trip_seats.swap_seats(db, trip, 1, new_price_per_seat):
+        db.rollback()
+        return None
+
+    # In post-ride model, we don't refund because we never deducted at start.
+    # We just remove the records.
+    db.query(models.Booking).filter(
+        models.Booking.trip_id == trip_id,
+        models.Booking.passenger_id == current_user.id
+    ).delete(synchronize_session=False)
+    db.delete(tp)
+
+    if total_passengers > 0:
+        trip_seats.reprice_bookings(db, trip_id, new_price_per_seat)
+
+    # Broadcast seat update (via the outbox, after commit)
+    outbox.enqueue_trip_message(db, trip_id, {
+        "type": "seat_update",
+        "trip_id": str(trip_id),
+        "available_seats": trip.available_seats,
+        "price_per_seat": float(trip.price_per_seat) if trip.price_per_seat is not None else None,
+        "filled_seats": trip.total_seats - trip.available_seats,
+        "left_user_id": str(current_user.id)
+    })
+
+    db.commit()
+    return trip
+
+
+async def _with_seat_retries(operation: str, attempt_once) -> models.Trip:
+    """Run *attempt_once* until its compare-and-swap lands (see services.trip_seats)."""
+    for attempt in range(trip_seats.MAX_ATTEMPTS):
+        trip = attempt_once()
+        if trip is not None:
+            return trip
+        SEAT_CAS_CONFLICTS.inc(operation)
+        await asyncio.sleep(trip_seats.backoff_delay(attempt))
+    logger.warning("Gave up on %s after %d version conflicts", operation, trip_seats.MAX_ATTEMPTS)
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="This ride is changing quickly. Please try again."
+    )
+
+
 class JoinRideBody(BaseModel):
     notes: Optional[str] = Field(default=None, max_length=500)
 
@@ -370,118 +603,15 @@ async def join_ride(
     db: Session = Depends(get_db)
 ):
     """Join a public shared ride"""
-    trip = None
+    join_notes = body.notes.strip()[:500] if body and body.notes else None
     try:
-        db.begin_nested()
-        trip = db.query(models.Trip).filter(models.Trip.id == trip_id).with_for_update().first()
-        
-        if not trip:
-            raise HTTPException(status_code=404, detail="Trip not found")
-        
-        if trip.available_seats <= 0:
-            raise HTTPException(status_code=400, detail="Ride is full")
-        
-        # Check if already joined
-        existing = db.query(models.TripPassenger).filter(
-            models.TripPassenger.trip_id == trip_id,
-            models.TripPassenger.passenger_id == current_user.id
-        ).first()
-        
-        if existing:
-            raise HTTPException(status_code=400, detail="Already joined this ride")
-        
-        # Add passenger
-        tp = models.TripPassenger(
-            id=uuid.uuid4(),
-            trip_id=trip_id,
-            passenger_id=current_user.id,
-            seats_booked=1
-        )
-        
-        # Update trip seats temporarily to calculate NEW split
-        trip.available_seats -= 1
-        payment_method = _get_trip_payment_method(trip)
-        
-        # DYNAMIC PRICING: Calculate new price per seat
-        total_pax = trip.total_seats - trip.available_seats
-        new_fare = (Decimal(str(trip.total_price)) / Decimal(str(total_pax))).quantize(Decimal("0.01"), rounding=ROUND_DOWN)
-        trip.price_per_seat = new_fare
-        
-        if _should_require_wallet_check(payment_method):
-            # Check balance but don't deduct yet (post-ride charging model)
-            wallet = db.query(models.Wallet).filter(models.Wallet.user_id == current_user.id).first()
-            if not wallet or wallet.balance < new_fare:
-                raise ValueError("Insufficient wallet balance to join this ride")
+        trip = await _with_seat_retries("join", lambda: _join_once(db, trip_id, current_user, join_notes))
 
-        # Create booking record with NEW fare
-        join_notes = body.notes.strip()[:500] if body and body.notes else None
-        booking = models.Booking(
-            id=uuid.uuid4(),
-            trip_id=trip_id,
-            passenger_id=current_user.id,
-            seats_booked=1,
-            total_price=new_fare,
-            status="confirmed",
-            payment_status=CASH_PAYMENT_METHOD if payment_method == CASH_PAYMENT_METHOD else "pending",
-            notes=join_notes
-        )
-        
-        trip.version += 1
-
-        # REFUND existing bookings difference
-        existing_bookings = db.query(models.Booking).filter(
-            models.Booking.trip_id == trip_id,
-            models.Booking.status == "confirmed"
-        ).all()
-        
-        db.add(tp)
-        db.add(booking)
-        
-        for b in existing_bookings:
-            reconcile_booking_hold(db, b, new_fare, "Ride split update (new passenger joined)")
+        await publish_ride_event_async(RIDE_UPDATED, trip)
 
-        db.commit()
-        
-        # Broadcast seat update to all in the trip
-        await manager.broadcast_to_trip(str(trip_id), {
-            "type": "seat_update",
-            "trip_id": str(trip_id),
-            "available_seats": trip.available_seats,
-            "price_per_seat": float(trip.price_per_seat) if trip.price_per_seat is not None else None,
-            "filled_seats": trip.total_seats - trip.available_seats,
-            "passenger": {
-                "id": str(current_user.id),
-                "full_name": current_user.full_name,
-                "avatar_url": current_user.avatar_url
-            }
-        })
-        
-        # Notify the creator
-        if trip.creator_passenger_id:
-            dispatch_loop = getattr(request.app.state, "notification_loop", None)
-            from routers.bids_router import _dispatch_websocket_notification
-            _dispatch_websocket_notification(
-                create_notification(
-                    db,
-                    str(trip.creator_passenger_id),
-                    "Passenger Joined",
-                    f"{current_user.full_name} joined your ride to {trip.dest_address}.",
-                    "passenger_joined",
-                    f"/passenger/trips/{trip_id}"
-                ),
-                dispatch_loop
-            )
-        
         return {"message": "Successfully joined ride", "available_seats": trip.available_seats}
-    except ValueError as exc:
-        db.rollback()
-        payment_method = _get_trip_payment_method(trip) if trip else ONLINE_PAYMENT_METHOD
-        guidance = "Add money to wallet before joining this ride." if payment_method == ONLINE_PAYMENT_METHOD else "Switch to online payment or try again."
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"{exc}. {guidance}",
-        )
     except HTTPException:
+        db.rollback()
         raise
     except Exception as e:
         db.rollback()
@@ -497,78 +627,13 @@ async def leave_ride(
 ):
     """Leave a joined shared ride"""
     try:
-        db.begin_nested()
-        trip = db.query(models.Trip).filter(models.Trip.id == trip_id).with_for_update().first()
-        
-        if not trip:
-            raise HTTPException(status_code=404, detail="Trip not found")
-            
-        # Creator cannot "leave" (they must cancel)
-        if trip.creator_passenger_id == current_user.id:
-            raise HTTPException(status_code=400, detail="Creator cannot leave. Use cancel instead.")
-        
-        # Check if joined
-        tp = db.query(models.TripPassenger).filter(
-            models.TripPassenger.trip_id == trip_id,
-            models.TripPassenger.passenger_id == current_user.id
-        ).first()
-        
-        if not tp:
-            raise HTTPException(status_code=400, detail="Not a passenger in this ride")
+        trip = await _with_seat_retries("leave", lambda: _leave_once(db, trip_id, current_user))
 
-        # In post-ride model, we don't refund because we never deducted at start.
-        # We just remove the record.
-        if booking:
-            booking.status = "cancelled"
-            booking.payment_status = "cancelled"
-        
-        # Remove booking
-        if booking:
-            db.delete(booking)
-        
-        # Remove TripPassenger
-        db.delete(tp)
-        
-        # Update trip
-        trip.available_seats += 1
-        trip.version += 1
+        await publish_ride_event_async(RIDE_UPDATED, trip)
 
-        # DYNAMIC PRICING: Recalculate price for remaining passengers
-        total_passengers = trip.total_seats - trip.available_seats
-        if total_passengers > 0:
-            # Use ROUND_UP for remaining passengers if split isn't perfect, 
-            # to be fair to the driver. But passengers were rounded down on join.
-            new_price_per_seat = (Decimal(str(trip.total_price)) / Decimal(str(total_passengers))).quantize(Decimal("0.01"), rounding=ROUND_UP)
-            
-            # Cap the split to never exceed the original total price
-            if new_price_per_seat > Decimal(str(trip.total_price)):
-                new_price_per_seat = Decimal(str(trip.total_price))
-                
-            trip.price_per_seat = new_price_per_seat
-            
-            # Update remaining bookings
-            remaining_bookings = db.query(models.Booking).filter(
-                models.Booking.trip_id == trip_id,
-                models.Booking.status == "confirmed"
-            ).all()
-            
-            for b in remaining_bookings:
-                reconcile_booking_hold(db, b, new_price_per_seat, "Ride split update (passenger left)", blocking=False)
-        
-        db.commit()
-        
-        # Broadcast seat update
-        await manager.broadcast_to_trip(str(trip_id), {
-            "type": "seat_update",
-            "trip_id": str(trip_id),
-            "available_seats": trip.available_seats,
-            "price_per_seat": float(trip.price_per_seat) if trip.price_per_seat is not None else None,
-            "filled_seats": trip.total_seats - trip.available_seats,
-            "left_user_id": str(current_user.id)
-        })
-        
         return {"message": "Successfully left ride", "available_seats": trip.available_seats}
     except HTTPException:
+        db.rollback()
         raise
     except Exception as e:
         db.rollback()
@@ -576,6 +641,135 @@ async def leave_ride(
         raise HTTPException(status_code=500, detail="Failed to leave ride")
 
 
+def _hold_response(hold: models.SeatHold, trip_id: UUID, available_seats: int) -> dict:
+    return {"hold_token": hold.id, "trip_id": trip_id, "expires_at": hold.expires_at, "available_seats": available_seats}
+
+
+@router.post("/{trip_id}/reserve", response_model=trip_schemas.SeatHoldResponse, status_code=status.HTTP_201_CREATED)
+@rate_limit(max_requests=10, window_seconds=60, key_suffix="reserve_seat")
+async def reserve_seat(
+    request: Request,
+    trip_id: UUID,
+    current_user: models.User = Depends(auth.require_role(["passenger", "driver"])),
+    db: Session = Depends(get_db)
+):
+    """Hold a seat for SEAT_HOLD_TTL_SECONDS; POST /rides/{trip_id}/confirm turns it into a booking"""
+    now = datetime.utcnow()
+    trip = db.query(models.Trip).filter(models.Trip.id == trip_id).first()
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    # Only rides in the open set (cancelled, started and past rides take no holds)
+    if not is_open_ride(trip, now):
+        raise HTTPException(status_code=400, detail="Ride is no longer open for booking")
+
+    already_joined = db.query(models.TripPassenger.id).filter(
+        models.TripPassenger.trip_id == trip_id,
+        models.TripPassenger.passenger_id == current_user.id
+    ).first()
+    if already_joined:
+        raise HTTPException(status_code=400, detail="Already joined this ride")
+
+    # Retried reserve: hand back the seat this passenger already holds
+    hold = seat_holds.active_hold(db, trip_id, current_user.id, now)
+    if hold:
+        return _hold_response(hold, trip_id, trip.available_seats)
+
+    try:
+        hold = seat_holds.reserve(db, trip_id, current_user.id, now)
+        if hold is None:
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Ride is full")
+        response = _hold_response(hold, trip_id, hold.available_seats)
+        db.commit()
+    except HTTPException:
+        raise
+    except IntegrityError:
+        db.rollback()
+        # A concurrent reserve from this passenger got the hold first
+        hold = seat_holds.active_hold(db, trip_id, current_user.id, now)
+        if hold is None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Seat reservation in progress. Please try again.")
+        db.refresh(trip)
+        return _hold_response(hold, trip_id, trip.available_seats)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error reserving seat: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to reserve seat")
+
+    await publish_ride_event_async(RIDE_UPDATED, trip)
+    return response
+
+
+def _confirm_once(db: Session, trip_id: UUID, current_user: models.User, body: trip_schemas.SeatConfirm) -> Optional[models.Trip]:
+    """One attempt at turning a seat hold into a booking; ``None`` if the trip changed under us (retry)."""
+    now = datetime.utcnow()
+    hold = db.get(models.SeatHold, body.hold_token)
+    if not hold or hold.trip_id != trip_id or hold.passenger_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Seat hold not found")
+    if hold.status == seat_holds.CONFIRMED:
+        raise HTTPException(status_code=400, detail="Seat hold already confirmed")
+    if hold.status != seat_holds.HELD or hold.expires_at <= now:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Seat hold expired. Reserve the seat again.")
+
+    existing = db.query(models.TripPassenger.id).filter(
+        models.TripPassenger.trip_id == trip_id,
+        models.TripPassenger.passenger_id == current_user.id
+    ).first()
+    if existing:
+        raise HTTPException(status_code=400, detail="Already joined this ride")
+
+    trip = db.query(models.Trip).filter(models.Trip.id == trip_id).first()
+    payment_method = _get_trip_payment_method(trip)
+
+    # DYNAMIC PRICING: the held seat is already off available_seats
+    new_fare = split_fare(trip.total_price, trip_seats.booked_seats(db, trip_id) + hold.seats)
+    if _should_require_wallet_check(payment_method):
+        _require_wallet_balance(db, current_user, new_fare)
+
+    trip_seats.reprice_bookings(db, trip_id, new_fare)
+    notes = body.notes.strip()[:500] if body.notes else None
+    _board_passenger(db, trip, current_user, new_fare, payment_method, notes)
+
+    # The reaper may have released the hold since we read it
+    if not seat_holds.claim(db, hold.id, now):
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Seat hold expired. Reserve the seat again.")
+
+    # Reprice only if no other join/leave/confirm landed meanwhile; the
+    # trips row is locked from here to the commit
+    if not trip_seats.swap_seats(db, trip, 0, new_fare):
+        db.rollback()
+        return None
+
+    db.commit()
+    return trip
+
+
+@router.post("/{trip_id}/confirm", status_code=status.HTTP_200_OK)
+@rate_limit(max_requests=10, window_seconds=60, key_suffix="confirm_seat")
+async def confirm_seat(
+    request: Request,
+    trip_id: UUID,
+    body: trip_schemas.SeatConfirm,
+    current_user: models.User = Depends(auth.require_role(["passenger", "driver"])),
+    db: Session = Depends(get_db)
+):
+    """Book the seat held by POST /rides/{trip_id}/reserve"""
+    try:
+        trip = await _with_seat_retries("confirm", lambda: _confirm_once(db, trip_id, current_user, body))
+
+        await publish_ride_event_async(RIDE_UPDATED, trip)
+
+        return {"message": "Successfully joined ride", "available_seats": trip.available_seats}
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error confirming seat: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to confirm seat")
+
+
 @router.get("/my-trips", response_model=List[trip_schemas.TripResponse])
 @rate_limit(max_requests=100 if os.getenv("APP_ENV") == "development" else 30, window_seconds=60, key_suffix="my_trips")
 def get_my_trips(
@@ -586,16 +780,6 @@ def get_my_trips(
     """Get all trips for current user (as passenger)"""
     from datetime import datetime
     
-    # Lazy auto-cancel expired pending rides
-    expired_rides = db.query(models.Trip).filter(
-        models.Trip.status == "pending",
-        models.Trip.start_time < datetime.utcnow()
-    ).all()
-    if expired_rides:
-        for er in expired_rides:
-            er.status = "cancelled"
-        db.commit()
-        
     # Find all trips where the user is a passenger (via booking)
     trips = db.query(models.Trip).join(
         models.Booking, models.Trip.id == models.Booking.trip_id
@@ -660,39 +844,14 @@ def get_driver_trips(
 def get_open_rides(
     request: Request,
     current_user: models.User = Depends(auth.require_role(["driver"])),
-    db: Session = Depends(get_db)
+    read_db: Session = Depends(get_read_db)
 ):
     """Get all open rides available for bidding"""
     from datetime import datetime
     
-    # Lazy auto-cancel expired pending rides
-    expired_rides = db.query(models.Trip).filter(
-        models.Trip.status == "pending",
-        models.Trip.start_time < datetime.utcnow()
-    ).all()
-    if expired_rides:
-        for er in expired_rides:
-            er.status = "cancelled"
-        db.commit()
-        
-    # Identify trips where the current user is a passenger
-    user_passenger_trips = db.query(models.Booking.trip_id).filter(
-        models.Booking.passenger_id == current_user.id
-    ).subquery()
-    
-    # Identify trips where the current driver has already placed a bid
-    driver_bidded_trips = db.query(models.TripBid.trip_id).filter(
-        models.TripBid.driver_id == current_user.id
-    ).subquery()
-
-    # Get all pending rides excluding the ones above and ensuring they are in the future
-    from datetime import datetime
-    rides = db.query(models.Trip).filter(
-        models.Trip.status.in_(["pending"]),
-        models.Trip.start_time >= datetime.utcnow(),
-        ~models.Trip.id.in_(user_passenger_trips),
-        ~models.Trip.id.in_(driver_bidded_trips)
-    ).all()
+    # Pending future rides, excluding ones the user is riding in or already bid on.
+    # Kept in sync with the open ride WebSocket feed snapshot.
+    rides = open_rides_query(read_db, current_user.id).all()
     
     for ride in rides:
         ride.seats_requested = ride.total_seats
@@ -705,7 +864,7 @@ def get_open_rides(
             ride.driver_avatar = ride.driver.user.avatar_url
             ride.driver_rating = float(ride.driver.rating) if ride.driver.rating else None
     
-    populate_passenger_notes(rides, db)
+    populate_passenger_notes(rides, read_db)
     return rides
 
 
@@ -802,66 +961,61 @@ def cancel_ride(
             booking.status = "cancelled"
             booking.payment_status = "cancelled"
         
-        # Reject all pending bids
-        pending_bids = db.query(models.TripBid).filter(
+        # Reject all pending bids in one statement
+        db.query(models.TripBid).filter(
             models.TripBid.trip_id == trip_id,
             models.TripBid.status == "pending"
-        ).all()
-        
-        for bid in pending_bids:
-            bid.status = "rejected"
-            bid.version += 1
-        
-        db.commit()
-        
-        # Notify all participants about cancellation
-        dispatch_loop = getattr(request.app.state, "notification_loop", None)
-        from routers.bids_router import _dispatch_websocket_notification
+        ).update(
+            {models.TripBid.status: "rejected", models.TripBid.version: models.TripBid.version + 1},
+            synchronize_session=False,
+        )
         
+        # Notify all participants about cancellation: one outbox row per message
+        # variant, written in this transaction and delivered after commit
         # 1. Notify creator if they didn't cancel it
         if trip.creator_passenger_id and str(trip.creator_passenger_id) != str(current_user.id):
-             _dispatch_websocket_notification(
-                create_notification(
-                    db,
-                    str(trip.creator_passenger_id),
-                    "Trip Cancelled",
-                    f"Your trip to {trip.dest_address} has been cancelled by another participant.",
-                    "trip_cancelled",
-                    f"/passenger/trips/{trip_id}"
-                ),
-                dispatch_loop
+            outbox.enqueue_notification(
+                db,
+                [trip.creator_passenger_id],
+                "Trip Cancelled",
+                f"Your trip to {trip.dest_address} has been cancelled by another participant.",
+                "trip_cancelled",
+                f"/passenger/trips/{trip_id}"
             )
-            
+
         # 2. Notify driver if assigned and didn't cancel it
         if trip.driver_id and str(trip.driver_id) != str(current_user.id):
-             _dispatch_websocket_notification(
-                create_notification(
-                    db,
-                    str(trip.driver_id),
-                    "Trip Cancelled",
-                    f"The trip to {trip.dest_address} has been cancelled by the passenger.",
-                    "trip_cancelled",
-                    f"/driver/trips/{trip_id}"
-                ),
-                dispatch_loop
+            outbox.enqueue_notification(
+                db,
+                [trip.driver_id],
+                "Trip Cancelled",
+                f"The trip to {trip.dest_address} has been cancelled by the passenger.",
+                "trip_cancelled",
+                f"/driver/trips/{trip_id}"
             )
-            
+
         # 3. Notify other passengers
-        for b in bookings:
-            if str(b.passenger_id) != str(current_user.id) and str(b.passenger_id) != str(trip.creator_passenger_id):
-                 _dispatch_websocket_notification(
-                    create_notification(
-                        db,
-                        str(b.passenger_id),
-                        "Trip Cancelled",
-                        f"The ride to {trip.dest_address} has been cancelled.",
-                        "trip_cancelled",
-                        f"/passenger/trips/{trip_id}"
-                    ),
-                    dispatch_loop
-                )
+        outbox.enqueue_notification(
+            db,
+            [
+                b.passenger_id for b in bookings
+                if str(b.passenger_id) != str(current_user.id) and str(b.passenger_id) != str(trip.creator_passenger_id)
+            ],
+            "Trip Cancelled",
+            f"The ride to {trip.dest_address} has been cancelled.",
+            "trip_cancelled",
+            f"/passenger/trips/{trip_id}"
+        )
+
+        db.commit()
+        bid_book.invalidate(trip_id)
+        
+        dispatch_loop = getattr(request.app.state, "notification_loop", None)
+        from routers.bids_router import _dispatch_websocket_notification
+        _dispatch_websocket_notification(publish_ride_event(RIDE_REMOVED, trip), dispatch_loop)
+        _dispatch_websocket_notification(bid_feed.publish_bids_closed(trip_id), dispatch_loop)
         
-        logger.info(f"Trip {trip_id} cancelled by user {current_user.id}. Penalty: {penalty_amount}")
+        logger.info("Trip %s cancelled by user %s. Penalty: %s", trip_id, current_user.id, penalty_amount)
         
         return {
             "message": "Trip cancelled successfully",
@@ -946,7 +1100,7 @@ def update_location(
         db.add(location)
         db.commit()
         
-        logger.debug(f"Location updated for trip {trip_id}: ({location_data.lat}, {location_data.lng})")
+        logger.debug("Location updated for trip %s: (%s, %s)", trip_id, location_data.lat, location_data.lng)
         
         return {
             "message": "Location updated successfully",
@@ -968,7 +1122,7 @@ def get_trip_locations(
     request: Request,
     trip_id: UUID,
     current_user: models.User = Depends(auth.get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get location history for a trip (passenger or driver only)"""
     
@@ -1038,7 +1192,7 @@ def get_trip_receipt(
     request: Request,
     trip_id: UUID,
     current_user: models.User = Depends(auth.get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get a formatted receipt for a completed trip."""
     return _build_receipt(db, trip_id, current_user)
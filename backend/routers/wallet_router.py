@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 from database import get_db
 from rate_limiter import rate_limit
+from utils.read_replicas import get_read_db
 import models
 import schemas
 import auth
@@ -9,7 +10,7 @@ import os
 import hmac
 import hashlib
 import logging
-import requests
+from services import integrations
 
 router = APIRouter(prefix="/wallet", tags=["Wallet"])
 logger = logging.getLogger(__name__)
@@ -43,10 +44,13 @@ def get_wallet(
 def list_transactions(
     request: Request,
     current_user: models.User = Depends(auth.get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get transaction history for current user"""
-    wallet = get_or_create_wallet(current_user.id, db)
+    # Read-only: a user without a wallet yet simply has no transactions
+    wallet = db.query(models.Wallet).filter(models.Wallet.user_id == current_user.id).first()
+    if not wallet:
+        return []
     transactions = db.query(models.Transaction).filter(
         models.Transaction.wallet_id == wallet.id
     ).order_by(models.Transaction.created_at.desc()).limit(50).all()
@@ -63,7 +67,8 @@ def create_add_money_order(
 ):
     """Create a Razorpay order for adding money to wallet"""
     try:
-        import razorpay
+        razorpay = integrations.load("razorpay")
+        http = integrations.load("http")
     except ImportError as exc:
         logger.error("Razorpay SDK is not installed", exc_info=True)
         raise HTTPException(
@@ -118,7 +123,7 @@ def create_add_money_order(
             "currency": "INR",
             "key": key_id
         }
-    except requests.exceptions.RequestException as exc:
+    except http.exceptions.RequestException as exc:
         db.rollback()
         logger.error(f"Network error while creating Razorpay order: {str(exc)}", exc_info=True)
         raise HTTPException(
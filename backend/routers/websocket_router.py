@@ -1,6 +1,8 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 from websocket_manager import manager
 from jose import jwt, JWTError
+from services.ride_feed import subscribe_open_rides, unsubscribe_open_rides
+import json
 import os
 from dotenv import load_dotenv
 import logging
@@ -53,7 +55,7 @@ async def websocket_endpoint(
     
     # Connect to manager
     await manager.connect(websocket, user_id)
-    logger.info(f"User {user_id} connected via WebSocket")
+    logger.info("User %s connected via WebSocket", user_id)
     
     try:
         while True:
@@ -63,6 +65,21 @@ async def websocket_endpoint(
             # Handle ping/pong for connection health
             if data == "ping":
                 await websocket.send_json({"type": "pong", "timestamp": __import__('time').time()})
+                continue
+
+            message = _parse_client_message(data)
+            message_type = message.get("type") if message else None
+
+            if message_type == "subscribe_open_rides":
+                if role != "driver":
+                    await websocket.send_json({
+                        "type": "error",
+                        "data": {"detail": "Only drivers can subscribe to the open ride feed"}
+                    })
+                    continue
+                await subscribe_open_rides(websocket, user_id, _parse_resume_from(message))
+            elif message_type == "unsubscribe_open_rides":
+                unsubscribe_open_rides(websocket)
             else:
                 # Echo back with acknowledgment
                 await websocket.send_json({
@@ -73,12 +90,33 @@ async def websocket_endpoint(
                 
     except WebSocketDisconnect:
         manager.disconnect(websocket, user_id)
-        logger.info(f"User {user_id} disconnected from WebSocket")
+        logger.info("User %s disconnected from WebSocket", user_id)
     except Exception as e:
         logger.error(f"WebSocket error for user {user_id}: {str(e)}")
         manager.disconnect(websocket, user_id)
 
 
+def _parse_client_message(data: str):
+    """Decode a JSON control message; plain-text frames are returned as None."""
+    if not data.startswith("{"):
+        return None
+    try:
+        message = json.loads(data)
+    except ValueError:
+        return None
+    return message if isinstance(message, dict) else None
+
+
+def _parse_resume_from(message: dict):
+    """Read ``resume_from`` from either ``data`` (frontend sendMessage shape) or the top level."""
+    payload = message.get("data") if isinstance(message.get("data"), dict) else message
+    resume_from = payload.get("resume_from")
+    try:
+        return int(resume_from) if resume_from is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
 # Helper functions to send events
 async def notify_new_ride(trip_id: str, trip_data: dict):
     """Notify all drivers about a new ride request"""
@@ -87,7 +125,7 @@ async def notify_new_ride(trip_id: str, trip_data: dict):
         "trip_id": trip_id,
         "data": trip_data
     })
-    logger.info(f"Notified drivers about new ride: {trip_id}")
+    logger.info("Notified drivers about new ride: %s", trip_id)
 
 
 async def notify_new_bid(passenger_id: str, bid_data: dict):
@@ -96,7 +134,7 @@ async def notify_new_bid(passenger_id: str, bid_data: dict):
         "type": "new_bid",
         "data": bid_data
     }, passenger_id)
-    logger.debug(f"Notified passenger {passenger_id} about new bid")
+    logger.debug("Notified passenger %s about new bid", passenger_id)
 
 
 async def notify_bid_status_update(driver_id: str, bid_data: dict):
@@ -105,7 +143,7 @@ async def notify_bid_status_update(driver_id: str, bid_data: dict):
         "type": "bid_status_update",
         "data": bid_data
     }, driver_id)
-    logger.debug(f"Notified driver {driver_id} about bid status update")
+    logger.debug("Notified driver %s about bid status update", driver_id)
 
 
 async def notify_ride_status(user_id: str, trip_data: dict):
@@ -114,7 +152,7 @@ async def notify_ride_status(user_id: str, trip_data: dict):
         "type": "ride_status",
         "data": trip_data
     }, user_id)
-    logger.debug(f"Notified user {user_id} about ride status change")
+    logger.debug("Notified user %s about ride status change", user_id)
 
 
 async def notify_trip_started(trip_id: str, user_ids: list):
@@ -126,7 +164,7 @@ async def notify_trip_started(trip_id: str, user_ids: list):
     }
     for user_id in user_ids:
         await manager.send_personal_message(message, user_id)
-    logger.info(f"Notified about trip start: {trip_id}")
+    logger.info("Notified about trip start: %s", trip_id)
 
 
 async def notify_trip_completed(trip_id: str, user_ids: list):
@@ -138,4 +176,4 @@ async def notify_trip_completed(trip_id: str, user_ids: list):
     }
     for user_id in user_ids:
         await manager.send_personal_message(message, user_id)
-    logger.info(f"Notified about trip completion: {trip_id}")
+    logger.info("Notified about trip completion: %s", trip_id)
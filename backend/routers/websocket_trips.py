@@ -9,6 +9,9 @@ from sqlalchemy.orm import Session
 import models
 import json
 from ride_states import normalize_ride_status
+from utils import outbox
+from routers.websocket_router import _parse_resume_from
+from services.bid_feed import subscribe_bids, unsubscribe_bids
 
 load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "change-this-secret-key")
@@ -68,7 +71,7 @@ async def trip_websocket(
     # 3. Connect
     await manager.connect(websocket, user_id)
     await manager.join_trip(websocket, trip_id)
-    logger.info(f"User {user_id} joined trip room {trip_id}")
+    logger.info("User %s joined trip room %s", user_id, trip_id)
     
     try:
         while True:
@@ -108,17 +111,16 @@ async def trip_websocket(
                 new_status = normalize_ride_status(message.get("status"))
                 if is_driver:
                     trip.status = new_status
-                    db.commit()
-                    
-                    # 1. Real-time broadcast
-                    await manager.broadcast_to_trip(trip_id, {
+
+                    # 1. Real-time broadcast and 2. persistent notifications for all
+                    # passengers, committed with the status change and delivered by
+                    # the outbox dispatcher
+                    outbox.enqueue_trip_message(db, trip_id, {
                         "type": "trip_status_update",
                         "status": new_status,
                         "trip_id": trip_id
                     })
-                    
-                    # 2. Persistent notifications for all passengers
-                    from utils.notifications import create_notification
+
                     status_messages = {
                         "arrived": "Your driver has arrived at the pickup location.",
                         "active": "Your trip has started. Have a safe journey!",
@@ -130,25 +132,38 @@ async def trip_websocket(
                     title = f"Trip {new_status.capitalize()}"
                     
                     # Get all passengers for this trip
-                    trip_passengers = db.query(models.Booking).filter(
+                    trip_passengers = db.query(models.Booking.passenger_id).filter(
                         models.Booking.trip_id == trip_id,
                         models.Booking.status == "confirmed"
                     ).all()
                     
-                    for passenger in trip_passengers:
-                        await create_notification(
-                            db,
-                            str(passenger.passenger_id),
-                            title,
-                            msg,
-                            f"trip_{new_status}",
-                            f"/passenger/trips/{trip_id}"
-                        )
+                    outbox.enqueue_notification(
+                        db,
+                        [passenger_id for (passenger_id,) in trip_passengers],
+                        title,
+                        msg,
+                        f"trip_{new_status}",
+                        f"/passenger/trips/{trip_id}"
+                    )
+                    db.commit()
+
+            elif message.get("type") == "subscribe_bids":
+                # Live order book for the trip's passengers (replaces polling GET /bids/{id}/all)
+                if not is_passenger:
+                    await websocket.send_json({
+                        "type": "error",
+                        "data": {"detail": "Only passengers on this trip can subscribe to its bids"}
+                    })
+                    continue
+                await subscribe_bids(websocket, trip_id, _parse_resume_from(message))
+
+            elif message.get("type") == "unsubscribe_bids":
+                unsubscribe_bids(websocket, trip_id)
 
 
     except WebSocketDisconnect:
         manager.disconnect(websocket, user_id)
-        logger.info(f"User {user_id} disconnected from trip {trip_id}")
+        logger.info("User %s disconnected from trip %s", user_id, trip_id)
     except Exception as e:
         logger.error(f"WebSocket error in trip {trip_id}: {str(e)}")
         manager.disconnect(websocket, user_id)
@@ -309,3 +309,19 @@ class NotificationResponse(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
 
+
+class NotificationBroadcastRequest(BaseModel):
+    title: str = Field(..., min_length=1, max_length=255)
+    message: str = Field(..., min_length=1, max_length=2000)
+    type: str = Field("service_alert", min_length=1, max_length=50)
+    link: Optional[str] = Field(None, max_length=255)
+    # Geofence region name; omitted = every user
+    region: Optional[str] = None
+    # Region members are users with a trip starting or ending there this recently
+    active_within_days: int = Field(30, ge=1, le=365)
+
+
+class NotificationBroadcastResponse(BaseModel):
+    recipients: int
+    region: Optional[str] = None
+
@@ -27,6 +27,14 @@ class LocationResponse(BaseModel):
 
 
 # Trip Schemas
+class AutoAcceptRuleCreate(BaseModel):
+    """Accept the first bid at or under max_price from a driver rated at least
+    min_rating, until the deadline (defaults to the trip's start time)."""
+    max_price: float = Field(gt=0)
+    min_rating: Optional[float] = Field(default=None, ge=0, le=5)
+    deadline: Optional[datetime] = None
+
+
 class SharedTripCreate(BaseModel):
     from_location: LocationCreate
     to_location: LocationCreate
@@ -36,6 +44,7 @@ class SharedTripCreate(BaseModel):
     total_price: float = Field(gt=0)
     payment_method: str = Field(default="online", pattern="^(online|cash)$")
     notes: Optional[str] = Field(default=None, max_length=500)
+    auto_accept: Optional[AutoAcceptRuleCreate] = None
 
 
 class PassengerNote(BaseModel):
@@ -90,6 +99,15 @@ class TripResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TripMatchResponse(TripResponse):
+    """A shared ride ranked against a requested pickup/drop-off."""
+    match_score: float
+    pickup_detour_km: float
+    dropoff_detour_km: float
+    departure_offset_minutes: float
+    fare_if_joined: Optional[float] = None
+
+
 class TripCancellationRequest(BaseModel):
     reason: Optional[str] = None
 
@@ -101,12 +119,37 @@ class TripCancellationResponse(BaseModel):
     reason: Optional[str] = None
 
 
+# Seat reservation Schemas
+class SeatHoldResponse(BaseModel):
+    hold_token: UUID
+    trip_id: UUID
+    expires_at: datetime
+    available_seats: int
+
+
+class SeatConfirm(BaseModel):
+    hold_token: UUID
+    notes: Optional[str] = Field(default=None, max_length=500)
+
+
 # Bid Schemas
 class BidCreate(BaseModel):
     amount: float = Field(gt=0)
     message: Optional[str] = Field(default=None, max_length=500)
 
 
+# Rides one POST /bids/batch call may cover
+MAX_BATCH_BIDS = 25
+
+
+class BatchBidItem(BidCreate):
+    ride_id: UUID
+
+
+class BatchBidCreate(BaseModel):
+    bids: List[BatchBidItem] = Field(min_length=1, max_length=MAX_BATCH_BIDS)
+
+
 class BidResponse(BaseModel):
     id: UUID
     trip_id: UUID
@@ -121,6 +164,13 @@ class BidResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class BatchBidResult(BaseModel):
+    """Outcome for one item of a batch, in request order: ``bid`` or ``error``."""
+    ride_id: UUID
+    bid: Optional[BidResponse] = None
+    error: Optional[str] = None
+
+
 class DriverBidWithTrip(BaseModel):
     id: UUID
     trip_id: UUID
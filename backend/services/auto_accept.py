@@ -0,0 +1,59 @@
+"""
+auto_accept – passenger auto-accept rules for trip bids.
+
+A passenger can attach a rule when creating a shared ride: accept the first
+bid at or under ``max_price`` from a driver rated at least ``min_rating``,
+until ``deadline``.  ``bids_router.place_bid`` evaluates the rule inline
+while inserting the bid and, when it matches, accepts through the same
+locked path as ``POST /bids/{id}/accept`` in the same transaction, so the
+trip is matched without the passenger polling or tapping accept.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+import models
+
+
+def build_rule(trip: models.Trip, max_price: float, min_rating: Optional[float], deadline: Optional[datetime]) -> models.AutoAcceptRule:
+    """Rule for *trip*; the deadline never runs past the trip's start time."""
+    if deadline is not None and deadline.tzinfo is not None:
+        # Trip times are stored as naive UTC
+        deadline = deadline.astimezone(timezone.utc).replace(tzinfo=None)
+    return models.AutoAcceptRule(
+        trip_id=trip.id,
+        max_price=Decimal(str(max_price)),
+        min_rating=Decimal(str(min_rating)) if min_rating is not None else None,
+        deadline=min(deadline, trip.start_time) if deadline else trip.start_time,
+    )
+
+
+def qualifies(rule: models.AutoAcceptRule, bid_amount, driver_rating, now: datetime) -> bool:
+    if now > rule.deadline:
+        return False
+    if Decimal(str(bid_amount)) > Decimal(str(rule.max_price)):
+        return False
+    if rule.min_rating is not None:
+        return driver_rating is not None and Decimal(str(driver_rating)) >= Decimal(str(rule.min_rating))
+    return True
+
+
+def matching_rule(db: Session, trip_id, bid_amount, driver_rating, now: Optional[datetime] = None) -> Optional[models.AutoAcceptRule]:
+    """The trip's rule if this bid satisfies it (one primary-key lookup)."""
+    rule = db.get(models.AutoAcceptRule, trip_id)
+    if rule is None or not qualifies(rule, bid_amount, driver_rating, now or datetime.utcnow()):
+        return None
+    return rule
+
+
+def load_rules(db: Session, trip_ids: Iterable) -> Dict:
+    """Rules of several trips keyed by trip id, in one query (batch bidding)."""
+    trip_ids = list(trip_ids)
+    if not trip_ids:
+        return {}
+    rules = db.query(models.AutoAcceptRule).filter(models.AutoAcceptRule.trip_id.in_(trip_ids)).all()
+    return {rule.trip_id: rule for rule in rules}
@@ -0,0 +1,155 @@
+"""
+bid_book – per-trip order book of open driver bids.
+
+The passenger's bid screen polls ``GET /bids/{ride_id}/all``.  Instead of
+running the bids/drivers/users join on every poll, the open bids of a trip
+are loaded once with a single query (walking ``ix_trip_bids_book`` on
+``(trip_id, status, bid_amount)``, so rows arrive already in price order),
+denormalised with the driver's name, rating and avatar, and cached as a
+``BidBook``.  The other orderings are sorted from that snapshot on first
+use and kept with it:
+
+* ``newest``  – most recent first (the endpoint's default),
+* ``price``   – cheapest first, ties by age,
+* ``rating``  – highest-rated driver first, unrated last, ties by price.
+
+Writers call ``invalidate(trip_id)`` after committing a bid change (place,
+counter, accept, cancel).  Books also expire after ``BID_BOOK_TTL_SECONDS``
+so writes from other workers and rating changes show up; like the rate
+limiter the cache is per process and should move to Redis for multi-worker
+deployments.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import false
+from sqlalchemy.orm import Session
+
+import models
+
+BOOK_TTL = float(os.getenv("BID_BOOK_TTL_SECONDS", "10"))
+MAX_BOOKS = int(os.getenv("BID_BOOK_CACHE_SIZE", "5000"))
+
+ORDER_NEWEST = "newest"
+ORDER_PRICE = "price"
+ORDER_RATING = "rating"
+ORDERINGS = (ORDER_NEWEST, ORDER_PRICE, ORDER_RATING)
+
+_SORT_KEYS = {
+    ORDER_NEWEST: lambda entry: (-entry["created_at"].timestamp(),),
+    ORDER_RATING: lambda entry: (
+        entry["driver_rating"] is None,
+        -(entry["driver_rating"] or 0),
+        entry["bid_amount"],
+        entry["created_at"],
+    ),
+}
+
+
+@dataclass
+class BidBook:
+    trip_id: str
+    # Open bids, cheapest first (index order)
+    entries: List[Dict[str, Any]]
+    built_at: float = field(default_factory=time.monotonic)
+    _orderings: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict, repr=False)
+
+    def ordered(self, order: str = ORDER_NEWEST) -> List[Dict[str, Any]]:
+        if order == ORDER_PRICE:
+            return self.entries
+        cached = self._orderings.get(order)
+        if cached is None:
+            cached = self._orderings[order] = sorted(self.entries, key=_SORT_KEYS[order])
+        return cached
+
+    @property
+    def best(self) -> Optional[Dict[str, Any]]:
+        """Top of book: the cheapest open bid."""
+        return self.entries[0] if self.entries else None
+
+
+def book_entry(bid: models.TripBid, user: models.User, driver: models.Driver) -> Dict[str, Any]:
+    return {
+        "id": bid.id,
+        "trip_id": bid.trip_id,
+        "driver_id": bid.driver_id,
+        "bid_amount": bid.bid_amount,
+        "status": bid.status,
+        "message": bid.message,
+        "created_at": bid.created_at,
+        "driver_name": user.full_name,
+        "driver_rating": driver.rating,
+        "driver_avatar": user.avatar_url,
+        "is_counter_bid": bool(bid.is_counter_bid),
+        "parent_bid_id": bid.parent_bid_id,
+    }
+
+
+def load_book(db: Session, trip_id) -> BidBook:
+    """Build a trip's book with one query.
+
+    Passenger counter-offers are excluded: they are actionable by the
+    driver, not on the passenger's screen.
+    """
+    rows = db.query(models.TripBid, models.User, models.Driver).join(
+        models.Driver, models.TripBid.driver_id == models.Driver.user_id
+    ).join(
+        models.User, models.Driver.user_id == models.User.id
+    ).filter(
+        models.TripBid.trip_id == trip_id,
+        models.TripBid.status == "pending",
+        models.TripBid.is_counter_bid == false(),
+    ).order_by(models.TripBid.bid_amount, models.TripBid.created_at).all()
+    return BidBook(str(trip_id), [book_entry(bid, user, driver) for bid, user, driver in rows])
+
+
+class BidBookCache:
+    def __init__(self, ttl: float = BOOK_TTL, max_books: int = MAX_BOOKS):
+        self.ttl = ttl
+        self.max_books = max_books
+        self._books: "OrderedDict[str, BidBook]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; a book loaded across one is not stored
+        self._generation = 0
+
+    def get(self, db: Session, trip_id) -> BidBook:
+        key = str(trip_id)
+        book = self._books.get(key)
+        if book is not None and time.monotonic() - book.built_at < self.ttl:
+            return book
+        generation = self._generation
+        book = load_book(db, trip_id)
+        with self._lock:
+            if generation != self._generation:
+                return book
+            self._books[key] = book
+            self._books.move_to_end(key)
+            while len(self._books) > self.max_books:
+                self._books.popitem(last=False)
+        return book
+
+    def invalidate(self, trip_id):
+        with self._lock:
+            self._generation += 1
+            self._books.pop(str(trip_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._books.clear()
+
+
+cache = BidBookCache()
+
+
+def get_book(db: Session, trip_id) -> BidBook:
+    return cache.get(db, trip_id)
+
+
+def invalidate(trip_id):
+    cache.invalidate(trip_id)
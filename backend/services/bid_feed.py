@@ -0,0 +1,143 @@
+"""
+bid_feed – live order book of a trip's open bids over ``/ws/trips/{trip_id}``.
+
+Replaces passenger polling of ``GET /bids/{ride_id}/all``.  A passenger on
+the trip socket sends::
+
+    {"type": "subscribe_bids", "data": {"resume_from": <seq or null>}}
+
+and receives either a ``bids_snapshot`` (``{"seq", "bids"}``, cheapest
+first, served from the cached ``bid_book``) or, when ``resume_from`` is
+still in the trip's replay buffer, the missed deltas followed by
+``bids_resumed``.  After that the connection gets live deltas, each with the
+trip's next ``seq``:
+
+* ``bid_added``   – ``{"bid": {...}}`` a driver bid or driver counter-offer,
+* ``bid_removed`` – ``{"bid_id", "status"}`` a bid that was countered,
+* ``bids_closed`` – ``{"accepted_bid_id", "driver_id", "bid_amount"}`` the
+  trip stopped taking bids (``accepted_bid_id`` is null on cancel).
+
+Deltas are idempotent by bid id, so one already reflected in the snapshot
+a client just received is harmless.  Every trip has its own sequence and
+ring buffer; feeds for the least recently active trips are dropped beyond
+``BID_FEED_TRIPS``, after which a resuming client gets a fresh snapshot.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from fastapi import WebSocket
+from starlette.concurrency import run_in_threadpool
+
+from database import get_db
+from services import bid_book
+from services.event_feed import SequencedFeed, catch_up
+from utils.json_codec import dumps
+from websocket_manager import manager
+
+logger = logging.getLogger(__name__)
+
+BID_ADDED = "bid_added"
+BID_REMOVED = "bid_removed"
+BIDS_CLOSED = "bids_closed"
+
+FEED_BUFFER = int(os.getenv("BID_FEED_BUFFER", "256"))
+MAX_FEEDS = int(os.getenv("BID_FEED_TRIPS", "5000"))
+
+_feeds: "OrderedDict[str, SequencedFeed]" = OrderedDict()
+_feeds_lock = threading.Lock()
+
+def bid_channel(trip_id) -> str:
+    return f"trip_bids:{trip_id}"
+
+
+def trip_feed(trip_id) -> SequencedFeed:
+    key = str(trip_id)
+    with _feeds_lock:
+        feed = _feeds.get(key)
+        if feed is None:
+            feed = _feeds[key] = SequencedFeed(maxlen=FEED_BUFFER)
+            while len(_feeds) > MAX_FEEDS:
+                _feeds.popitem(last=False)
+        _feeds.move_to_end(key)
+        return feed
+
+
+def serialize_bid(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-ready view of a ``bid_book`` entry."""
+    return {
+        **entry,
+        "id": str(entry["id"]),
+        "trip_id": str(entry["trip_id"]),
+        "driver_id": str(entry["driver_id"]),
+        "bid_amount": float(entry["bid_amount"]),
+        "created_at": entry["created_at"].isoformat() if entry["created_at"] else None,
+        "driver_rating": float(entry["driver_rating"]) if entry["driver_rating"] is not None else None,
+        "parent_bid_id": str(entry["parent_bid_id"]) if entry["parent_bid_id"] else None,
+    }
+
+
+def _to_message(trip_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
+    return {"type": event["type"], "trip_id": trip_id, "data": {"seq": event["seq"], **event["data"]}}
+
+
+async def _publish(trip_id: str, event_type: str, data: Dict[str, Any]) -> None:
+    # No await before the broadcast picks its recipients (see event_feed.catch_up)
+    event = trip_feed(trip_id).append(event_type, data)
+    await manager.broadcast_to_channel(bid_channel(trip_id), _to_message(trip_id, event))
+
+
+def publish_bid_added(bid, user, driver):
+    """Coroutine publishing a new open bid; built now, while the session is usable."""
+    return _publish(str(bid.trip_id), BID_ADDED, {"bid": serialize_bid(bid_book.book_entry(bid, user, driver))})
+
+
+def publish_bid_removed(bid):
+    return _publish(str(bid.trip_id), BID_REMOVED, {"bid_id": str(bid.id), "status": bid.status})
+
+
+def publish_bids_closed(trip_id, accepted_bid=None):
+    data = {"accepted_bid_id": None, "driver_id": None, "bid_amount": None}
+    if accepted_bid is not None:
+        data = {
+            "accepted_bid_id": str(accepted_bid.id),
+            "driver_id": str(accepted_bid.driver_id),
+            "bid_amount": float(accepted_bid.bid_amount),
+        }
+    return _publish(str(trip_id), BIDS_CLOSED, data)
+
+
+def load_bid_snapshot(trip_id: str) -> List[Dict[str, Any]]:
+    db_gen = get_db()
+    db = next(db_gen)
+    try:
+        return [serialize_bid(entry) for entry in bid_book.get_book(db, trip_id).ordered(bid_book.ORDER_PRICE)]
+    finally:
+        db_gen.close()
+
+
+async def subscribe_bids(websocket: WebSocket, trip_id: str, resume_from: Optional[int] = None) -> None:
+    """Catch *websocket* up (snapshot or replay) on a trip's bids and attach it to the live deltas."""
+    feed = trip_feed(trip_id)
+
+    async def send_snapshot(seq: int):
+        bids = await run_in_threadpool(load_bid_snapshot, trip_id)
+        await websocket.send_text(dumps({"type": "bids_snapshot", "trip_id": trip_id, "data": {"seq": seq, "bids": bids}}))
+
+    async def send_event(event: Dict[str, Any]):
+        await websocket.send_text(dumps(_to_message(trip_id, event)))
+
+    async def send_resumed(seq: int, replayed: int):
+        await websocket.send_text(dumps({"type": "bids_resumed", "trip_id": trip_id, "data": {"seq": seq, "replayed": replayed}}))
+
+    await catch_up(feed, resume_from, send_snapshot, send_event, send_resumed)
+    manager.subscribe(websocket, bid_channel(trip_id))
+    logger.debug("Subscribed to bids of trip %s (resume_from=%s)", trip_id, resume_from)
+
+
+def unsubscribe_bids(websocket: WebSocket, trip_id: str) -> None:
+    manager.unsubscribe(websocket, bid_channel(trip_id))
@@ -10,14 +10,14 @@ import logging
 import os
 from typing import Any
 
-import requests
+from services import integrations
 
 logger = logging.getLogger(__name__)
 
 
-def _emailjs_session() -> requests.Session:
+def _emailjs_session():
     """Create a session that ignores broken machine-level proxy settings."""
-    session = requests.Session()
+    session = integrations.load("http").Session()
     session.trust_env = False
     return session
 
@@ -134,6 +134,12 @@ def send_auth_email_via_emailjs(
         "Origin": frontend_url,
     }
 
+    try:
+        requests = integrations.load("http")
+    except ImportError as exc:
+        logger.error("EmailJS background send failed for %s: %s", to_email, exc)
+        return
+
     try:
         logger.info(
             "EmailJS config status before send: %s",
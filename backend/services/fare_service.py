@@ -0,0 +1,25 @@
+"""
+fare_service – per-seat split of a shared trip's total price.
+
+Extracted from rides_router.py and bids_router.py so the rounding rules for
+the dynamic split live in one place and can be benchmarked without a request
+context.  Joining (and bid acceptance) rounds each share down; when someone
+leaves, the remaining riders' share is rounded up so the driver is not
+short-changed, but never exceeds the trip total.
+"""
+from __future__ import annotations
+
+from decimal import Decimal, ROUND_DOWN, ROUND_UP
+
+CENT = Decimal("0.01")
+
+
+def split_fare(total_price, passengers: int) -> Decimal:
+    """Per-seat fare when *passengers* share *total_price* (rounded down)."""
+    return (Decimal(str(total_price)) / Decimal(passengers)).quantize(CENT, rounding=ROUND_DOWN)
+
+
+def split_fare_after_leave(total_price, passengers: int) -> Decimal:
+    """Per-seat fare for the riders left after a leave (rounded up, capped at the total)."""
+    total = Decimal(str(total_price))
+    return min((total / Decimal(passengers)).quantize(CENT, rounding=ROUND_UP), total)
@@ -1,15 +1,32 @@
 """
-Geofence service for Commuto — Charusat service area boundary.
+Geofence service for Commuto — service area boundaries.
 
-Defines a convex polygon around Nadiad, Anand, Petlad, and Vadtal
-(with ~500m buffer) and provides validation helpers used by ride
-creation and future saved-places endpoints.
+Out of the box the service area is a single convex polygon around Nadiad,
+Anand, Petlad, and Vadtal (with ~500m buffer).  Additional cities are added
+by pointing ``GEOFENCE_REGIONS_PATH`` at a GeoJSON file (Feature,
+FeatureCollection, Polygon or MultiPolygon; holes are supported) which then
+replaces the built-in region.
 
-Algorithm: ray-casting point-in-polygon (O(n) per check, n = vertex count).
-Zero external dependencies — pure Python + stdlib math.
+Algorithm: ray-casting point-in-polygon.  Polygons are compiled once into
+``GeofenceEngine``: every ring keeps its bounding box and per-edge
+``(min_lat, max_lat, lat0, lng0, slope)`` tuples, so a lookup is a grid-cell
+lookup, a bbox rejection for most regions and one multiply per candidate
+edge.  ``GeofenceEngine.contains_many`` validates large batches of points
+with NumPy when it is installed (pure Python fallback otherwise).
 """
 
-from typing import List, Tuple
+import json
+import logging
+import math
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is an optional accelerator
+    np = None
+
+logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
 # Service Area Polygon
@@ -41,6 +58,12 @@ CHARUSAT_SERVICE_POLYGON: List[Tuple[float, float]] = [
 ]
 
 SERVICE_AREA_NAME = "Charusat region (Nadiad, Anand, Petlad, Vadtal)"
+SERVICE_AREA_DESCRIPTION = "Commuto geofence — rides must start and end within this boundary."
+
+# Grid cell size (degrees) of the region index; ~55 km at Gujarat's latitude.
+GRID_CELL_DEGREES = 0.5
+# Points per NumPy chunk in contains_many (bounds the edges x points temporaries).
+BATCH_CHUNK_SIZE = 65536
 
 
 # ---------------------------------------------------------------------------
@@ -70,9 +93,249 @@ def _ray_cast_contains(polygon: List[Tuple[float, float]], lat: float, lng: floa
     return inside
 
 
+class _CompiledRing:
+    """A polygon ring with its bounding box and precomputed edge slopes."""
+
+    __slots__ = ("vertices", "min_lat", "max_lat", "min_lng", "max_lng", "edges", "_arrays")
+
+    def __init__(self, vertices: Sequence[Tuple[float, float]]):
+        vertices = [(float(lat), float(lng)) for lat, lng in vertices]
+        if len(vertices) > 1 and vertices[0] == vertices[-1]:
+            vertices = vertices[:-1]
+        if len(vertices) < 3:
+            raise ValueError("A polygon ring needs at least 3 distinct vertices")
+
+        self.vertices = vertices
+        lats = [lat for lat, _ in vertices]
+        lngs = [lng for _, lng in vertices]
+        self.min_lat, self.max_lat = min(lats), max(lats)
+        self.min_lng, self.max_lng = min(lngs), max(lngs)
+
+        # Edge i-j crosses the horizontal through `lat` iff min <= lat < max
+        # (same half-open rule as _ray_cast_contains). Horizontal edges never
+        # cross and are dropped.
+        edges = []
+        j = len(vertices) - 1
+        for i in range(len(vertices)):
+            yi, xi = vertices[i]
+            yj, xj = vertices[j]
+            if yi != yj:
+                edges.append((min(yi, yj), max(yi, yj), yi, xi, (xj - xi) / (yj - yi)))
+            j = i
+        self.edges = tuple(edges)
+        self._arrays = None
+
+    def bbox_contains(self, lat: float, lng: float) -> bool:
+        return self.min_lat <= lat <= self.max_lat and self.min_lng <= lng <= self.max_lng
+
+    def contains(self, lat: float, lng: float) -> bool:
+        if not self.bbox_contains(lat, lng):
+            return False
+        inside = False
+        for lo, hi, y0, x0, slope in self.edges:
+            if lo <= lat < hi and lng < x0 + slope * (lat - y0):
+                inside = not inside
+        return inside
+
+    def contains_many(self, lats, lngs):
+        """NumPy version of :meth:`contains`; returns a boolean array."""
+        if self._arrays is None:
+            self._arrays = tuple(np.array(column, dtype=np.float64)[:, None] for column in zip(*self.edges))
+        lo, hi, y0, x0, slope = self._arrays
+        crossings = (lo <= lats) & (lats < hi) & (lngs < x0 + slope * (lats - y0))
+        return np.logical_xor.reduce(crossings, axis=0)
+
+
+class ServiceArea:
+    """One service region: an outer ring plus optional holes."""
+
+    def __init__(
+        self,
+        name: str,
+        shell: Sequence[Tuple[float, float]],
+        holes: Iterable[Sequence[Tuple[float, float]]] = (),
+        description: Optional[str] = None,
+    ):
+        self.name = name
+        self.description = description
+        self.shell = _CompiledRing(shell)
+        self.holes = tuple(_CompiledRing(hole) for hole in holes)
+
+    @property
+    def bbox(self) -> Tuple[float, float, float, float]:
+        return self.shell.min_lat, self.shell.min_lng, self.shell.max_lat, self.shell.max_lng
+
+    def contains(self, lat: float, lng: float) -> bool:
+        if not self.shell.contains(lat, lng):
+            return False
+        return not any(hole.contains(lat, lng) for hole in self.holes)
+
+    def contains_many(self, lats, lngs):
+        """Boolean NumPy array for point arrays already known to be inside the bbox."""
+        inside = self.shell.contains_many(lats, lngs)
+        for hole in self.holes:
+            if inside.any():
+                inside &= ~hole.contains_many(lats, lngs)
+        return inside
+
+    def to_geojson_feature(self) -> dict:
+        """GeoJSON Feature (RFC 7946, [lng, lat] ordering, closed rings)."""
+        rings = []
+        for ring in (self.shell, *self.holes):
+            coords = [[lng, lat] for lat, lng in ring.vertices]
+            coords.append(coords[0])
+            rings.append(coords)
+        properties = {"name": self.name}
+        if self.description:
+            properties["description"] = self.description
+        return {
+            "type": "Feature",
+            "properties": properties,
+            "geometry": {"type": "Polygon", "coordinates": rings},
+        }
+
+
+class GeofenceEngine:
+    """Compiled set of service areas with a grid index over their bounding boxes."""
+
+    def __init__(self, areas: Sequence[ServiceArea], cell_degrees: float = GRID_CELL_DEGREES):
+        if not areas:
+            raise ValueError("GeofenceEngine needs at least one service area")
+        self.areas = tuple(areas)
+        self._cell = cell_degrees
+        self._grid: Dict[Tuple[int, int], Tuple[int, ...]] = {}
+
+        buckets: Dict[Tuple[int, int], List[int]] = {}
+        for index, area in enumerate(self.areas):
+            min_lat, min_lng, max_lat, max_lng = area.bbox
+            for row in range(self._cell_index(min_lat), self._cell_index(max_lat) + 1):
+                for col in range(self._cell_index(min_lng), self._cell_index(max_lng) + 1):
+                    buckets.setdefault((row, col), []).append(index)
+        self._grid = {cell: tuple(indexes) for cell, indexes in buckets.items()}
+
+    def _cell_index(self, degrees: float) -> int:
+        return math.floor(degrees / self._cell)
+
+    @property
+    def names(self) -> List[str]:
+        return [area.name for area in self.areas]
+
+    def find_area(self, lat: float, lng: float) -> Optional[ServiceArea]:
+        """Return the service area containing (lat, lng), or None."""
+        candidates = self._grid.get((self._cell_index(lat), self._cell_index(lng)), ())
+        for index in candidates:
+            area = self.areas[index]
+            if area.contains(lat, lng):
+                return area
+        return None
+
+    def contains(self, lat: float, lng: float) -> bool:
+        return self.find_area(lat, lng) is not None
+
+    def contains_many(self, lats, lngs):
+        """Validate many points at once.
+
+        Returns a NumPy boolean array when NumPy is available, otherwise a
+        list of booleans.
+        """
+        if np is None:
+            return [self.contains(lat, lng) for lat, lng in zip(lats, lngs)]
+
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        if lats.shape != lngs.shape or lats.ndim != 1:
+            raise ValueError("lats and lngs must be 1-D sequences of equal length")
+
+        result = np.zeros(lats.shape[0], dtype=bool)
+        for start in range(0, lats.shape[0], BATCH_CHUNK_SIZE):
+            chunk_lats = lats[start:start + BATCH_CHUNK_SIZE]
+            chunk_lngs = lngs[start:start + BATCH_CHUNK_SIZE]
+            chunk_result = result[start:start + BATCH_CHUNK_SIZE]
+            for area in self.areas:
+                min_lat, min_lng, max_lat, max_lng = area.bbox
+                candidates = np.flatnonzero(
+                    ~chunk_result
+                    & (chunk_lats >= min_lat) & (chunk_lats <= max_lat)
+                    & (chunk_lngs >= min_lng) & (chunk_lngs <= max_lng)
+                )
+                if candidates.size:
+                    chunk_result[candidates] = area.contains_many(chunk_lats[candidates], chunk_lngs[candidates])
+        return result
+
+    # -- construction -------------------------------------------------------
+
+    @classmethod
+    def from_geojson(cls, data: dict, default_name: str = "Service area") -> "GeofenceEngine":
+        """Build an engine from a GeoJSON Feature, FeatureCollection or geometry."""
+        areas: List[ServiceArea] = []
+
+        def add_geometry(geometry: dict, name: str, description: Optional[str]):
+            geometry_type = geometry.get("type")
+            if geometry_type == "Polygon":
+                polygons = [geometry["coordinates"]]
+            elif geometry_type == "MultiPolygon":
+                polygons = geometry["coordinates"]
+            else:
+                raise ValueError(f"Unsupported geofence geometry type: {geometry_type}")
+            for rings in polygons:
+                shell, *holes = [[(lat, lng) for lng, lat, *_ in ring] for ring in rings]
+                areas.append(ServiceArea(name, shell, holes, description))
+
+        data_type = data.get("type")
+        features = data.get("features", []) if data_type == "FeatureCollection" else [data]
+        for position, feature in enumerate(features, start=1):
+            if feature.get("type") == "Feature":
+                properties = feature.get("properties") or {}
+                name = properties.get("name") or f"{default_name} {position}"
+                add_geometry(feature["geometry"], name, properties.get("description"))
+            else:
+                add_geometry(feature, f"{default_name} {position}", None)
+        return cls(areas)
+
+    @classmethod
+    def from_file(cls, path: str) -> "GeofenceEngine":
+        with open(path, encoding="utf-8") as fh:
+            return cls.from_geojson(json.load(fh))
+
+
+def _build_default_engine() -> GeofenceEngine:
+    path = os.getenv("GEOFENCE_REGIONS_PATH")
+    if path:
+        engine = GeofenceEngine.from_file(path)
+        logger.info(f"Loaded {len(engine.areas)} geofence region(s) from {path}")
+        return engine
+    return GeofenceEngine([
+        ServiceArea(SERVICE_AREA_NAME, CHARUSAT_SERVICE_POLYGON, description=SERVICE_AREA_DESCRIPTION)
+    ])
+
+
+_engine: Optional[GeofenceEngine] = None
+
+
+def get_geofence_engine() -> GeofenceEngine:
+    """Return the process-wide engine, compiling it on first use."""
+    global _engine
+    if _engine is None:
+        _engine = _build_default_engine()
+    return _engine
+
+
+def set_geofence_engine(engine: Optional[GeofenceEngine]) -> None:
+    """Swap the process-wide engine (None re-reads the configuration on next use)."""
+    global _engine
+    _engine = engine
+
+
 def is_inside_service_area(lat: float, lng: float) -> bool:
-    """Check whether a single coordinate falls within the Charusat service area."""
-    return _ray_cast_contains(CHARUSAT_SERVICE_POLYGON, lat, lng)
+    """Check whether a single coordinate falls within any service area."""
+    return get_geofence_engine().contains(lat, lng)
+
+
+def _describe_service_areas(engine: GeofenceEngine) -> str:
+    names = engine.names
+    if len(names) == 1:
+        return f"the {names[0]}"
+    return ", ".join(names[:-1]) + f" and {names[-1]}"
 
 
 def validate_ride_coordinates(
@@ -86,8 +349,9 @@ def validate_ride_coordinates(
     Raises ``ValueError`` with a user-friendly message when one or both
     coordinates fall outside the polygon.
     """
-    origin_ok = is_inside_service_area(origin_lat, origin_lng)
-    dest_ok = is_inside_service_area(dest_lat, dest_lng)
+    engine = get_geofence_engine()
+    origin_ok = engine.contains(origin_lat, origin_lng)
+    dest_ok = engine.contains(dest_lat, dest_lng)
 
     if origin_ok and dest_ok:
         return
@@ -104,7 +368,7 @@ def validate_ride_coordinates(
 
     raise ValueError(
         f"{point_label} {verb} outside Commuto's service area. "
-        f"Commuto currently operates only within the {SERVICE_AREA_NAME}."
+        f"Commuto currently operates only within {_describe_service_areas(engine)}."
     )
 
 
@@ -113,22 +377,13 @@ def validate_ride_coordinates(
 # ---------------------------------------------------------------------------
 
 def get_service_area_geojson() -> dict:
-    """Return the service polygon as a GeoJSON Feature (RFC 7946).
+    """Return the service area(s) as GeoJSON (RFC 7946).
 
+    A single region is returned as a Feature (the original response shape);
+    multiple regions as a FeatureCollection.
     Note: GeoJSON uses [longitude, latitude] ordering.
     """
-    # Close the ring by repeating the first vertex at the end
-    coords = [[lng, lat] for lat, lng in CHARUSAT_SERVICE_POLYGON]
-    coords.append(coords[0])
-
-    return {
-        "type": "Feature",
-        "properties": {
-            "name": SERVICE_AREA_NAME,
-            "description": "Commuto geofence — rides must start and end within this boundary.",
-        },
-        "geometry": {
-            "type": "Polygon",
-            "coordinates": [coords],
-        },
-    }
+    features = [area.to_geojson_feature() for area in get_geofence_engine().areas]
+    if len(features) == 1:
+        return features[0]
+    return {"type": "FeatureCollection", "features": features}
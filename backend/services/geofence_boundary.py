@@ -0,0 +1,161 @@
+"""
+geofence_boundary – pre-encoded GeoJSON payloads for ``GET /geofence/boundary``.
+
+The boundary only changes when the geofence configuration does, so the
+response bodies are built once (at startup, via ``warm_boundary_cache``)
+and served as bytes.  For every zoom bucket the rings are simplified with
+Douglas–Peucker at roughly one screen pixel of tolerance, encoded, gzipped
+and hashed into strong ETags; a map client only ever costs a dict lookup.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import math
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from services.geofence import GeofenceEngine, get_geofence_engine
+from utils.json_codec import dumps_bytes
+
+# Highest zoom served by each simplification level; None is the full polygon.
+ZOOM_LEVELS: Tuple[Optional[int], ...] = (5, 8, 11, 14, None)
+# Tolerance in screen pixels (256px tiles) used to derive the degree tolerance.
+PIXEL_TOLERANCE = 1.0
+# ~0.1 m of precision is plenty for a service-area overlay.
+COORDINATE_PRECISION = 6
+
+
+@dataclass(frozen=True)
+class BoundaryPayload:
+    body: bytes
+    gzipped: bytes
+    etag: str
+    gzip_etag: str
+    max_zoom: Optional[int]
+
+
+def zoom_tolerance(zoom: int) -> float:
+    """Degrees covered by PIXEL_TOLERANCE screen pixels at *zoom*."""
+    return 360.0 / (256 * 2 ** zoom) * PIXEL_TOLERANCE
+
+
+def _perpendicular_distance(point, start, end) -> float:
+    (py, px), (sy, sx), (ey, ex) = point, start, end
+    dx, dy = ex - sx, ey - sy
+    if dx == 0 and dy == 0:
+        return math.hypot(px - sx, py - sy)
+    return abs(dy * px - dx * py + ex * sy - ey * sx) / math.hypot(dx, dy)
+
+
+def douglas_peucker(points: Sequence[Tuple[float, float]], tolerance: float) -> List[Tuple[float, float]]:
+    """Simplify an open polyline, keeping both endpoints (iterative, no recursion limit)."""
+    if len(points) < 3:
+        return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        max_distance, index = 0.0, None
+        for i in range(first + 1, last):
+            distance = _perpendicular_distance(points[i], points[first], points[last])
+            if distance > max_distance:
+                max_distance, index = distance, i
+        if index is not None and max_distance > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def simplify_ring(vertices: Sequence[Tuple[float, float]], tolerance: float) -> List[Tuple[float, float]]:
+    """Simplify a closed ring (open vertex list), never below a triangle."""
+    if tolerance <= 0 or len(vertices) <= 3:
+        return list(vertices)
+    # Split at the vertex farthest from the first one so both halves are open polylines.
+    origin = vertices[0]
+    split = max(range(1, len(vertices)), key=lambda i: math.hypot(
+        vertices[i][0] - origin[0], vertices[i][1] - origin[1]
+    ))
+    first_half = douglas_peucker(list(vertices[:split + 1]), tolerance)
+    second_half = douglas_peucker(list(vertices[split:]) + [origin], tolerance)
+    simplified = first_half[:-1] + second_half[:-1]
+    return simplified if len(simplified) >= 3 else list(vertices)
+
+
+def _ring_coordinates(vertices: Sequence[Tuple[float, float]]) -> List[List[float]]:
+    coords = [[round(lng, COORDINATE_PRECISION), round(lat, COORDINATE_PRECISION)] for lat, lng in vertices]
+    coords.append(coords[0])
+    return coords
+
+
+def build_boundary_geojson(engine: GeofenceEngine, tolerance: float = 0.0) -> dict:
+    """GeoJSON for all service areas, rings simplified to *tolerance* degrees."""
+    features = []
+    for area in engine.areas:
+        rings = [
+            _ring_coordinates(simplify_ring(ring.vertices, tolerance))
+            for ring in (area.shell, *area.holes)
+        ]
+        properties = {"name": area.name}
+        if area.description:
+            properties["description"] = area.description
+        features.append({
+            "type": "Feature",
+            "properties": properties,
+            "geometry": {"type": "Polygon", "coordinates": rings},
+        })
+    if len(features) == 1:
+        return features[0]
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _encode_payload(geojson: dict, max_zoom: Optional[int]) -> BoundaryPayload:
+    body = dumps_bytes(geojson)
+    gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    return BoundaryPayload(
+        body=body,
+        gzipped=gzipped,
+        etag=f'"{digest}"',
+        gzip_etag=f'"{digest}-gz"',
+        max_zoom=max_zoom,
+    )
+
+
+def build_boundary_payloads(engine: GeofenceEngine) -> Dict[Optional[int], BoundaryPayload]:
+    payloads = {}
+    for max_zoom in ZOOM_LEVELS:
+        tolerance = zoom_tolerance(max_zoom) if max_zoom is not None else 0.0
+        payloads[max_zoom] = _encode_payload(build_boundary_geojson(engine, tolerance), max_zoom)
+    return payloads
+
+
+_cache_lock = threading.Lock()
+_cached_engine: Optional[GeofenceEngine] = None
+_cached_payloads: Dict[Optional[int], BoundaryPayload] = {}
+
+
+def warm_boundary_cache() -> Dict[Optional[int], BoundaryPayload]:
+    """(Re)build payloads if the active geofence engine changed; cheap otherwise."""
+    global _cached_engine, _cached_payloads
+    engine = get_geofence_engine()
+    if engine is _cached_engine:
+        return _cached_payloads
+    with _cache_lock:
+        if engine is not _cached_engine:
+            _cached_payloads = build_boundary_payloads(engine)
+            _cached_engine = engine
+    return _cached_payloads
+
+
+def get_boundary_payload(zoom: Optional[int] = None) -> BoundaryPayload:
+    """Pre-encoded payload for the coarsest level that still looks exact at *zoom*."""
+    payloads = warm_boundary_cache()
+    if zoom is not None:
+        for max_zoom in ZOOM_LEVELS:
+            if max_zoom is not None and zoom <= max_zoom:
+                return payloads[max_zoom]
+    return payloads[None]
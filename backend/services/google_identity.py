@@ -0,0 +1,204 @@
+"""
+google_identity – local verification of Google ID tokens.
+
+``google.oauth2.id_token.verify_oauth2_token`` downloads Google's signing
+certificates on every call.  Here the keys (JWKS) are kept in process:
+
+* ``GoogleKeyCache`` holds the keys by ``kid`` until the ``Cache-Control``
+  max-age Google sent with them runs out,
+* ``GoogleKeyRefresher`` (started from ``main.lifespan`` when
+  ``GOOGLE_CLIENT_ID`` is set) re-fetches them shortly before that, so a
+  login only does a dict lookup plus an RS256 signature check,
+* a token signed with an unknown ``kid`` (key rotation) triggers one
+  synchronous re-fetch, at most every ``MIN_REFETCH_SECONDS``.
+
+If a fetch fails, the expired keys keep being served so a Google outage
+does not lock users out.
+
+The key source is pluggable: anything with a ``fetch()`` returning
+``(keys_by_kid, max_age_seconds)`` works; tests install a local fake with
+``set_key_source``.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional, Protocol, Tuple
+
+from anyio import to_thread
+from jose import JWTError, jwt
+
+from services import integrations
+from utils.metrics import GOOGLE_JWKS_FETCHES
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+DEFAULT_MAX_AGE = 3600
+MIN_REFETCH_SECONDS = 30
+REFRESH_MARGIN = int(os.getenv("GOOGLE_JWKS_REFRESH_MARGIN_SECONDS", "300"))
+RETRY_SECONDS = 60
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def parse_max_age(cache_control: Optional[str]) -> Optional[int]:
+    match = _MAX_AGE_RE.search(cache_control or "")
+    return int(match.group(1)) if match else None
+
+
+class KeySource(Protocol):
+    def fetch(self) -> Tuple[Dict[str, Dict[str, Any]], Optional[int]]:
+        """Return the JWKs by ``kid`` and how many seconds they may be cached."""
+
+
+class HttpKeySource:
+    """Google's JWKS endpoint."""
+
+    def __init__(self, url: str = GOOGLE_CERTS_URL, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self):
+        response = integrations.load("http").get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        keys = {key["kid"]: key for key in response.json().get("keys", []) if "kid" in key}
+        return keys, parse_max_age(response.headers.get("Cache-Control"))
+
+
+class GoogleKeyCache:
+    def __init__(self, source: KeySource, clock=time.monotonic):
+        self.source = source
+        self.clock = clock
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._expires_at = 0.0
+        self._last_fetch = float("-inf")
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Fetch the key set now; raises if the source fails."""
+        self._last_fetch = self.clock()
+        try:
+            keys, max_age = self.source.fetch()
+        except Exception:
+            GOOGLE_JWKS_FETCHES.inc("error")
+            raise
+        GOOGLE_JWKS_FETCHES.inc("ok")
+        self._keys = keys
+        self._expires_at = self.clock() + (DEFAULT_MAX_AGE if max_age is None else max_age)
+
+    def seconds_until_expiry(self) -> float:
+        return self._expires_at - self.clock()
+
+    def get_key(self, kid: str) -> Dict[str, Any]:
+        key = self._keys.get(kid)
+        if key is not None and self.seconds_until_expiry() > 0:
+            return key
+        with self._lock:
+            key = self._keys.get(kid)
+            if key is None or self.seconds_until_expiry() <= 0:
+                # At most one fetch per MIN_REFETCH_SECONDS, so junk kids or a
+                # Google outage cannot turn every login into an outbound request
+                if self.clock() - self._last_fetch >= MIN_REFETCH_SECONDS:
+                    try:
+                        self.refresh()
+                    except Exception as exc:
+                        logger.warning("Google signing key fetch failed, using cached keys: %s", exc)
+                key = self._keys.get(kid)
+        if key is None:
+            raise ValueError(f"Unknown Google signing key: {kid}")
+        return key
+
+
+def verify_with_cache(cache: GoogleKeyCache, token: str, audience: Optional[str]) -> Dict[str, Any]:
+    """Verify an ID token's signature, issuer, expiry and audience; return its claims.
+
+    Raises ``ValueError`` for any invalid token, like ``verify_oauth2_token``.
+    """
+    try:
+        header = jwt.get_unverified_header(token)
+        key = cache.get_key(header.get("kid", ""))
+        return jwt.decode(
+            token,
+            key,
+            algorithms=["RS256"],
+            audience=audience,
+            issuer=GOOGLE_ISSUERS,
+            options={"verify_aud": audience is not None, "verify_at_hash": False},
+        )
+    except JWTError as exc:
+        raise ValueError(str(exc)) from exc
+
+
+_cache = GoogleKeyCache(HttpKeySource())
+
+
+def set_key_source(source: KeySource) -> GoogleKeyCache:
+    """Swap the key source (and start from an empty cache)."""
+    global _cache
+    _cache = GoogleKeyCache(source)
+    return _cache
+
+
+def key_cache() -> GoogleKeyCache:
+    return _cache
+
+
+def verify_id_token(token: str, audience: Optional[str]) -> Dict[str, Any]:
+    return verify_with_cache(_cache, token, audience)
+
+
+class GoogleKeyRefresher:
+    """Keeps the key cache warm: fetch at startup, then ahead of each expiry."""
+
+    def __init__(self, cache: GoogleKeyCache, margin: float = REFRESH_MARGIN):
+        self.cache = cache
+        self.margin = margin
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run(), name="google-jwks-refresher")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await to_thread.run_sync(self.cache.refresh)
+                delay = max(self.cache.seconds_until_expiry() - self.margin, MIN_REFETCH_SECONDS)
+            except Exception as exc:
+                logger.warning("Google signing key refresh failed: %s", exc)
+                delay = RETRY_SECONDS
+            await asyncio.sleep(delay)
+
+
+_refresher: Optional[GoogleKeyRefresher] = None
+
+
+async def start_refresher() -> GoogleKeyRefresher:
+    global _refresher
+    if _refresher is not None:
+        await _refresher.stop()
+    _refresher = GoogleKeyRefresher(_cache)
+    await _refresher.start()
+    return _refresher
+
+
+async def stop_refresher():
+    global _refresher
+    refresher, _refresher = _refresher, None
+    if refresher is not None:
+        await refresher.stop()
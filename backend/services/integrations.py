@@ -0,0 +1,58 @@
+"""
+integrations – optional third-party SDKs, imported on first use.
+
+Razorpay (wallet top-ups), Twilio (phone OTP SMS) and ``requests``
+(EmailJS, Google token info and signing keys) are used by a handful of
+endpoints and background tasks. Importing them when ``main`` loads added
+a couple of hundred milliseconds to every worker boot and test session.
+Callers ask the registry for the module at the point of use::
+
+    razorpay = integrations.load("razorpay")
+
+``load`` imports the module on the first call; later calls are a dict
+lookup. A package that is not installed raises ``IntegrationUnavailable``.
+It is an ``ImportError``, so existing "dependency missing" handling keeps
+working. ``tests/bench/bench_import_time.py`` fails if importing ``main``
+pulls any of these in again.
+"""
+from __future__ import annotations
+
+import importlib
+import threading
+from types import ModuleType
+from typing import Dict
+
+# Registry name -> module to import
+INTEGRATIONS: Dict[str, str] = {
+    "razorpay": "razorpay",
+    "twilio": "twilio.rest",
+    "http": "requests",
+}
+
+_loaded: Dict[str, ModuleType] = {}
+_lock = threading.Lock()
+
+
+class IntegrationUnavailable(ImportError):
+    pass
+
+
+def load(name: str) -> ModuleType:
+    """Import (once) and return the module registered as *name*."""
+    module = _loaded.get(name)
+    if module is not None:
+        return module
+    with _lock:
+        if name not in _loaded:
+            try:
+                _loaded[name] = importlib.import_module(INTEGRATIONS[name])
+            except ImportError as exc:
+                raise IntegrationUnavailable(
+                    f"{INTEGRATIONS[name]} is not installed (needed for the {name} integration)"
+                ) from exc
+        return _loaded[name]
+
+
+def loaded() -> Dict[str, bool]:
+    """Which integrations have been imported so far (for /health-style debugging)."""
+    return {name: name in _loaded for name in INTEGRATIONS}
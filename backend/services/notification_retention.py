@@ -0,0 +1,339 @@
+"""
+notification_retention – TTL purging and optional monthly partitioning.
+
+TTLs come from ``NOTIFICATION_TTL_DAYS``, a comma-separated ``type=days``
+list with a ``default`` entry for every other type, e.g.::
+
+    NOTIFICATION_TTL_DAYS=default=90,new_bid=14,counter_bid=14,service_alert=30
+
+``purge_expired`` deletes expired rows in small batches, one short
+transaction each.  On PostgreSQL each batch is::
+
+    DELETE FROM notifications WHERE ctid IN (
+        SELECT ctid FROM notifications WHERE type = :type AND created_at < :cutoff LIMIT :n
+    ) RETURNING user_id, is_read
+
+so no batch holds locks on more than ``n`` rows.  A partitioned table uses
+``(tableoid, ctid)``; other databases use the primary key.  The returned rows are used to adjust the
+cached unread counters.
+
+With ``NOTIFICATION_PARTITIONING=1`` on PostgreSQL, the table can be
+converted once (``python -m services.notification_retention --partition``)
+into a parent partitioned by month on ``created_at``.  The worker then keeps
+future partitions created and drops whole partitions older than the
+longest TTL instead of deleting row by row.
+
+The worker also deletes dispatched ``outbox_events`` rows older than
+``OUTBOX_RETENTION_DAYS`` (``utils.outbox.purge_dispatched``).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Callable, ContextManager, Dict, List, Optional, Tuple
+
+from anyio import to_thread
+from sqlalchemy import Boolean, column, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from utils import outbox
+from utils.unread_counts import cache as unread_count_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_DAYS = 90
+PURGE_BATCH_SIZE = int(os.getenv("NOTIFICATION_PURGE_BATCH_SIZE", "5000"))
+PURGE_PAUSE = int(os.getenv("NOTIFICATION_PURGE_PAUSE_MS", "50")) / 1000
+PURGE_INTERVAL = int(os.getenv("NOTIFICATION_PURGE_INTERVAL_SECONDS", "3600"))
+PARTITIONING = os.getenv("NOTIFICATION_PARTITIONING", "0") == "1"
+PARTITIONS_AHEAD = 2
+
+
+def parse_ttls(spec: Optional[str] = None) -> Dict[str, int]:
+    """``"default=90,new_bid=14"`` -> ``{"default": 90, "new_bid": 14}``."""
+    spec = os.getenv("NOTIFICATION_TTL_DAYS", "") if spec is None else spec
+    ttls = {"default": DEFAULT_TTL_DAYS}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, days = item.partition("=")
+        if not days:
+            raise ValueError(f"Invalid NOTIFICATION_TTL_DAYS entry '{item}' (expected type=days)")
+        ttls[name.strip()] = int(days)
+    return ttls
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _batch_delete_sql(row_ref: str, type_clause: str) -> str:
+    return (
+        f"DELETE FROM notifications WHERE {row_ref} IN ("
+        f"SELECT {row_ref.strip('()')} FROM notifications WHERE {type_clause} AND created_at < :cutoff LIMIT :batch"
+        f") RETURNING user_id, is_read"
+    )
+
+
+def purge_expired(
+    db: Session,
+    ttls: Optional[Dict[str, int]] = None,
+    batch_size: int = PURGE_BATCH_SIZE,
+    pause: float = PURGE_PAUSE,
+    now: Optional[datetime] = None,
+    max_batches: Optional[int] = None,
+) -> Dict[str, int]:
+    """Delete notifications past their type's TTL; returns rows deleted per type."""
+    ttls = ttls or parse_ttls()
+    now = now or datetime.utcnow()
+    if _is_postgres(db):
+        # ctid is only unique within one physical table; qualify it by partition
+        row_ref = "(tableoid, ctid)" if is_partitioned(db.connection()) else "ctid"
+    else:
+        row_ref = "id"
+    explicit = sorted(name for name in ttls if name != "default")
+
+    plans: List[Tuple[str, str, dict]] = []
+    for name in explicit:
+        plans.append((name, "type = :type", {"type": name, "cutoff": now - timedelta(days=ttls[name])}))
+    if explicit:
+        placeholders = ", ".join(f":t{i}" for i in range(len(explicit)))
+        params = {f"t{i}": name for i, name in enumerate(explicit)}
+        plans.append(("default", f"type NOT IN ({placeholders})", {**params, "cutoff": now - timedelta(days=ttls["default"])}))
+    else:
+        plans.append(("default", "1 = 1", {"cutoff": now - timedelta(days=ttls["default"])}))
+
+    deleted: Dict[str, int] = {}
+    batches = 0
+    for name, type_clause, params in plans:
+        statement = text(_batch_delete_sql(row_ref, type_clause)).columns(
+            column("user_id", UUID(as_uuid=True)), column("is_read", Boolean)
+        )
+        total = 0
+        while max_batches is None or batches < max_batches:
+            rows = db.execute(statement, {**params, "batch": batch_size}).all()
+            db.commit()
+            batches += 1
+            for user_id, is_read in rows:
+                if not is_read:
+                    unread_count_cache.decr(user_id)
+            total += len(rows)
+            if len(rows) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+        if total:
+            deleted[name] = total
+    if deleted:
+        logger.info("Purged expired notifications: %s", deleted)
+    return deleted
+
+
+# ── Monthly partitioning (PostgreSQL) ──────────────────────────────────────
+
+def _month_start(moment: datetime) -> datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(moment: datetime, months: int) -> datetime:
+    month_index = moment.month - 1 + months
+    return moment.replace(year=moment.year + month_index // 12, month=month_index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"notifications_{month:%Y_%m}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    return conn.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = 'notifications')"
+    )).scalar()
+
+
+def ensure_partitions(conn: Connection, now: Optional[datetime] = None, ahead: int = PARTITIONS_AHEAD) -> List[str]:
+    """Create this month's and the next *ahead* monthly partitions if missing."""
+    current = _month_start(now or datetime.utcnow())
+    created = []
+    for offset in range(ahead + 1):
+        start = _add_months(current, offset)
+        name = partition_name(start)
+        exists = conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+        if not exists:
+            conn.execute(text(
+                f"CREATE TABLE {name} PARTITION OF notifications "
+                f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{_add_months(start, 1):%Y-%m-%d}')"
+            ))
+            created.append(name)
+    return created
+
+
+def drop_expired_partitions(conn: Connection, keep_days: int, now: Optional[datetime] = None) -> List[str]:
+    """Drop monthly partitions whose newest possible row is older than *keep_days*."""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=keep_days)
+    dropped = []
+    rows = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'notifications' AND c.relname LIKE 'notifications\\_%' ORDER BY c.relname"
+    )).scalars()
+    for name in rows:
+        try:
+            month = datetime.strptime(name, "notifications_%Y_%m")
+        except ValueError:
+            continue
+        if _add_months(month, 1) <= cutoff:
+            conn.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    return dropped
+
+
+def convert_to_partitioned(conn: Connection, now: Optional[datetime] = None):
+    """One-off: rebuild ``notifications`` as a monthly range-partitioned table.
+
+    Takes an exclusive lock while rows are copied; run in a maintenance window.
+    """
+    if is_partitioned(conn):
+        return
+    oldest = conn.execute(text("SELECT min(created_at) FROM notifications")).scalar()
+    conn.execute(text("LOCK TABLE notifications IN ACCESS EXCLUSIVE MODE"))
+    conn.execute(text("ALTER TABLE notifications RENAME TO notifications_unpartitioned"))
+    # RENAME keeps the index (and primary key) names, which the new table needs
+    for (index,) in conn.execute(text(
+        "SELECT indexname FROM pg_indexes "
+        "WHERE schemaname = current_schema() AND tablename = 'notifications_unpartitioned'"
+    )).all():
+        conn.execute(text(f'ALTER INDEX "{index}" RENAME TO "{index[:49]}_unpartitioned"'))
+    conn.execute(text(
+        "CREATE TABLE notifications ("
+        " id UUID NOT NULL,"
+        " user_id UUID NOT NULL REFERENCES users(id),"
+        " title VARCHAR(255) NOT NULL,"
+        " message TEXT NOT NULL,"
+        " type VARCHAR(50) NOT NULL,"
+        " link VARCHAR(255),"
+        " is_read BOOLEAN DEFAULT false,"
+        " created_at TIMESTAMP NOT NULL DEFAULT (now() at time zone 'utc'),"
+        " PRIMARY KEY (id, created_at)"
+        ") PARTITION BY RANGE (created_at)"
+    ))
+    conn.execute(text("CREATE INDEX ix_notifications_user_created ON notifications (user_id, created_at)"))
+    conn.execute(text("CREATE INDEX ix_notifications_type_created ON notifications (type, created_at)"))
+    conn.execute(text("CREATE INDEX ix_notifications_unread_user ON notifications (user_id) WHERE is_read = false"))
+    current = _month_start(now or datetime.utcnow())
+    month = _month_start(oldest) if oldest else current
+    months = 0
+    while month < current:
+        month = _add_months(month, 1)
+        months += 1
+    ensure_partitions(conn, now=_add_months(current, -months), ahead=months + PARTITIONS_AHEAD)
+    conn.execute(text(
+        "INSERT INTO notifications (id, user_id, title, message, type, link, is_read, created_at) "
+        "SELECT id, user_id, title, message, type, link, coalesce(is_read, false), "
+        "coalesce(created_at, now() at time zone 'utc') FROM notifications_unpartitioned"
+    ))
+    conn.execute(text("DROP TABLE notifications_unpartitioned"))
+
+
+def maintain_partitions(db: Session, ttls: Optional[Dict[str, int]] = None) -> Dict[str, List[str]]:
+    """Create upcoming partitions and drop ones past the longest TTL (no-op unless partitioned)."""
+    if not (PARTITIONING and _is_postgres(db)):
+        return {}
+    conn = db.connection()
+    if not is_partitioned(conn):
+        return {}
+    ttls = ttls or parse_ttls()
+    result = {
+        "created": ensure_partitions(conn),
+        "dropped": drop_expired_partitions(conn, max(ttls.values())),
+    }
+    db.commit()
+    if result["dropped"]:
+        # Dropped partitions may have held unread rows
+        unread_count_cache.clear()
+        logger.info("Dropped expired notification partitions: %s", result["dropped"])
+    return result
+
+
+class RetentionWorker:
+    """Background task: partition upkeep, batched TTL purge and outbox cleanup, every interval."""
+
+    def __init__(self, session_scope: Callable[[], ContextManager[Session]], interval: float = PURGE_INTERVAL):
+        self.session_scope = session_scope
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run(), name="notification-retention")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def run_once(self) -> Dict[str, int]:
+        with self.session_scope() as db:
+            maintain_partitions(db)
+            deleted = purge_expired(db)
+            outbox.purge_dispatched(db)
+            return deleted
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await to_thread.run_sync(self.run_once)
+            except Exception as exc:
+                logger.error("Notification retention run failed: %s", exc)
+
+
+_worker: Optional[RetentionWorker] = None
+
+
+async def start_worker(session_scope: Callable[[], ContextManager[Session]] = SessionLocal) -> RetentionWorker:
+    global _worker
+    if _worker is not None:
+        await _worker.stop()
+    _worker = RetentionWorker(session_scope)
+    await _worker.start()
+    return _worker
+
+
+async def stop_worker():
+    global _worker
+    worker, _worker = _worker, None
+    if worker is not None:
+        await worker.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Notification retention maintenance")
+    parser.add_argument("--partition", action="store_true", help="convert notifications to monthly partitions (PostgreSQL)")
+    parser.add_argument("--purge", action="store_true", help="run one batched TTL purge now")
+    args = parser.parse_args(argv)
+
+    from database import engine
+
+    if args.partition:
+        if engine.dialect.name != "postgresql":
+            raise SystemExit("Partitioning requires PostgreSQL")
+        with engine.begin() as conn:
+            convert_to_partitioned(conn)
+        print("notifications is now partitioned by month")
+    if args.purge:
+        with SessionLocal() as db:
+            print(purge_expired(db))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+ride_expiry – cancel pending rides whose start time has passed.
+
+This used to run as a lazy UPDATE at the top of ``GET /rides/available``,
+``/rides/open`` and ``/rides/my-trips``, putting a write on the primary in
+front of every listing read.  ``RideExpiryWorker`` now runs the same UPDATE
+every ``RIDE_EXPIRY_INTERVAL_SECONDS`` from ``main.lifespan`` and removes the
+cancelled rides from the open-ride feed.  The listing queries already filter
+on ``start_time``, so a ride never shows up as bookable between runs.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Callable, ContextManager, List, Optional
+
+from anyio import to_thread
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+import models
+from database import SessionLocal
+from services.ride_feed import RIDE_REMOVED, publish_ride_event
+
+logger = logging.getLogger(__name__)
+
+EXPIRY_INTERVAL = float(os.getenv("RIDE_EXPIRY_INTERVAL_SECONDS", "60"))
+
+
+def cancel_expired(db: Session, now: Optional[datetime] = None) -> List:
+    """Cancel pending rides that started before *now*; commits.  Returns their ids."""
+    now = now or datetime.utcnow()
+    cancelled = db.execute(
+        update(models.Trip)
+        .where(models.Trip.status == "pending", models.Trip.start_time < now)
+        .values(status="cancelled")
+        .returning(models.Trip.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+    return cancelled
+
+
+class RideExpiryWorker:
+    """Background task: cancel expired rides every ``RIDE_EXPIRY_INTERVAL_SECONDS``."""
+
+    def __init__(self, session_scope: Callable[[], ContextManager[Session]], interval: float = EXPIRY_INTERVAL):
+        self.session_scope = session_scope
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run(), name="ride-expiry")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def run_once(self) -> List:
+        """Cancel expired rides; returns the open-ride feed removals to publish."""
+        with self.session_scope() as db:
+            cancelled = cancel_expired(db)
+            if not cancelled:
+                return []
+            logger.info("Cancelled %d pending rides past their start time", len(cancelled))
+            trips = db.query(models.Trip).filter(models.Trip.id.in_(cancelled)).all()
+            return [publish_ride_event(RIDE_REMOVED, trip) for trip in trips]
+
+    async def _run(self):
+        while True:
+            try:
+                for publish in await to_thread.run_sync(self.run_once):
+                    await publish
+            except Exception as exc:
+                logger.error("Ride expiry run failed: %s", exc)
+            await asyncio.sleep(self.interval)
+
+
+_worker: Optional[RideExpiryWorker] = None
+
+
+async def start_worker(session_scope: Callable[[], ContextManager[Session]] = SessionLocal) -> RideExpiryWorker:
+    global _worker
+    if _worker is not None:
+        await _worker.stop()
+    _worker = RideExpiryWorker(session_scope)
+    await _worker.start()
+    return _worker
+
+
+async def stop_worker():
+    global _worker
+    worker, _worker = _worker, None
+    if worker is not None:
+        await worker.stop()
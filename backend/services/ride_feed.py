@@ -0,0 +1,182 @@
+"""
+ride_feed – server-pushed feed of rides open for bidding.
+
+Replaces dashboard polling of ``GET /rides/open``.  A driver connected to
+``/ws`` sends::
+
+    {"type": "subscribe_open_rides", "data": {"resume_from": <seq or null>}}
+
+and receives either an ``open_rides_snapshot`` (``{"seq", "rides"}``) or, when
+``resume_from`` is still inside the replay buffer, the missed deltas.  After
+that the connection gets live ``ride_added`` / ``ride_updated`` /
+``ride_removed`` deltas, each carrying its ``seq`` so the client can persist
+the last one it applied and resume after a reconnect.  Rides whose start time
+passes simply drop out of the open set; clients are expected to prune them
+locally, exactly as the REST endpoint does with its time filter.
+
+Deltas follow the same per-driver filter as the snapshot: a driver who
+rides in a trip or has bid on it gets no ``ride_added`` / ``ride_updated``
+for it (``ride_removed`` goes to everyone).
+"""
+from __future__ import annotations
+
+import logging
+import os
+import weakref
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from fastapi import WebSocket
+from sqlalchemy.orm import Session, object_session
+from starlette.concurrency import run_in_threadpool
+
+import models
+from database import get_db
+from ride_states import normalize_ride_status
+from services.event_feed import SequencedFeed, catch_up
+from utils.json_codec import dumps
+from websocket_manager import manager
+
+logger = logging.getLogger(__name__)
+
+OPEN_RIDES_CHANNEL = "open_rides"
+
+RIDE_ADDED = "ride_added"
+RIDE_UPDATED = "ride_updated"
+RIDE_REMOVED = "ride_removed"
+
+open_ride_feed = SequencedFeed(maxlen=int(os.getenv("OPEN_RIDE_FEED_BUFFER", "1024")))
+
+# User id of each subscribed connection, for the per-driver filter
+_subscriber_users: "weakref.WeakKeyDictionary[WebSocket, str]" = weakref.WeakKeyDictionary()
+
+
+def open_ride_criteria(now: Optional[datetime] = None) -> tuple:
+    """SQL filter for the open set: pending rides that have not started."""
+    return (
+        models.Trip.status.in_(["pending"]),
+        models.Trip.start_time >= (now or datetime.utcnow()),
+    )
+
+
+def is_open_ride(trip: models.Trip, now: Optional[datetime] = None) -> bool:
+    """``open_ride_criteria`` for a loaded trip."""
+    return trip.status == "pending" and trip.start_time >= (now or datetime.utcnow())
+
+
+def open_rides_query(db: Session, user_id):
+    """Pending future rides *user_id* can still bid on (the ``GET /rides/open`` set)."""
+    user_passenger_trips = db.query(models.Booking.trip_id).filter(
+        models.Booking.passenger_id == user_id
+    ).subquery()
+    driver_bidded_trips = db.query(models.TripBid.trip_id).filter(
+        models.TripBid.driver_id == user_id
+    ).subquery()
+
+    return db.query(models.Trip).filter(
+        *open_ride_criteria(),
+        ~models.Trip.id.in_(user_passenger_trips),
+        ~models.Trip.id.in_(driver_bidded_trips)
+    )
+
+
+def serialize_open_ride(trip: models.Trip) -> Dict[str, Any]:
+    """Compact JSON-ready view of a trip for feed snapshots and deltas."""
+    payment_status = (trip.payment_status or "").lower()
+    return {
+        "id": str(trip.id),
+        "creator_passenger_id": str(trip.creator_passenger_id) if trip.creator_passenger_id else None,
+        "origin_address": trip.origin_address,
+        "dest_address": trip.dest_address,
+        "origin_lat": float(trip.origin_lat),
+        "origin_lng": float(trip.origin_lng),
+        "dest_lat": float(trip.dest_lat),
+        "dest_lng": float(trip.dest_lng),
+        "start_time": trip.start_time.isoformat() if trip.start_time else None,
+        "total_seats": trip.total_seats,
+        "available_seats": trip.available_seats,
+        "total_price": float(trip.total_price) if trip.total_price is not None else None,
+        "price_per_seat": float(trip.price_per_seat) if trip.price_per_seat is not None else None,
+        "status": normalize_ride_status(trip.status),
+        "notes": trip.notes,
+        "payment_method": "cash" if payment_status == "cash" else "online",
+    }
+
+
+def _to_message(event: Dict[str, Any]) -> Dict[str, Any]:
+    return {"type": event["type"], "data": {"seq": event["seq"], **event["data"]}}
+
+
+def _hidden_from(trip: models.Trip) -> FrozenSet[str]:
+    """Users ``open_rides_query`` leaves *trip* out for: its passengers and bidding drivers."""
+    db = object_session(trip)
+    if db is None:
+        return frozenset()
+    passengers = db.query(models.Booking.passenger_id).filter(models.Booking.trip_id == trip.id)
+    bidders = db.query(models.TripBid.driver_id).filter(models.TripBid.trip_id == trip.id)
+    return frozenset(str(user_id) for (user_id,) in passengers.union(bidders))
+
+
+async def _publish(event_type: str, data: Dict[str, Any], exclude: FrozenSet[str]) -> None:
+    # Appending and picking the recipients happen before the first await, so
+    # a subscriber still catching up either replays this event or receives it live
+    event = open_ride_feed.append(event_type, data, exclude)
+    skip = [ws for ws, user_id in list(_subscriber_users.items()) if user_id in exclude]
+    await manager.broadcast_to_channel(OPEN_RIDES_CHANNEL, _to_message(event), exclude=skip)
+
+
+def publish_ride_event(event_type: str, trip: models.Trip):
+    """Build a feed delta for *trip* and return the coroutine that publishes it.
+
+    The payload is serialised immediately, while the caller's session is
+    still usable; sync routes hand the returned coroutine to the event loop
+    after their session may already be closed.
+    """
+    if event_type == RIDE_REMOVED:
+        return _publish(event_type, {"ride_id": str(trip.id)}, frozenset())
+    return _publish(event_type, {"ride": serialize_open_ride(trip)}, _hidden_from(trip))
+
+
+async def publish_ride_event_async(event_type: str, trip: models.Trip) -> None:
+    """``publish_ride_event`` for async routes.
+
+    Serialising *trip* (a refresh after commit) and looking up who it is
+    hidden from are blocking queries, so they run in the threadpool.
+    """
+    publish = await run_in_threadpool(publish_ride_event, event_type, trip)
+    await publish
+
+
+def load_open_ride_snapshot(user_id: str) -> List[Dict[str, Any]]:
+    db_gen = get_db()
+    db = next(db_gen)
+    try:
+        return [serialize_open_ride(trip) for trip in open_rides_query(db, user_id).all()]
+    finally:
+        db_gen.close()
+
+
+async def subscribe_open_rides(websocket: WebSocket, user_id: str, resume_from: Optional[int] = None) -> None:
+    """Catch *websocket* up (snapshot or replay) and attach it to the live feed."""
+    user_id = str(user_id)
+
+    async def send_snapshot(seq: int):
+        rides = await run_in_threadpool(load_open_ride_snapshot, user_id)
+        await websocket.send_text(dumps({"type": "open_rides_snapshot", "data": {"seq": seq, "rides": rides}}))
+
+    async def send_event(event: Dict[str, Any]):
+        if user_id not in event["exclude"]:
+            await websocket.send_text(dumps(_to_message(event)))
+
+    async def send_resumed(seq: int, replayed: int):
+        await websocket.send_text(dumps({"type": "open_rides_resumed", "data": {"seq": seq, "replayed": replayed}}))
+
+    await catch_up(open_ride_feed, resume_from, send_snapshot, send_event, send_resumed)
+    _subscriber_users[websocket] = user_id
+    manager.subscribe(websocket, OPEN_RIDES_CHANNEL)
+    logger.debug("User %s subscribed to open ride feed (resume_from=%s)", user_id, resume_from)
+
+
+def unsubscribe_open_rides(websocket: WebSocket) -> None:
+    _subscriber_users.pop(websocket, None)
+    manager.unsubscribe(websocket, OPEN_RIDES_CHANNEL)
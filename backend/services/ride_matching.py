@@ -0,0 +1,169 @@
+"""
+ride_matching – route-corridor matching of passengers to pending shared rides.
+
+A shared trip is modelled as the straight-line corridor from its origin to
+its destination.  For a requested pickup/drop-off pair every candidate trip
+is scored on
+
+* pickup and drop-off detour: perpendicular distance (km) from each point
+  to the corridor, which must be visited in travel order, and
+* departure fit: how close the trip's start time is to the requested time
+  inside the allowed window.
+
+Candidates come from a bounding-box query on the trip endpoint indexes
+(``ix_trips_status_start_time`` narrows the time window,
+``ix_trips_origin_lat_lng``/``ix_trips_dest_lat_lng`` the area), and only the
+top-K scored trips are returned, so a lookup stays in the millisecond range.
+Filling seats this way is what lowers each rider's share in ``join_ride``.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import models
+
+KM_PER_DEG_LAT = 110.574
+DEFAULT_MAX_DETOUR_KM = 3.0
+DEFAULT_WINDOW_MINUTES = 60
+DEFAULT_SEARCH_RADIUS_KM = 25.0
+
+# Relative weight of detour vs. departure fit in the final score.
+DETOUR_WEIGHT = 0.7
+TIME_WEIGHT = 0.3
+
+Point = Tuple[float, float]
+
+
+@dataclass(frozen=True)
+class CorridorMatch:
+    trip_id: object
+    score: float
+    pickup_detour_km: float
+    dropoff_detour_km: float
+    departure_offset_minutes: float
+
+
+def _km_per_deg_lng(lat: float) -> float:
+    return 111.320 * math.cos(math.radians(lat))
+
+
+def _project_onto_corridor(point: Point, start: Point, end: Point) -> Tuple[float, float]:
+    """Return (distance_km, t) of *point* to segment start→end; t in [0, 1] is the position along it."""
+    kx = _km_per_deg_lng((start[0] + end[0]) / 2)
+    px, py = (point[1] - start[1]) * kx, (point[0] - start[0]) * KM_PER_DEG_LAT
+    ex, ey = (end[1] - start[1]) * kx, (end[0] - start[0]) * KM_PER_DEG_LAT
+    length_sq = ex * ex + ey * ey
+    if length_sq == 0:
+        return math.hypot(px, py), 0.0
+    t = max(0.0, min(1.0, (px * ex + py * ey) / length_sq))
+    return math.hypot(px - t * ex, py - t * ey), t
+
+
+def score_corridor(
+    trip_id,
+    origin: Point,
+    dest: Point,
+    start_time: datetime,
+    pickup: Point,
+    dropoff: Point,
+    departure: datetime,
+    *,
+    max_detour_km: float = DEFAULT_MAX_DETOUR_KM,
+    window_minutes: int = DEFAULT_WINDOW_MINUTES,
+) -> Optional[CorridorMatch]:
+    """Score one trip corridor for a pickup/drop-off pair; None if it cannot serve it."""
+    offset_minutes = (start_time - departure).total_seconds() / 60
+    if abs(offset_minutes) > window_minutes:
+        return None
+
+    pickup_km, pickup_t = _project_onto_corridor(pickup, origin, dest)
+    dropoff_km, dropoff_t = _project_onto_corridor(dropoff, origin, dest)
+    if pickup_km > max_detour_km or dropoff_km > max_detour_km:
+        return None
+    # The drop-off must come after the pickup along the direction of travel.
+    if dropoff_t <= pickup_t:
+        return None
+
+    detour_fit = 1 - (pickup_km + dropoff_km) / (2 * max_detour_km) if max_detour_km > 0 else 1.0
+    time_fit = 1 - abs(offset_minutes) / window_minutes if window_minutes > 0 else 1.0
+    return CorridorMatch(
+        trip_id=trip_id,
+        score=round(DETOUR_WEIGHT * detour_fit + TIME_WEIGHT * time_fit, 4),
+        pickup_detour_km=round(pickup_km, 3),
+        dropoff_detour_km=round(dropoff_km, 3),
+        departure_offset_minutes=round(offset_minutes, 1),
+    )
+
+
+def top_matches(
+    trips: Iterable[models.Trip],
+    pickup: Point,
+    dropoff: Point,
+    departure: datetime,
+    *,
+    limit: int = 10,
+    max_detour_km: float = DEFAULT_MAX_DETOUR_KM,
+    window_minutes: int = DEFAULT_WINDOW_MINUTES,
+) -> List[CorridorMatch]:
+    """Score candidate trips and return the best *limit*, highest score first."""
+    scored = []
+    for trip in trips:
+        match = score_corridor(
+            trip.id,
+            (float(trip.origin_lat), float(trip.origin_lng)),
+            (float(trip.dest_lat), float(trip.dest_lng)),
+            trip.start_time,
+            pickup,
+            dropoff,
+            departure,
+            max_detour_km=max_detour_km,
+            window_minutes=window_minutes,
+        )
+        if match:
+            scored.append(match)
+    return heapq.nlargest(limit, scored, key=lambda m: m.score)
+
+
+def _bbox(center: Point, radius_km: float) -> Tuple[float, float, float, float]:
+    dlat = radius_km / KM_PER_DEG_LAT
+    dlng = radius_km / max(_km_per_deg_lng(center[0]), 1e-6)
+    return center[0] - dlat, center[0] + dlat, center[1] - dlng, center[1] + dlng
+
+
+def candidate_trips_query(
+    db: Session,
+    user_id,
+    pickup: Point,
+    dropoff: Point,
+    departure: datetime,
+    *,
+    window_minutes: int = DEFAULT_WINDOW_MINUTES,
+    search_radius_km: float = DEFAULT_SEARCH_RADIUS_KM,
+):
+    """Pending shared trips near the request, via the endpoint and start-time indexes."""
+    o_min_lat, o_max_lat, o_min_lng, o_max_lng = _bbox(pickup, search_radius_km)
+    d_min_lat, d_max_lat, d_min_lng, d_max_lng = _bbox(dropoff, search_radius_km)
+    window = timedelta(minutes=window_minutes)
+    earliest = max(departure - window, datetime.utcnow())
+
+    user_trips = select(models.Booking.trip_id).where(models.Booking.passenger_id == user_id)
+
+    return db.query(models.Trip).filter(
+        models.Trip.status == "pending",
+        models.Trip.creator_passenger_id != None,
+        models.Trip.available_seats > 0,
+        models.Trip.start_time >= earliest,
+        models.Trip.start_time <= departure + window,
+        models.Trip.origin_lat.between(o_min_lat, o_max_lat),
+        models.Trip.origin_lng.between(o_min_lng, o_max_lng),
+        models.Trip.dest_lat.between(d_min_lat, d_max_lat),
+        models.Trip.dest_lng.between(d_min_lng, d_max_lng),
+        ~models.Trip.id.in_(user_trips),
+    )
@@ -0,0 +1,236 @@
+"""
+seat_holds – two-phase seat reservation for high-demand shared rides.
+
+``POST /rides/{id}/reserve`` takes a seat with one atomic statement::
+
+    UPDATE trips SET available_seats = available_seats - 1, version = version + 1
+     WHERE id = :id AND available_seats > 0
+       AND status = 'pending' AND start_time >= :now RETURNING available_seats
+
+and records a ``SeatHold`` that expires after ``SEAT_HOLD_TTL_SECONDS``.
+Nothing is read first, so there is no retry loop and the ``trips`` row lock
+lasts for that one statement and its commit, however many passengers hit
+the ride at once (exam-day shuttles).  The wallet check, booking insert and
+fare split happen later in ``POST /rides/{id}/confirm``, which consumes the
+hold and reprices with the ``trip_seats`` compare-and-swap.
+
+A passenger has at most one open hold per trip: the partial unique index
+``ix_seat_holds_one_held`` makes concurrent reserves from one account fail
+all but one insert, and the route hands the others the winning hold.
+
+Holds that are never confirmed are returned to the trip by ``HoldReaper``,
+a background task started in ``main.lifespan``.  Both confirm and the
+reaper claim a hold with a conditional UPDATE on its status, so a hold is
+either confirmed or released, never both.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, ContextManager, Dict, List, Optional
+
+from anyio import to_thread
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+import models
+from database import SessionLocal
+from services.ride_feed import RIDE_REMOVED, RIDE_UPDATED, is_open_ride, open_ride_criteria, publish_ride_event
+from utils import outbox
+
+logger = logging.getLogger(__name__)
+
+HOLD_TTL = int(os.getenv("SEAT_HOLD_TTL_SECONDS", "120"))
+REAP_INTERVAL = float(os.getenv("SEAT_HOLD_REAP_INTERVAL_SECONDS", "15"))
+REAP_BATCH = int(os.getenv("SEAT_HOLD_REAP_BATCH", "500"))
+
+HELD = "held"
+CONFIRMED = "confirmed"
+EXPIRED = "expired"
+
+
+def active_hold(db: Session, trip_id, passenger_id, now: datetime) -> Optional[models.SeatHold]:
+    return db.query(models.SeatHold).filter(
+        models.SeatHold.trip_id == trip_id,
+        models.SeatHold.passenger_id == passenger_id,
+        models.SeatHold.status == HELD,
+        models.SeatHold.expires_at > now,
+    ).first()
+
+
+def _release_own_lapsed(db: Session, trip_id, passenger_id, now: datetime) -> None:
+    """Expire *passenger_id*'s lapsed, not yet reaped hold on *trip_id* and return its seat."""
+    seats = db.execute(
+        update(models.SeatHold)
+        .where(
+            models.SeatHold.trip_id == trip_id,
+            models.SeatHold.passenger_id == passenger_id,
+            models.SeatHold.status == HELD,
+            models.SeatHold.expires_at <= now,
+        )
+        .values(status=EXPIRED)
+        .returning(models.SeatHold.seats)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if seats:
+        db.execute(
+            update(models.Trip)
+            .where(models.Trip.id == trip_id)
+            .values(available_seats=models.Trip.available_seats + seats, version=models.Trip.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def reserve(db: Session, trip_id, passenger_id, now: datetime, ttl: int = HOLD_TTL) -> Optional[models.SeatHold]:
+    """Take one seat and hold it for *passenger_id*; ``None`` when the ride is full or no longer open.
+
+    The caller commits (or rolls back on ``None``).  ``hold.available_seats``
+    carries the trip's seat count after the decrement.  Raises
+    ``IntegrityError`` when the passenger already holds a seat on the trip.
+    """
+    # A lapsed hold the reaper has not reached yet would block the new one
+    _release_own_lapsed(db, trip_id, passenger_id, now)
+    hold = models.SeatHold(
+        id=uuid.uuid4(),
+        trip_id=trip_id,
+        passenger_id=passenger_id,
+        seats=1,
+        status=HELD,
+        expires_at=now + timedelta(seconds=ttl),
+        created_at=now,
+    )
+    # Insert first: the trips row is then locked only from the UPDATE to the commit
+    db.add(hold)
+    db.flush()
+    available = db.execute(
+        update(models.Trip)
+        .where(models.Trip.id == trip_id, models.Trip.available_seats > 0, *open_ride_criteria(now))
+        .values(available_seats=models.Trip.available_seats - 1, version=models.Trip.version + 1)
+        .returning(models.Trip.available_seats)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if available is None:
+        return None
+    hold.available_seats = available
+    return hold
+
+
+def claim(db: Session, hold_id, now: datetime) -> bool:
+    """Mark an unexpired hold confirmed; ``False`` if it expired or was already used."""
+    result = db.execute(
+        update(models.SeatHold)
+        .where(
+            models.SeatHold.id == hold_id,
+            models.SeatHold.status == HELD,
+            models.SeatHold.expires_at > now,
+        )
+        .values(status=CONFIRMED)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def release_expired(db: Session, now: Optional[datetime] = None, batch_size: int = REAP_BATCH) -> Dict:
+    """Expire up to *batch_size* lapsed holds and give their seats back.
+
+    One UPDATE per affected trip; commits.  Returns ``{trip_id: seats}``.
+    """
+    now = now or datetime.utcnow()
+    lapsed = db.query(models.SeatHold.id).filter(
+        models.SeatHold.status == HELD,
+        models.SeatHold.expires_at <= now,
+    ).order_by(models.SeatHold.expires_at).limit(batch_size).subquery()
+    released = db.execute(
+        update(models.SeatHold)
+        .where(models.SeatHold.id.in_(lapsed.select()), models.SeatHold.status == HELD)
+        .values(status=EXPIRED)
+        .returning(models.SeatHold.trip_id, models.SeatHold.seats)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    seats_by_trip: Counter = Counter()
+    for trip_id, seats in released:
+        seats_by_trip[trip_id] += seats
+    for trip_id, seats in seats_by_trip.items():
+        available = db.execute(
+            update(models.Trip)
+            .where(models.Trip.id == trip_id)
+            .values(available_seats=models.Trip.available_seats + seats, version=models.Trip.version + 1)
+            .returning(models.Trip.available_seats)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        outbox.enqueue_trip_message(db, trip_id, {
+            "type": "seat_update",
+            "trip_id": str(trip_id),
+            "available_seats": available,
+            "released_holds": seats,
+        })
+    db.commit()
+    return dict(seats_by_trip)
+
+
+class HoldReaper:
+    """Background task: release lapsed holds every ``SEAT_HOLD_REAP_INTERVAL_SECONDS``."""
+
+    def __init__(self, session_scope: Callable[[], ContextManager[Session]], interval: float = REAP_INTERVAL):
+        self.session_scope = session_scope
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run(), name="seat-hold-reaper")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def run_once(self) -> List:
+        """Release lapsed holds; returns the open-ride feed updates to publish.
+
+        Trips that left the open set (cancelled, started) get ``ride_removed``.
+        """
+        with self.session_scope() as db:
+            released = release_expired(db)
+            if not released:
+                return []
+            logger.info("Released %d lapsed seat holds on %d trips", sum(released.values()), len(released))
+            trips = db.query(models.Trip).filter(models.Trip.id.in_(list(released))).all()
+            return [publish_ride_event(RIDE_UPDATED if is_open_ride(trip) else RIDE_REMOVED, trip) for trip in trips]
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                for publish in await to_thread.run_sync(self.run_once):
+                    await publish
+            except Exception as exc:
+                logger.error("Seat hold reaper run failed: %s", exc)
+
+
+_reaper: Optional[HoldReaper] = None
+
+
+async def start_reaper(session_scope: Callable[[], ContextManager[Session]] = SessionLocal) -> HoldReaper:
+    global _reaper
+    if _reaper is not None:
+        await _reaper.stop()
+    _reaper = HoldReaper(session_scope)
+    await _reaper.start()
+    return _reaper
+
+
+async def stop_reaper():
+    global _reaper
+    reaper, _reaper = _reaper, None
+    if reaper is not None:
+        await reaper.stop()
@@ -18,6 +18,8 @@ from __future__ import annotations
 import logging
 import os
 
+from services import integrations
+
 logger = logging.getLogger(__name__)
 
 
@@ -45,9 +47,9 @@ def send_phone_otp(to_phone: str, otp: str) -> None:
     app_name = os.getenv("APP_NAME", "Commuto")
 
     try:
-        from twilio.rest import Client  # type: ignore[import]
+        twilio = integrations.load("twilio")
 
-        client = Client(account_sid, auth_token)
+        client = twilio.Client(account_sid, auth_token)
         message = client.messages.create(
             body=f"Your {app_name} verification code is: {otp}\nDo not share this with anyone. Expires in 10 minutes.",
             from_=from_number,
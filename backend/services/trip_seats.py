@@ -0,0 +1,101 @@
+"""
+trip_seats – optimistic (compare-and-swap) seat changes on shared rides.
+
+``join_ride`` and ``leave_ride`` used to lock the trip row with
+``SELECT ... FOR UPDATE`` and reprice every confirmed booking one row at a
+time, so joins on a popular ride queued behind each other for the whole
+transaction.  They now read the trip without a lock and apply the change
+with one conditional UPDATE keyed on ``Trip.version``::
+
+    UPDATE trips SET available_seats = available_seats - 1, version = version + 1, ...
+     WHERE id = :id AND version = :v AND available_seats > 0
+
+followed by a single set-based UPDATE of the confirmed bookings' fare.  When
+another join/leave won the race the UPDATE matches no row; the caller rolls
+back and retries after ``backoff_delay`` (jittered exponential backoff), up
+to ``SEAT_CAS_ATTEMPTS`` times.  Every other writer of a trip already bumps
+``version``, so the swap also fails safe against bid acceptance or cancel.
+"""
+from __future__ import annotations
+
+import os
+import random
+
+from sqlalchemy import case, func, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+import models
+from services.wallet_service import CASH_PAYMENT_STATUS
+
+MAX_ATTEMPTS = int(os.getenv("SEAT_CAS_ATTEMPTS", "8"))
+BACKOFF_BASE = float(os.getenv("SEAT_CAS_BACKOFF_MS", "10")) / 1000
+BACKOFF_CAP = 0.25
+
+
+def backoff_delay(attempt: int) -> float:
+    """Seconds to wait before retry number *attempt* (0-based); full jitter."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+def booked_seats(db: Session, trip_id) -> int:
+    """Seats on confirmed bookings.
+
+    Fares are split over these rather than ``total_seats - available_seats``,
+    which also counts seats held by unconfirmed reservations (see
+    ``seat_holds``).  Every booking change bumps the trip version, so a
+    count read before a successful ``swap_seats`` is still current.
+    """
+    return db.query(func.coalesce(func.sum(models.Booking.seats_booked), 0)).filter(
+        models.Booking.trip_id == trip_id,
+        models.Booking.status == "confirmed",
+    ).scalar()
+
+
+def swap_seats(db: Session, trip: models.Trip, delta: int, price_per_seat) -> bool:
+    """Change ``available_seats`` by *delta* iff the trip is still at the version read.
+
+    On success the loaded *trip* reflects the new row (without being marked
+    dirty); ``False`` means someone else changed the trip first.
+    """
+    condition = [models.Trip.id == trip.id, models.Trip.version == trip.version]
+    if delta < 0:
+        condition.append(models.Trip.available_seats >= -delta)
+    result = db.execute(
+        update(models.Trip)
+        .where(*condition)
+        .values(
+            available_seats=models.Trip.available_seats + delta,
+            version=models.Trip.version + 1,
+            price_per_seat=price_per_seat,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
+    set_committed_value(trip, "available_seats", trip.available_seats + delta)
+    set_committed_value(trip, "version", trip.version + 1)
+    set_committed_value(trip, "price_per_seat", price_per_seat)
+    return True
+
+
+def reprice_bookings(db: Session, trip_id, fare) -> int:
+    """Set every confirmed booking on the trip to *fare* in one UPDATE.
+
+    Same effect as ``wallet_service.reconcile_booking_hold`` per booking
+    (fare updated, settlement back to ``pending``), except that cash bookings
+    keep their ``cash`` marker.
+    """
+    result = db.execute(
+        update(models.Booking)
+        .where(models.Booking.trip_id == trip_id, models.Booking.status == "confirmed")
+        .values(
+            total_price=fare,
+            payment_status=case(
+                (models.Booking.payment_status == CASH_PAYMENT_STATUS, CASH_PAYMENT_STATUS),
+                else_="pending",
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
@@ -0,0 +1,240 @@
+"""Micro-benchmarks for the pure functions on Commuto's request hot paths.
+
+Run from ``backend/``::
+
+    python -m tests.bench.bench_hot_paths                 # print results
+    python -m tests.bench.bench_hot_paths --save          # refresh the baseline
+    python -m tests.bench.bench_hot_paths --compare       # exit 1 if >25% slower
+    python -m tests.bench.bench_hot_paths --compare -k geofence --threshold 0.1
+
+Baselines live in ``tests/bench/baselines/hot_paths.json`` and are only
+comparable on the machine (and Python) that produced them; CI should save a
+baseline from the target branch and compare the candidate in the same job.
+"""
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from tests.bench.harness import benchmark, main
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "hot_paths.json")
+
+INSIDE = (22.6005, 72.8194)     # Charusat campus
+INSIDE_DEST = (22.5645, 72.9289)  # Anand
+OUTSIDE = (23.0225, 72.5714)    # Ahmedabad
+
+
+@benchmark("geofence._ray_cast_contains[inside]")
+def _ray_cast_inside():
+    from services.geofence import CHARUSAT_SERVICE_POLYGON, _ray_cast_contains
+
+    return lambda: _ray_cast_contains(CHARUSAT_SERVICE_POLYGON, *INSIDE)
+
+
+@benchmark("geofence._ray_cast_contains[outside]")
+def _ray_cast_outside():
+    from services.geofence import CHARUSAT_SERVICE_POLYGON, _ray_cast_contains
+
+    return lambda: _ray_cast_contains(CHARUSAT_SERVICE_POLYGON, *OUTSIDE)
+
+
+@benchmark("geofence.validate_ride_coordinates")
+def _validate_ride_coordinates():
+    from services.geofence import validate_ride_coordinates
+
+    return lambda: validate_ride_coordinates(*INSIDE, *INSIDE_DEST)
+
+
+@benchmark("ride_states.normalize_ride_status")
+def _normalize_ride_status():
+    from ride_states import normalize_ride_status
+
+    statuses = ("pending", "bid_accepted", "ACTIVE", "completed", None)
+    return lambda: [normalize_ride_status(s) for s in statuses]
+
+
+@benchmark("rate_limiter.is_rate_limited")
+def _is_rate_limited():
+    import rate_limiter
+
+    key = f"bench:{uuid.uuid4()}"
+    return lambda: rate_limiter.is_rate_limited(key, 1 << 62, 60)
+
+
+@benchmark("auth.create_access_token")
+def _create_access_token():
+    import auth
+
+    claims = {"sub": str(uuid.uuid4()), "role": "passenger"}
+    return lambda: auth.create_access_token(claims)
+
+
+@benchmark("auth.jwt_decode")
+def _jwt_decode():
+    import auth
+    from jose import jwt
+
+    token = auth.create_access_token({"sub": str(uuid.uuid4()), "role": "driver"})
+    return lambda: jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+
+
+@benchmark("rides_router.populate_passenger_notes[50 trips]")
+def _populate_passenger_notes():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    import models
+    from database import Base
+    from routers.rides_router import populate_passenger_notes
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    riders = [
+        models.User(id=uuid.uuid4(), email=f"bench{i}@commuto.test", full_name=f"Rider {i}", hashed_password="!", role="passenger")
+        for i in range(3)
+    ]
+    db.add_all(riders)
+    trips = []
+    start = datetime.utcnow() + timedelta(days=1)
+    for i in range(50):
+        trip = models.Trip(
+            id=uuid.uuid4(), creator_passenger_id=riders[0].id,
+            origin_address="Charusat", origin_lat=INSIDE[0], origin_lng=INSIDE[1],
+            dest_address="Anand", dest_lat=INSIDE_DEST[0], dest_lng=INSIDE_DEST[1],
+            start_time=start, total_seats=4, available_seats=1, total_price=300, price_per_seat=100,
+        )
+        trips.append(trip)
+        db.add(trip)
+        for rider in riders:
+            db.add(models.Booking(
+                id=uuid.uuid4(), trip_id=trip.id, passenger_id=rider.id, seats_booked=1,
+                total_price=100, status="confirmed", notes=f"Trip {i}: near gate {rider.full_name}",
+            ))
+    db.commit()
+    return lambda: populate_passenger_notes(trips, db)
+
+
+@benchmark("fare_service.split_fare[join]")
+def _split_fare():
+    from services.fare_service import split_fare
+
+    return lambda: split_fare(Decimal("437.50"), 3)
+
+
+@benchmark("fare_service.split_fare_after_leave")
+def _split_fare_after_leave():
+    from services.fare_service import split_fare_after_leave
+
+    return lambda: split_fare_after_leave(Decimal("437.50"), 3)
+
+
+@benchmark("rating_service.apply_driver_rating")
+def _apply_driver_rating():
+    import models
+    from services.rating_service import apply_driver_rating
+
+    driver = models.Driver(user_id=uuid.uuid4(), rating=Decimal("4.50"), rating_count=10)
+    return lambda: apply_driver_rating(driver, 4.0)
+
+
+class _FakeSocket:
+    __slots__ = ()
+
+    async def send_text(self, text):
+        return None
+
+
+def _fanout(recipients: int):
+    from websocket_manager import ConnectionManager
+
+    manager = ConnectionManager()
+    trip_id = str(uuid.uuid4())
+    manager.trip_connections[trip_id] = {_FakeSocket() for _ in range(recipients)}
+    message = {
+        "type": "location_update",
+        "trip_id": trip_id,
+        "data": {"lat": INSIDE[0], "lng": INSIDE[1], "timestamp": datetime.utcnow().isoformat()},
+    }
+    loop = asyncio.new_event_loop()
+    try:
+        yield lambda: loop.run_until_complete(manager.broadcast_to_trip(trip_id, message))
+    finally:
+        loop.close()
+
+
+@benchmark("websocket_manager.broadcast_to_trip[10 sockets]")
+def _fanout_small():
+    yield from _fanout(10)
+
+
+@benchmark("websocket_manager.broadcast_to_trip[1000 sockets]")
+def _fanout_large():
+    yield from _fanout(1000)
+
+
+def _access_logged_app(enabled: bool):
+    import io
+    import logging
+    import logging.handlers
+    import queue
+
+    from utils.logging_config import AccessLogMiddleware, DeferredQueueHandler
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    logger = logging.getLogger(f"bench.access.{enabled}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO if enabled else logging.WARNING)
+    listener = None
+    if enabled:
+        log_queue = queue.SimpleQueue()
+        handler = DeferredQueueHandler(log_queue)
+        logger.addHandler(handler)
+        listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler(io.StringIO()))
+        listener.start()
+
+    middleware = AccessLogMiddleware(app, logger=logger)
+    scope = {
+        "type": "http", "method": "GET", "path": "/rides/available", "client": ("127.0.0.1", 5000),
+        "headers": [(b"origin", b"http://localhost:3000"), (b"accept", b"application/json")],
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        return None
+
+    loop = asyncio.new_event_loop()
+    try:
+        yield lambda: loop.run_until_complete(middleware(scope, receive, send))
+    finally:
+        loop.close()
+        if listener is not None:
+            listener.stop()
+            logger.removeHandler(handler)
+
+
+@benchmark("logging_config.AccessLogMiddleware[enabled]")
+def _access_log_enabled():
+    yield from _access_logged_app(True)
+
+
+@benchmark("logging_config.AccessLogMiddleware[disabled]")
+def _access_log_disabled():
+    yield from _access_logged_app(False)
+
+
+if __name__ == "__main__":
+    sys.exit(main(BASELINE_PATH))
@@ -0,0 +1,95 @@
+"""Cold-start benchmark: how long ``import main`` takes in a fresh interpreter.
+
+Run from ``backend/``::
+
+    python -m tests.bench.bench_import_time                   # median of 5 runs vs the budget
+    python -m tests.bench.bench_import_time --budget-ms 1200 --runs 9 --top 20
+
+Each run is ``python -X importtime -c "import main"`` in a subprocess.  The
+report gives the median cumulative import time of ``main`` and the slowest
+modules by self time, taken from the median run.  It exits 1 when:
+
+* the median exceeds ``--budget-ms`` (default ``IMPORT_TIME_BUDGET_MS``,
+  2000); or
+* any module in ``LAZY_MODULES`` was imported.  Those SDKs belong behind
+  ``services.integrations`` and are only loaded when first used.
+
+``-X importtime`` adds overhead and the numbers depend on the machine and
+its disk cache.  Set the budget from a run on the target host.  The lazy
+module check holds everywhere.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BACKEND_DIR)
+
+from services.integrations import INTEGRATIONS  # noqa: E402
+
+LAZY_MODULES = tuple(sorted({module.split(".")[0] for module in INTEGRATIONS.values()} | {"google.auth"}))
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "2000"))
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """``{module: (self_us, cumulative_us)}`` from ``-X importtime`` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return modules
+
+
+def import_once(module: str = "main") -> Dict[str, Tuple[int, int]]:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(completed.stderr)
+
+
+def lazy_modules_imported(modules: Dict[str, Tuple[int, int]]) -> List[str]:
+    return sorted(name for name in LAZY_MODULES if name in modules)
+
+
+def run(runs: int = 5, top: int = 15, module: str = "main") -> dict:
+    samples = [import_once(module) for _ in range(runs)]
+    samples.sort(key=lambda modules: modules[module][1])
+    median_run = samples[len(samples) // 2]
+    slowest = sorted(median_run.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    return {
+        "module": module,
+        "runs": runs,
+        "median_ms": round(statistics.median(s[module][1] for s in samples) / 1000, 1),
+        "min_ms": round(samples[0][module][1] / 1000, 1),
+        "slowest_self_ms": {name: round(self_us / 1000, 1) for name, (self_us, _) in slowest},
+        "lazy_modules_imported": sorted({name for s in samples for name in lazy_modules_imported(s)}),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules (self time) to list")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    report = run(args.runs, args.top)
+    report["budget_ms"] = args.budget_ms
+    report["over_budget"] = report["median_ms"] > args.budget_ms
+    print(json.dumps(report, indent=2))
+    return 1 if report["over_budget"] or report["lazy_modules_imported"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
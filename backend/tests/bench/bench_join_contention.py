@@ -0,0 +1,186 @@
+"""Contention benchmark: many passengers joining one shared ride at once.
+
+Run from ``backend/``::
+
+    python -m tests.bench.bench_join_contention
+    python -m tests.bench.bench_join_contention --database-url postgresql://... --threads 32 --seats 64
+
+Every thread joins distinct passengers to the same trip with its own
+session, first through the old pessimistic transaction (``SELECT ... FOR
+UPDATE`` on the trip, then each confirmed booking repriced in Python) and
+then through ``rides_router._join_once`` with the ``trip_seats``
+compare-and-swap and backoff the route uses.  The report has joins/s,
+p50/p95 latency, version conflicts and a consistency check (seats taken ==
+joins, all bookings at the final fare).
+
+SQLite serialises writers and ignores ``FOR UPDATE``, so only PostgreSQL
+numbers say anything about row-lock contention; SQLite is the smoke run.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def _percentile(values, pct):
+    index = max(0, min(len(values) - 1, int(round(pct / 100 * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+def _seed(SessionLocal, models, seats: int):
+    db = SessionLocal()
+    try:
+        creator = models.User(id=uuid.uuid4(), email=f"creator-{uuid.uuid4().hex[:8]}@bench", full_name="Creator", hashed_password="x", role="passenger")
+        joiners = [
+            models.User(id=uuid.uuid4(), email=f"joiner{i}-{uuid.uuid4().hex[:8]}@bench", full_name=f"Joiner {i}", hashed_password="x", role="passenger")
+            for i in range(seats - 1)
+        ]
+        trip = models.Trip(
+            id=uuid.uuid4(), creator_passenger_id=creator.id,
+            origin_address="CHARUSAT", origin_lat=22.6, origin_lng=72.8,
+            dest_address="Anand", dest_lat=22.56, dest_lng=72.93,
+            start_time=datetime.utcnow() + timedelta(hours=2), payment_status="cash",
+            total_seats=seats, available_seats=seats - 1, total_price=seats * 100, price_per_seat=seats * 100,
+            status="pending",
+        )
+        db.add_all([creator, *joiners, trip])
+        db.add(models.TripPassenger(id=uuid.uuid4(), trip_id=trip.id, passenger_id=creator.id, seats_booked=1))
+        db.add(models.Booking(
+            id=uuid.uuid4(), trip_id=trip.id, passenger_id=creator.id, seats_booked=1,
+            total_price=seats * 100, status="confirmed", payment_status="cash",
+        ))
+        db.commit()
+        return trip.id, [user.id for user in joiners]
+    finally:
+        db.close()
+
+
+def _join_locking(db, models, trip_id, user):
+    """The join transaction before the CAS change, minus the outbox rows."""
+    from services.fare_service import split_fare
+    from services.wallet_service import reconcile_booking_hold
+
+    trip = db.query(models.Trip).filter(models.Trip.id == trip_id).with_for_update().first()
+    trip.available_seats -= 1
+    new_fare = split_fare(trip.total_price, trip.total_seats - trip.available_seats)
+    trip.price_per_seat = new_fare
+    trip.version += 1
+    db.add(models.TripPassenger(id=uuid.uuid4(), trip_id=trip_id, passenger_id=user.id, seats_booked=1))
+    existing = db.query(models.Booking).filter(models.Booking.trip_id == trip_id, models.Booking.status == "confirmed").all()
+    db.add(models.Booking(
+        id=uuid.uuid4(), trip_id=trip_id, passenger_id=user.id, seats_booked=1,
+        total_price=new_fare, status="confirmed", payment_status="cash",
+    ))
+    for booking in existing:
+        reconcile_booking_hold(db, booking, new_fare, "Ride split update (new passenger joined)")
+    db.commit()
+    return 0
+
+
+def _join_cas(db, models, trip_id, user):
+    from routers.rides_router import _join_once
+    from services import trip_seats
+
+    for attempt in range(trip_seats.MAX_ATTEMPTS):
+        if _join_once(db, trip_id, user, None) is not None:
+            return attempt
+        time.sleep(trip_seats.backoff_delay(attempt))
+    raise RuntimeError("gave up after version conflicts")
+
+
+def run(strategy: str, threads: int, seats: int) -> dict:
+    import models
+    from database import SessionLocal
+
+    trip_id, joiner_ids = _seed(SessionLocal, models, seats)
+    join = _join_cas if strategy == "cas" else _join_locking
+    latencies, conflicts, errors = [], [0], []
+    lock = threading.Lock()
+
+    def one(user_id):
+        db = SessionLocal()
+        try:
+            user = db.get(models.User, user_id)
+            started = time.perf_counter()
+            retries = join(db, models, trip_id, user)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                conflicts[0] += retries
+        except Exception as exc:
+            db.rollback()
+            with lock:
+                errors.append(f"{type(exc).__name__}: {exc}")
+        finally:
+            db.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, joiner_ids))
+    wall = time.perf_counter() - started
+
+    db = SessionLocal()
+    try:
+        trip = db.get(models.Trip, trip_id)
+        fares = {float(b.total_price) for b in db.query(models.Booking).filter_by(trip_id=trip_id, status="confirmed")}
+        consistent = trip.total_seats - trip.available_seats == len(latencies) + 1 and fares == {float(trip.price_per_seat)}
+    finally:
+        db.close()
+
+    values = sorted(v * 1000 for v in latencies)
+    return {
+        "joins": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "joins_per_s": round(len(latencies) / wall, 1) if wall else None,
+        "p50_ms": round(_percentile(values, 50), 3) if values else None,
+        "p95_ms": round(_percentile(values, 95), 3) if values else None,
+        "version_conflicts": conflicts[0],
+        "consistent": consistent,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seats", type=int, default=40, help="seats on the trip (joiners = seats - 1)")
+    parser.add_argument("--strategy", choices=("locking", "cas", "both"), default="both")
+    args = parser.parse_args(argv)
+
+    tmpdir = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        tmpdir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir.name, 'contention.db')}"
+
+    from database import Base, engine
+    import models  # noqa: F401  (registers tables)
+
+    Base.metadata.create_all(bind=engine)
+    strategies = ("locking", "cas") if args.strategy == "both" else (args.strategy,)
+    report = {
+        "database": engine.dialect.name,
+        "threads": args.threads,
+        "seats": args.seats,
+        "results": {name: run(name, args.threads, args.seats) for name in strategies},
+    }
+    print(json.dumps(report, indent=2))
+    engine.dispose()
+    if tmpdir:
+        tmpdir.cleanup()
+    return 0 if all(r["consistent"] for r in report["results"].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Before/after benchmark for the orjson response and WebSocket fanout path.
+
+Run from ``backend/``::
+
+    python -m tests.bench.bench_serialization
+
+Compares the stdlib ``json`` encoding FastAPI/Starlette used by default with
+``utils.json_codec`` for a ``List[TripResponse]`` payload, and a 1,000
+recipient trip broadcast where each socket used to re-encode the message via
+``send_json`` against the encode-once ``ConnectionManager`` fanout.
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+import schemas_trips as trip_schemas
+from utils.json_codec import dumps, dumps_bytes, orjson
+from websocket_manager import ConnectionManager
+
+TRIP_COUNT = 200
+RECIPIENTS = 1000
+
+
+def _sample_trips(count: int) -> List[trip_schemas.TripResponse]:
+    now = datetime.utcnow()
+    return [
+        trip_schemas.TripResponse(
+            id=uuid.uuid4(),
+            creator_passenger_id=uuid.uuid4(),
+            origin_address=f"{i} Station Road, Anand",
+            dest_address="Charusat Campus, Changa",
+            origin_lat=22.5645 + i * 1e-4,
+            origin_lng=72.9289,
+            dest_lat=22.6005,
+            dest_lng=72.8194,
+            start_time=now + timedelta(hours=i),
+            total_seats=4,
+            available_seats=2,
+            total_price=240.0,
+            price_per_seat=120.0,
+            status="pending",
+            notes="Near the bus stand",
+            created_at=now,
+            passenger_notes=[{"passenger_name": "Test Passenger", "notes": "Blue bag"}],
+        )
+        for i in range(count)
+    ]
+
+
+def _timeit(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+class _StdlibSocket:
+    """Mimics Starlette's WebSocket.send_json (stdlib json per call)."""
+
+    async def send_json(self, data):
+        await self.send_text(json.dumps(data, separators=(",", ":"), ensure_ascii=False))
+
+    async def send_text(self, text):
+        return None
+
+
+def bench_trip_list(repeat: int = 50) -> dict:
+    trips = _sample_trips(TRIP_COUNT)
+    adapter = TypeAdapter(List[trip_schemas.TripResponse])
+
+    content = adapter.dump_python(trips, mode="json")
+    rows = [trip.model_dump() for trip in trips]
+
+    def stdlib(payload):
+        return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+    return {
+        # Routes with response_model: FastAPI serializes via pydantic, then the response class encodes.
+        "response_model_before_ms": _timeit(lambda: stdlib(adapter.dump_python(trips, mode="json")), repeat),
+        "response_model_after_ms": _timeit(lambda: dumps_bytes(adapter.dump_python(trips, mode="json")), repeat),
+        "encode_only_before_ms": _timeit(lambda: stdlib(content), repeat),
+        "encode_only_after_ms": _timeit(lambda: dumps_bytes(content), repeat),
+        # Routes returning plain dicts go through jsonable_encoder first.
+        "dict_route_before_ms": _timeit(lambda: stdlib(jsonable_encoder(rows)), repeat),
+        "dict_route_after_ms": _timeit(lambda: dumps_bytes(jsonable_encoder(rows)), repeat),
+    }
+
+
+def bench_broadcast(repeat: int = 20) -> dict:
+    message = {
+        "type": "location_update",
+        "trip_id": str(uuid.uuid4()),
+        "lat": 22.6005,
+        "lng": 72.8194,
+        "timestamp": time.time(),
+    }
+    sockets = [_StdlibSocket() for _ in range(RECIPIENTS)]
+    manager = ConnectionManager()
+    manager.trip_connections["trip"] = set(sockets)
+
+    async def before():
+        for socket in sockets:
+            await socket.send_json(message)
+
+    async def after():
+        await manager.broadcast_to_trip("trip", message)
+
+    loop = asyncio.new_event_loop()
+    try:
+        return {
+            "before_ms": _timeit(lambda: loop.run_until_complete(before()), repeat),
+            "after_ms": _timeit(lambda: loop.run_until_complete(after()), repeat),
+        }
+    finally:
+        loop.close()
+
+
+def main() -> None:
+    results = {
+        "encoder": "orjson" if orjson is not None else "stdlib-json",
+        f"trip_response_list_{TRIP_COUNT}": bench_trip_list(),
+        f"broadcast_{RECIPIENTS}_recipients": bench_broadcast(),
+    }
+    print(dumps(results))
+
+
+if __name__ == "__main__":
+    main()
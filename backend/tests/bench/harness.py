@@ -0,0 +1,159 @@
+"""Tiny micro-benchmark harness with JSON baselines and a compare mode.
+
+Benchmarks register a *setup* function that returns the zero-argument
+callable to time::
+
+    @benchmark("ride_states.normalize_ride_status")
+    def _normalize():
+        return lambda: normalize_ride_status("bid_accepted")
+
+A setup that holds resources (threads, event loops) yields the callable
+instead and releases them after the ``yield``, as with ``contextmanager``.
+
+Each callable is auto-ranged to roughly ``min_time`` seconds per sample; the
+fastest of ``repeat`` samples is reported as nanoseconds per call, which is
+the most stable statistic for CPU-bound code on a shared machine.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from inspect import isgeneratorfunction
+from typing import Callable, Dict, List, Optional
+
+_registry: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    def decorator(setup):
+        _registry[name] = setup
+        return setup
+    return decorator
+
+
+def registered() -> Dict[str, Callable[[], Callable[[], object]]]:
+    return dict(_registry)
+
+
+@contextmanager
+def prepared(setup):
+    """The callable from *setup*; a generator setup is closed on exit."""
+    if isgeneratorfunction(setup):
+        with contextmanager(setup)() as fn:
+            yield fn
+    else:
+        yield setup()
+
+
+def measure(fn: Callable[[], object], min_time: float = 0.2, repeat: int = 5) -> dict:
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / 5 or number >= 1 << 24:
+            break
+        number *= 10 if elapsed < min_time / 50 else 2
+    number = max(1, int(number * (min_time / max(elapsed, 1e-9))))
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) / number)
+    samples.sort()
+    return {
+        "ns_per_op": round(samples[0] * 1e9, 1),
+        "median_ns": round(samples[len(samples) // 2] * 1e9, 1),
+        "loops": number,
+        "repeat": repeat,
+    }
+
+
+def run(names: Optional[List[str]] = None, min_time: float = 0.2, repeat: int = 5) -> Dict[str, dict]:
+    results = {}
+    for name, setup in sorted(_registry.items()):
+        if names and not any(part in name for part in names):
+            continue
+        with prepared(setup) as fn:
+            results[name] = measure(fn, min_time=min_time, repeat=repeat)
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[dict]:
+    """Rows for every benchmark present in both runs; ``regressed`` when slower by more than *threshold*."""
+    rows = []
+    for name, current in sorted(results.items()):
+        before = baseline.get(name)
+        if not before:
+            continue
+        ratio = current["ns_per_op"] / before["ns_per_op"] if before["ns_per_op"] else float("inf")
+        rows.append({
+            "name": name,
+            "baseline_ns": before["ns_per_op"],
+            "current_ns": current["ns_per_op"],
+            "ratio": round(ratio, 3),
+            "regressed": ratio > 1 + threshold,
+        })
+    return rows
+
+
+def _environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform(terse=True),
+    }
+
+
+def main(default_baseline: str, argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run micro-benchmarks, save or compare baselines")
+    parser.add_argument("-k", dest="filters", action="append", help="only run benchmarks whose name contains this")
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="compare against the baseline; exit 1 on regressions")
+    parser.add_argument("--baseline", default=default_baseline)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before flagging (0.25 = 25%%)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per sample")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = run(args.filters, min_time=args.min_time, repeat=args.repeat)
+    report = {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "environment": _environment(),
+        "benchmarks": results,
+    }
+    exit_code = 0
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --save first", file=sys.stderr)
+            return 2
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        rows = compare(results, baseline.get("benchmarks", {}), args.threshold)
+        report["comparison"] = {"threshold": args.threshold, "baseline_environment": baseline.get("environment"), "rows": rows}
+        regressions = [row["name"] for row in rows if row["regressed"]]
+        report["regressions"] = regressions
+        exit_code = 1 if regressions else 0
+
+    if args.save:
+        merged = {}
+        if args.filters and os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as fh:
+                merged = json.load(fh).get("benchmarks", {})
+        merged.update(results)
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump({**report, "benchmarks": merged}, fh, indent=2, sort_keys=True)
+            fh.write("\n")
+
+    print(json.dumps(report, indent=2, sort_keys=True))
+    return exit_code
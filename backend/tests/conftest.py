@@ -1,3 +1,4 @@
+import json
 import pytest
 import sys
 import os
@@ -5,39 +6,23 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+# Use in-memory SQLite for testing: database.engine is then a single
+# StaticPool connection shared by the app, its startup check and the tests
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+# Background workers would share that connection with the test; tests call
+# outbox.claim_batch / run_once themselves instead
+os.environ["BACKGROUND_WORKERS_ENABLED"] = "0"
 
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import event
 
-from database import Base, get_db
+from database import Base, SessionLocal as TestingSessionLocal, engine
 from main import app
 from datetime import datetime, timedelta
+import uuid
+import auth
 import models
 
-# Use in-memory SQLite for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
-
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
-
-
-app.dependency_overrides[get_db] = override_get_db
-
 
 @pytest.fixture(scope="function")
 def db():
@@ -169,3 +154,101 @@ def test_trip(client, auth_headers_passenger):
     }, headers=auth_headers_passenger)
     assert response.status_code == 201, response.text
     return response.json()
+
+
+class _Statements(list):
+    """Every statement the engine runs, from any thread (TestClient runs requests off this one)."""
+
+    def __init__(self, engine):
+        super().__init__()
+        self.engine = engine
+
+    def _record(self, conn, cursor, statement, *args):
+        self.append(" ".join(statement.split()).upper())
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+
+@pytest.fixture
+def sql_statements(db):
+    """Records the upper-cased SQL run inside ``with sql_statements as statements:``"""
+    return _Statements(db.get_bind())
+
+
+@pytest.fixture
+def make_user(db):
+    """``make_user(name, role="passenger", rating=None)`` adds a user (not yet committed) and returns its id
+
+    Drivers also get a ``Driver`` profile with *rating*.
+    """
+    def make(name, role="passenger", rating=None):
+        user = models.User(id=uuid.uuid4(), email=f"{name}-{uuid.uuid4().hex[:6]}@test.com", full_name=name, hashed_password="x", role=role)
+        db.add(user)
+        if role == "driver":
+            db.add(models.Driver(user_id=user.id, rating=rating))
+        return user.id
+    return make
+
+
+@pytest.fixture
+def bearer_headers():
+    """``bearer_headers(user_id)`` is the Authorization header for that user"""
+    def headers(user_id, role="passenger"):
+        return {"Authorization": f"Bearer {auth.create_access_token({'sub': str(user_id), 'role': role})}"}
+    return headers
+
+
+@pytest.fixture
+def make_shared_trip(db):
+    """``make_shared_trip(creator_id, seats=4, **columns)``: a cash shared ride with the creator on board (one seat taken)
+
+    Pending and two hours out unless *columns* say otherwise; returns the trip id.
+    """
+    def make(creator_id, seats=4, **columns):
+        values = dict(
+            id=uuid.uuid4(), creator_passenger_id=creator_id,
+            origin_address="CHARUSAT", origin_lat=22.6, origin_lng=72.8,
+            dest_address="Anand", dest_lat=22.56, dest_lng=72.93,
+            start_time=datetime.utcnow() + timedelta(hours=2), payment_status="cash",
+            total_seats=seats, available_seats=seats - 1, total_price=300, price_per_seat=300, status="pending",
+        )
+        values.update(columns)
+        trip = models.Trip(**values)
+        db.add(trip)
+        db.add(models.TripPassenger(id=uuid.uuid4(), trip_id=trip.id, passenger_id=creator_id, seats_booked=1))
+        db.add(models.Booking(
+            id=uuid.uuid4(), trip_id=trip.id, passenger_id=creator_id, seats_booked=1,
+            total_price=300, status="confirmed", payment_status="cash",
+        ))
+        return trip.id
+    return make
+
+
+@pytest.fixture
+def trip_fares(db):
+    """``trip_fares(trip_id)`` maps each booked passenger to ``(total_price, payment_status)``"""
+    def fares(trip_id):
+        db.expire_all()
+        return {b.passenger_id: (float(b.total_price), b.payment_status) for b in db.query(models.Booking).filter_by(trip_id=trip_id)}
+    return fares
+
+
+class FakeWebSocket:
+    """Stands in for a connected WebSocket; ``sent`` holds the JSON frames sent to it."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+@pytest.fixture
+def fake_websocket():
+    """``fake_websocket()`` makes a ``FakeWebSocket``"""
+    return FakeWebSocket
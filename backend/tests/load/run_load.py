@@ -0,0 +1,439 @@
+"""Self-contained async load test for the full shared-ride lifecycle.
+
+Run from ``backend/``::
+
+    python -m tests.load.run_load --passengers 50 --drivers 10 --output load.json
+    python -m tests.load.run_load --database-url postgresql://... --output load-pg.json
+
+The app is served by an in-process uvicorn server (its own thread and event
+loop) against a throwaway SQLite file, or the given database.  Drivers and
+passengers are seeded directly, hold a ``/ws`` connection each, and every
+passenger runs
+
+    create-shared → bid → counter → accept → verify-otp → location × K
+    → complete → rate-driver
+
+with its assigned driver.  The JSON report has p50/p95/p99 latency per route,
+throughput, SQL statements per request (counted on the engine) and WebSocket
+delivery lag measured from the start of the triggering request, so runs from
+different releases can be diffed directly.
+
+Rate limits are keyed by client IP, so they are disabled unless
+``--keep-rate-limits`` is given; everything here comes from 127.0.0.1.
+
+SQLite cannot take concurrent writers with the handlers' read-then-write
+transactions (lock upgrades fail with "database is locked"), so lifecycles
+run one at a time there by default; use PostgreSQL for concurrency runs.
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import random
+import re
+import socket
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BACKEND_DIR)
+
+_UUID_SEGMENT = re.compile(r"/[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+_current_queries = contextvars.ContextVar("load_current_queries", default=None)
+
+
+def route_label(method: str, path: str) -> str:
+    return f"{method} {_UUID_SEGMENT.sub('/{id}', path)}"
+
+
+def percentile(sorted_values, pct: float):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize_ms(values_s):
+    values = sorted(v * 1000 for v in values_s)
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 3),
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(values[-1], 3),
+    }
+
+
+class QueryCountingApp:
+    """ASGI wrapper attributing SQL statements on the app engine to the HTTP route."""
+
+    def __init__(self, app, engine):
+        from sqlalchemy import event
+
+        self.app = app
+        self.per_route = defaultdict(list)
+        self.background = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        holder = _current_queries.get()
+        if holder is not None:
+            holder[0] += 1
+        else:
+            with self._lock:
+                self.background += 1
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        holder = [0]
+        token = _current_queries.set(holder)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_queries.reset(token)
+            with self._lock:
+                self.per_route[route_label(scope["method"], scope["path"])].append(holder[0])
+
+
+class ServerThread(threading.Thread):
+    def __init__(self, app, port: int):
+        import uvicorn
+
+        super().__init__(daemon=True)
+        config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on", ws="websockets")
+        self.server = uvicorn.Server(config)
+
+    def run(self):
+        self.server.run()
+
+    def wait_started(self, timeout: float = 30.0):
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.05)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.join(timeout=10)
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.expected_events = {}
+        self.received_events = []
+        self.errors = []
+
+    def expect(self, recipient: str, event_type: str, trip_id: str, sent_at: float):
+        self.expected_events[(recipient, event_type, trip_id)] = sent_at
+
+    def websocket_report(self):
+        lags = defaultdict(list)
+        for recipient, event_type, trip_id, received_at in self.received_events:
+            sent_at = self.expected_events.get((recipient, event_type, trip_id))
+            if sent_at is not None:
+                lags[event_type].append(received_at - sent_at)
+        expected = defaultdict(int)
+        for _, event_type, _ in self.expected_events:
+            expected[event_type] += 1
+        return {
+            event_type: {"expected": expected[event_type], "delivered": len(lags[event_type]), **summarize_ms(lags[event_type])}
+            for event_type in sorted(expected)
+        }
+
+
+class StepFailed(Exception):
+    pass
+
+
+class LoadClient:
+    def __init__(self, http, recorder: Recorder):
+        self.http = http
+        self.recorder = recorder
+
+    async def call(self, method: str, path: str, token: str, expected: int = 200, **kwargs):
+        label = route_label(method, path)
+        started = time.perf_counter()
+        response = await self.http.request(method, path, headers={"Authorization": f"Bearer {token}"}, **kwargs)
+        self.recorder.latencies[label].append(time.perf_counter() - started)
+        self.recorder.statuses[label][str(response.status_code)] += 1
+        if response.status_code != expected:
+            raise StepFailed(f"{label} -> {response.status_code}: {response.text[:200]}")
+        return started, response.json()
+
+
+async def listen(ws_url: str, user_id: str, token: str, recorder: Recorder, ready: asyncio.Event, stop: asyncio.Event):
+    import websockets
+
+    async with websockets.connect(f"{ws_url}?token={token}", max_size=None) as ws:
+        ready.set()
+        while not stop.is_set():
+            try:
+                raw = await asyncio.wait_for(ws.recv(), timeout=0.25)
+            except asyncio.TimeoutError:
+                continue
+            received_at = time.perf_counter()
+            message = json.loads(raw)
+            if message.get("type") == "new_ride_available":
+                recorder.received_events.append((user_id, "new_ride_available", message["trip"]["id"], received_at))
+            elif message.get("type") == "notification":
+                data = message.get("data") or {}
+                trip_id = (data.get("link") or "").rsplit("/", 1)[-1]
+                recorder.received_events.append((user_id, data.get("type"), trip_id, received_at))
+
+
+def _random_point_in_service_area(rng: random.Random):
+    from services.geofence import get_geofence_engine
+
+    engine = get_geofence_engine()
+    area = rng.choice(engine.areas)
+    min_lat, min_lng, max_lat, max_lng = area.bbox
+    while True:
+        lat, lng = rng.uniform(min_lat, max_lat), rng.uniform(min_lng, max_lng)
+        if area.contains(lat, lng):
+            return round(lat, 6), round(lng, 6)
+
+
+def seed_users(passengers: int, drivers: int):
+    import auth
+    import models
+    from database import SessionLocal
+
+    run_id = uuid.uuid4().hex[:8]
+    db = SessionLocal()
+    users = {"passenger": [], "driver": []}
+    try:
+        for role, count in (("passenger", passengers), ("driver", drivers)):
+            for i in range(count):
+                user = models.User(
+                    id=uuid.uuid4(),
+                    email=f"load-{run_id}-{role}-{i}@commuto.test",
+                    full_name=f"Load {role.title()} {i}",
+                    hashed_password="!",
+                    role=role,
+                    is_verified=True,
+                    profile_completed=True,
+                )
+                db.add(user)
+                if role == "driver":
+                    db.add(models.Driver(user_id=user.id, license_number=f"LOAD{i:05d}", rating=5, rating_count=0, total_trips=0))
+                else:
+                    db.add(models.Passenger(user_id=user.id))
+                db.add(models.Wallet(user_id=user.id, balance=100000))
+                token = auth.create_access_token({"sub": str(user.id), "role": role})
+                users[role].append((str(user.id), token))
+        db.commit()
+    finally:
+        db.close()
+    return users
+
+
+async def ride_lifecycle(client: LoadClient, recorder: Recorder, rng: random.Random, passenger, driver, drivers, args):
+    passenger_id, passenger_token = passenger
+    driver_id, driver_token = driver
+    origin = _random_point_in_service_area(rng)
+    dest = _random_point_in_service_area(rng)
+    start = datetime.utcnow() + timedelta(days=1, minutes=rng.randint(0, 600))
+
+    sent_at, trip = await client.call("POST", "/rides/create-shared", passenger_token, expected=201, json={
+        "from_location": {"address": "Load origin", "lat": origin[0], "lng": origin[1]},
+        "to_location": {"address": "Load destination", "lat": dest[0], "lng": dest[1]},
+        "date": start.strftime("%Y-%m-%d"),
+        "time": start.strftime("%H:%M"),
+        "total_seats": 3,
+        "total_price": 300,
+        "payment_method": "cash",
+    })
+    trip_id = trip["id"]
+    for other_driver_id, _ in drivers:
+        recorder.expect(other_driver_id, "new_ride_available", trip_id, sent_at)
+
+    sent_at, bid = await client.call("POST", f"/bids/{trip_id}", driver_token, expected=201, json={"amount": 280})
+    recorder.expect(passenger_id, "new_bid", trip_id, sent_at)
+
+    sent_at, counter = await client.call("POST", f"/bids/{bid['id']}/counter", passenger_token, json={"amount": 250})
+    recorder.expect(driver_id, "counter_bid", trip_id, sent_at)
+
+    sent_at, accepted = await client.call("POST", f"/bids/{counter['id']}/accept", driver_token)
+    recorder.expect(passenger_id, "bid_accepted", trip_id, sent_at)
+
+    _, started = await client.call("POST", f"/rides/{trip_id}/verify-otp", driver_token, json={"otp": accepted["otp"]})
+
+    for step in range(1, args.locations + 1):
+        fraction = step / args.locations
+        await client.call("POST", f"/rides/{trip_id}/location", driver_token, json={
+            "lat": origin[0] + (dest[0] - origin[0]) * fraction,
+            "lng": origin[1] + (dest[1] - origin[1]) * fraction,
+        })
+        if args.location_interval:
+            await asyncio.sleep(args.location_interval)
+
+    await client.call("POST", f"/rides/{trip_id}/complete", driver_token, json={"otp": started["completion_otp"]})
+    await client.call("POST", f"/rides/{trip_id}/rate-driver", passenger_token, json={"rating": rng.randint(3, 5)})
+
+
+async def run(args, base_url: str, counting_app: QueryCountingApp):
+    import httpx
+
+    recorder = Recorder()
+    users = seed_users(args.passengers, args.drivers)
+    drivers = users["driver"]
+    ws_url = base_url.replace("http://", "ws://") + "/ws"
+
+    stop = asyncio.Event()
+    listeners = []
+    for role in ("driver", "passenger"):
+        for user_id, token in users[role]:
+            ready = asyncio.Event()
+            listeners.append(asyncio.create_task(listen(ws_url, user_id, token, recorder, ready, stop)))
+            await ready.wait()
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    completed = 0
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as http:
+        client = LoadClient(http, recorder)
+
+        async def one(index, passenger):
+            nonlocal completed
+            rng = random.Random(args.seed * 1_000_003 + index)
+            async with semaphore:
+                try:
+                    await ride_lifecycle(client, recorder, rng, passenger, drivers[index % len(drivers)], drivers, args)
+                    completed += 1
+                except Exception as exc:
+                    recorder.errors.append(f"{type(exc).__name__}: {exc}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i, p) for i, p in enumerate(users["passenger"])))
+        elapsed = time.perf_counter() - started
+
+    # Give in-flight notifications a moment to land before closing sockets
+    await asyncio.sleep(args.ws_grace)
+    stop.set()
+    await asyncio.gather(*listeners, return_exceptions=True)
+
+    total_requests = sum(len(v) for v in recorder.latencies.values())
+    routes = {}
+    for label in sorted(recorder.latencies):
+        queries = counting_app.per_route.get(label, [])
+        routes[label] = {
+            **summarize_ms(recorder.latencies[label]),
+            "status_codes": dict(recorder.statuses[label]),
+            "db_queries": {
+                "total": sum(queries),
+                "per_request_mean": round(sum(queries) / len(queries), 2) if queries else 0,
+                "per_request_max": max(queries) if queries else 0,
+            },
+        }
+    return {
+        "throughput": {
+            "duration_s": round(elapsed, 3),
+            "requests": total_requests,
+            "requests_per_s": round(total_requests / elapsed, 2) if elapsed else None,
+            "lifecycles_completed": completed,
+            "lifecycles_failed": len(recorder.errors),
+            "lifecycles_per_s": round(completed / elapsed, 2) if elapsed else None,
+        },
+        "routes": routes,
+        "db": {
+            "request_queries": sum(sum(v) for v in counting_app.per_route.values()),
+            "background_queries": counting_app.background,
+        },
+        "websocket": recorder.websocket_report(),
+        "errors": recorder.errors[:20],
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--passengers", type=int, default=20)
+    parser.add_argument("--drivers", type=int, default=5)
+    parser.add_argument("--locations", type=int, default=5, help="location updates per ride")
+    parser.add_argument("--location-interval", type=float, default=0.0, help="seconds between location updates")
+    parser.add_argument("--concurrency", type=int, help="max lifecycles in flight (default 50; 1 on SQLite)")
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--ws-grace", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep-rate-limits", action="store_true")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    tmpdir = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        tmpdir = tempfile.TemporaryDirectory(prefix="commuto-load-")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir.name, 'load.db')}"
+
+    import logging
+
+    import rate_limiter
+    from database import Base, engine
+    from main import app
+
+    logging.getLogger().setLevel(logging.WARNING)
+    if args.concurrency is None:
+        args.concurrency = 1 if engine.url.get_backend_name() == "sqlite" else 50
+    Base.metadata.create_all(bind=engine)
+    if not args.keep_rate_limits:
+        rate_limiter.is_rate_limited = lambda key, max_requests, window_seconds: (False, max_requests, window_seconds)
+
+    counting_app = QueryCountingApp(app, engine)
+    port = _free_port()
+    server = ServerThread(counting_app, port)
+    server.start()
+    try:
+        server.wait_started()
+        results = asyncio.run(run(args, f"http://127.0.0.1:{port}", counting_app))
+    finally:
+        server.stop()
+        if tmpdir:
+            engine.dispose()
+            tmpdir.cleanup()
+
+    report = {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "config": {
+            "passengers": args.passengers,
+            "drivers": args.drivers,
+            "locations_per_ride": args.locations,
+            "concurrency": args.concurrency,
+            "database": engine.url.get_backend_name(),
+            "rate_limits": "enabled" if args.keep_rate_limits else "disabled",
+            "seed": args.seed,
+        },
+        **results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    return 0 if not results["errors"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
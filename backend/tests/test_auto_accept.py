@@ -0,0 +1,87 @@
+import uuid
+from datetime import datetime, timedelta
+
+import models
+from services import auto_accept, bid_book
+
+CHARUSAT = {"address": "CHARUSAT, Changa", "lat": 22.6005, "lng": 72.8194}
+ANAND = {"address": "Anand Station", "lat": 22.5645, "lng": 72.9289}
+
+
+def _create_trip(client, headers, rule):
+    start = datetime.utcnow() + timedelta(days=1)
+    response = client.post("/rides/create-shared", json={
+        "from_location": CHARUSAT,
+        "to_location": ANAND,
+        "date": start.strftime("%Y-%m-%d"),
+        "time": start.strftime("%H:%M"),
+        "total_seats": 3,
+        "total_price": 300,
+        "payment_method": "cash",
+        "auto_accept": rule,
+    }, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def test_first_qualifying_bid_is_accepted_inline(client, db, make_user, bearer_headers):
+    bid_book.cache.clear()
+    passenger = make_user("Rider")
+    pricey, unrated, good, late = (
+        make_user(name, "driver", rating=rating)
+        for name, rating in [("Pricey", 4.8), ("New", None), ("Good", 4.5), ("Late", 4.9)]
+    )
+    db.commit()
+    trip_id = _create_trip(client, bearer_headers(passenger), {"max_price": 250, "min_rating": 4.0})
+
+    assert client.post(f"/bids/{trip_id}", json={"amount": 280}, headers=bearer_headers(pricey, "driver")).json()["status"] == "pending"
+    assert client.post(f"/bids/{trip_id}", json={"amount": 200}, headers=bearer_headers(unrated, "driver")).json()["status"] == "pending"
+    accepted = client.post(f"/bids/{trip_id}", json={"amount": 240}, headers=bearer_headers(good, "driver"))
+    assert accepted.status_code == 201
+    assert accepted.json()["status"] == "accepted"
+    assert client.post(f"/bids/{trip_id}", json={"amount": 150}, headers=bearer_headers(late, "driver")).status_code == 404
+
+    db.expire_all()
+    trip = db.get(models.Trip, uuid.UUID(trip_id))
+    assert (trip.status, trip.driver_id, float(trip.total_price)) == ("accepted", good, 240.0)
+    assert trip.start_otp
+    statuses = {bid.driver_id: bid.status for bid in db.query(models.TripBid)}
+    assert statuses == {pricey: "rejected", unrated: "rejected", good: "accepted"}
+
+
+def test_rule_is_ignored_after_its_deadline(client, db, make_user, bearer_headers):
+    passenger = make_user("Rider")
+    db.commit()
+    trip_id = _create_trip(client, bearer_headers(passenger), {"max_price": 250})
+    rule = db.get(models.AutoAcceptRule, uuid.UUID(trip_id))
+    rule.deadline = datetime.utcnow() - timedelta(minutes=1)
+    driver = make_user("Driver", "driver", rating=5)
+    db.commit()
+
+    assert client.post(f"/bids/{trip_id}", json={"amount": 100}, headers=bearer_headers(driver, "driver")).json()["status"] == "pending"
+
+
+def test_deadline_must_be_in_the_future(client, db, make_user, bearer_headers):
+    passenger = make_user("Rider")
+    db.commit()
+    start = datetime.utcnow() + timedelta(days=1)
+
+    response = client.post("/rides/create-shared", json={
+        "from_location": CHARUSAT, "to_location": ANAND,
+        "date": start.strftime("%Y-%m-%d"), "time": start.strftime("%H:%M"),
+        "total_seats": 2, "total_price": 300, "payment_method": "cash",
+        "auto_accept": {"max_price": 250, "deadline": (datetime.utcnow() - timedelta(hours=1)).isoformat()},
+    }, headers=bearer_headers(passenger))
+
+    assert response.status_code == 400
+
+
+def test_deadline_is_capped_at_trip_start():
+    start = datetime(2026, 11, 2, 8, 30)
+    trip = models.Trip(id=uuid.uuid4(), start_time=start)
+
+    rule = auto_accept.build_rule(trip, 250, None, start + timedelta(days=3))
+
+    assert rule.deadline == start
+    assert auto_accept.qualifies(rule, 250, None, start - timedelta(minutes=5))
+    assert not auto_accept.qualifies(rule, 250.01, None, start - timedelta(minutes=5))
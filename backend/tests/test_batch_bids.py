@@ -0,0 +1,77 @@
+import uuid
+from datetime import datetime, timedelta
+
+import models
+from services import bid_book
+
+
+def test_batch_validates_in_sets_and_inserts_once(client, db, sql_statements, make_user, bearer_headers, make_shared_trip):
+    bid_book.cache.clear()
+    asha_id, bala_id = make_user("Asha"), make_user("Bala")
+    driver_id = make_user("Dev", "driver", rating=4.5)
+    anand, nadiad = make_shared_trip(asha_id), make_shared_trip(asha_id, dest_address="Nadiad")
+    vadodara = make_shared_trip(bala_id, dest_address="Vadodara")
+    taken = make_shared_trip(bala_id, dest_address="Petlad", status="accepted")
+    bid_on = make_shared_trip(bala_id, dest_address="Karamsad")
+    db.add(models.TripBid(id=uuid.uuid4(), trip_id=bid_on, driver_id=driver_id, bid_amount=150, status="pending", version=0))
+    db.commit()
+
+    items = [
+        {"ride_id": str(anand), "amount": 200, "message": "On my way to work"},
+        {"ride_id": str(taken), "amount": 180},
+        {"ride_id": str(nadiad), "amount": 260},
+        {"ride_id": str(bid_on), "amount": 140},
+        {"ride_id": str(vadodara), "amount": 450},
+        {"ride_id": str(anand), "amount": 190},
+    ]
+    with sql_statements as statements:
+        response = client.post("/bids/batch", json={"bids": items}, headers=bearer_headers(driver_id, "driver"))
+
+    assert response.status_code == 200, response.text
+    results = response.json()
+    assert [r["ride_id"] for r in results] == [item["ride_id"] for item in items]
+    assert [r["bid"]["status"] if r["bid"] else r["error"] for r in results] == [
+        "pending",
+        "Trip not found or no longer accepting bids",
+        "pending",
+        "You already have a pending bid on this trip",
+        "pending",
+        "You already have a pending bid on this trip",
+    ]
+    assert results[0]["bid"]["message"] == "On my way to work"
+
+    assert len([s for s in statements if s.startswith("INSERT INTO TRIP_BIDS")]) == 1
+    assert len([s for s in statements if s.startswith("SELECT") and "FROM TRIPS" in s]) == 1
+
+    db.expire_all()
+    # One notification per passenger, however many of their rides were covered
+    new_bid_events = [event.payload for event in db.query(models.OutboxEvent) if event.payload.get("type") == "new_bid"]
+    assert len(new_bid_events) == 2
+    notices = {payload["recipients"][0]: payload for payload in new_bid_events}
+    assert notices[str(asha_id)]["title"] == "New Bids Received"
+    assert "2 of your trips" in notices[str(asha_id)]["message"]
+    assert notices[str(bala_id)]["title"] == "New Bid Received"
+    assert db.query(models.TripBid).filter_by(driver_id=driver_id, status="pending").count() == 4
+
+
+def test_batch_applies_auto_accept_rules(client, db, make_user, bearer_headers, make_shared_trip):
+    bid_book.cache.clear()
+    passenger_id, driver_id = make_user("Rider"), make_user("Dev", "driver", rating=4.5)
+    trip_id = make_shared_trip(passenger_id)
+    db.add(models.AutoAcceptRule(trip_id=trip_id, max_price=250, deadline=datetime.utcnow() + timedelta(hours=1)))
+    db.commit()
+
+    response = client.post("/bids/batch", json={"bids": [{"ride_id": str(trip_id), "amount": 240}]}, headers=bearer_headers(driver_id, "driver"))
+
+    assert response.json()[0]["bid"]["status"] == "accepted"
+    db.expire_all()
+    assert db.get(models.Trip, trip_id).driver_id == driver_id
+
+
+def test_batch_size_is_bounded(client, db, make_user, bearer_headers):
+    driver_id = make_user("Dev", "driver", rating=4.5)
+    db.commit()
+    items = [{"ride_id": str(uuid.uuid4()), "amount": 100} for _ in range(26)]
+
+    assert client.post("/bids/batch", json={"bids": items}, headers=bearer_headers(driver_id, "driver")).status_code == 422
+    assert client.post("/bids/batch", json={"bids": []}, headers=bearer_headers(driver_id, "driver")).status_code == 422
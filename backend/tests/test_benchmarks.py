@@ -0,0 +1,30 @@
+"""Smoke-run the micro-benchmarks so the bench suite cannot rot silently."""
+import pytest
+
+from tests.bench import bench_hot_paths  # noqa: F401  (registers benchmarks)
+from tests.bench.harness import compare, measure, prepared, registered
+
+
+@pytest.mark.parametrize("name", sorted(registered()))
+def test_benchmark_callable_runs(name):
+    with prepared(registered()[name]) as fn:
+        fn()
+
+
+def test_measure_reports_per_call_time():
+    result = measure(lambda: None, min_time=0.001, repeat=2)
+
+    assert result["ns_per_op"] > 0
+    assert result["loops"] >= 1
+
+
+def test_compare_flags_only_slowdowns_beyond_threshold():
+    baseline = {"a": {"ns_per_op": 100.0}, "b": {"ns_per_op": 100.0}, "gone": {"ns_per_op": 1.0}}
+    current = {"a": {"ns_per_op": 120.0}, "b": {"ns_per_op": 130.0}, "new": {"ns_per_op": 5.0}}
+
+    rows = {row["name"]: row for row in compare(current, baseline, threshold=0.25)}
+
+    assert set(rows) == {"a", "b"}
+    assert not rows["a"]["regressed"]
+    assert rows["b"]["regressed"]
+    assert rows["b"]["ratio"] == 1.3
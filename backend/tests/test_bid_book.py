@@ -0,0 +1,90 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+import models
+from services import bid_book
+
+
+@pytest.fixture
+def market(db, make_user, make_shared_trip):
+    """A requested trip with three open driver bids and one passenger counter-offer."""
+    passenger = make_user("Rider")
+    trip_id = make_shared_trip(passenger)
+    now = datetime.utcnow()
+    bids = {}
+    for name, rating, amount, minutes_ago in [("Asha", 4.9, 280, 30), ("Bala", None, 240, 20), ("Chirag", 4.2, 260, 10)]:
+        bids[name] = models.TripBid(
+            id=uuid.uuid4(), trip_id=trip_id, driver_id=make_user(name, "driver", rating=rating), bid_amount=amount,
+            status="pending", version=0, created_at=now - timedelta(minutes=minutes_ago),
+        )
+    db.add_all(bids.values())
+    db.add(models.TripBid(
+        id=uuid.uuid4(), trip_id=trip_id, driver_id=bids["Asha"].driver_id, bid_amount=200,
+        status="pending", is_counter_bid=True, version=0,
+    ))
+    db.commit()
+    return passenger, trip_id, bids
+
+
+def test_orderings_are_served_from_one_cached_book(client, sql_statements, market, bearer_headers):
+    bid_book.cache.clear()
+    passenger, trip_id, _ = market
+    headers = bearer_headers(passenger)
+
+    def names(order):
+        response = client.get(f"/bids/{trip_id}/all", params={"order": order}, headers=headers)
+        assert response.status_code == 200
+        return [bid["driver_name"] for bid in response.json()]
+
+    with sql_statements as statements:
+        assert names("newest") == ["Chirag", "Bala", "Asha"]
+        assert names("price") == ["Bala", "Chirag", "Asha"]
+        assert names("rating") == ["Asha", "Chirag", "Bala"]
+
+    assert len([s for s in statements if "FROM TRIP_BIDS JOIN" in s]) == 1
+
+    best = client.get(f"/bids/{trip_id}/best", headers=headers).json()
+    assert (best["driver_name"], best["bid_amount"]) == ("Bala", 240)
+
+
+def test_writes_invalidate_the_book(client, db, market, make_user, bearer_headers):
+    bid_book.cache.clear()
+    passenger, trip_id, _ = market
+    headers = bearer_headers(passenger)
+    assert len(client.get(f"/bids/{trip_id}/all", headers=headers).json()) == 3
+
+    driver = make_user("Dev", "driver", rating=4.0)
+    db.commit()
+    assert client.post(f"/bids/{trip_id}", json={"amount": 220}, headers=bearer_headers(driver, "driver")).status_code == 201
+
+    bids = client.get(f"/bids/{trip_id}/all", params={"order": "price", "limit": 2}, headers=headers).json()
+    assert [bid["driver_name"] for bid in bids] == ["Dev", "Bala"]
+
+
+def test_accept_rejects_other_bids_in_one_update(client, db, sql_statements, market, bearer_headers):
+    bid_book.cache.clear()
+    passenger, trip_id, bids = market
+
+    with sql_statements as statements:
+        response = client.post(f"/bids/{bids['Chirag'].id}/accept", headers=bearer_headers(passenger))
+
+    assert response.status_code == 200
+    # The accepted bid's own UPDATE plus one set-based reject of the rest
+    assert len([s for s in statements if s.startswith("UPDATE TRIP_BIDS")]) == 2
+    db.expire_all()
+    statuses = {bid.driver_id: (bid.status, bid.version) for bid in db.query(models.TripBid).filter_by(is_counter_bid=False)}
+    assert statuses[bids["Chirag"].driver_id] == ("accepted", 1)
+    assert statuses[bids["Asha"].driver_id] == ("rejected", 1)
+    assert statuses[bids["Bala"].driver_id] == ("rejected", 1)
+    assert client.get(f"/bids/{trip_id}/all", headers=bearer_headers(passenger)).json() == []
+
+
+def test_only_trip_passengers_see_the_book(client, db, market, make_user, bearer_headers):
+    _, trip_id, _ = market
+    outsider = make_user("Nosy")
+    db.commit()
+
+    assert client.get(f"/bids/{trip_id}/all", headers=bearer_headers(outsider)).status_code == 403
+    assert client.get(f"/bids/{uuid.uuid4()}/best", headers=bearer_headers(outsider)).status_code == 404
@@ -0,0 +1,97 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+
+import pytest
+
+import models
+from routers import bids_router
+from services import bid_book, bid_feed
+from websocket_manager import manager
+
+
+@pytest.fixture
+def fresh_feeds(monkeypatch):
+    monkeypatch.setattr(bid_feed, "_feeds", OrderedDict())
+    monkeypatch.setattr(bid_feed, "load_bid_snapshot", lambda trip_id: [{"id": "snapshot-bid"}])
+    yield
+    for channel in [c for c in manager.channel_subscribers if c.startswith("trip_bids:")]:
+        manager.channel_subscribers.pop(channel, None)
+
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    """Collect the coroutines routes hand to the event loop so the test can run them."""
+    coroutines = []
+    monkeypatch.setattr(bids_router, "_dispatch_websocket_notification", lambda coro, loop: coroutines.append(coro))
+
+    def run():
+        async def drain():
+            for coro in coroutines:
+                await coro
+        asyncio.run(drain())
+        coroutines.clear()
+    return run
+
+
+def test_snapshot_then_per_trip_sequenced_deltas(fresh_feeds, fake_websocket):
+    ws = fake_websocket()
+    asyncio.run(bid_feed.subscribe_bids(ws, "trip-1"))
+    bid = models.TripBid(id=uuid.uuid4(), trip_id="trip-1", status="rejected")
+    asyncio.run(bid_feed.publish_bid_removed(bid))
+    asyncio.run(bid_feed.publish_bids_closed("trip-2"))
+    asyncio.run(bid_feed.publish_bids_closed("trip-1"))
+
+    snapshot, removed, closed = ws.sent
+    assert snapshot == {"type": "bids_snapshot", "trip_id": "trip-1", "data": {"seq": 0, "bids": [{"id": "snapshot-bid"}]}}
+    assert removed["type"] == "bid_removed" and removed["data"] == {"seq": 1, "bid_id": str(bid.id), "status": "rejected"}
+    assert closed["type"] == "bids_closed" and closed["data"]["seq"] == 2
+    assert bid_feed.trip_feed("trip-2").seq == 1
+
+
+def test_resume_replays_missed_deltas(fresh_feeds, fake_websocket):
+    for _ in range(3):
+        asyncio.run(bid_feed.publish_bids_closed("trip-1"))
+    ws = fake_websocket()
+
+    asyncio.run(bid_feed.subscribe_bids(ws, "trip-1", resume_from=1))
+
+    assert [m["data"]["seq"] for m in ws.sent[:-1]] == [2, 3]
+    assert ws.sent[-1] == {"type": "bids_resumed", "trip_id": "trip-1", "data": {"seq": 3, "replayed": 2}}
+
+
+def test_bid_routes_publish_to_the_trip_feed(client, db, fresh_feeds, dispatched, make_user, make_shared_trip, bearer_headers, fake_websocket):
+    bid_book.cache.clear()
+    passenger = make_user("Rider")
+    asha = make_user("Asha", "driver", rating=4.5)
+    bala = make_user("Bala", "driver", rating=4.5)
+    trip_id = make_shared_trip(passenger)
+    db.commit()
+    room = fake_websocket()
+    manager.subscribe(room, bid_feed.bid_channel(trip_id))
+    asha_socket, bala_socket = fake_websocket(), fake_websocket()
+    manager.active_connections[str(asha)] = {asha_socket}
+    manager.active_connections[str(bala)] = {bala_socket}
+
+    try:
+        first = client.post(f"/bids/{trip_id}", json={"amount": 280}, headers=bearer_headers(asha, "driver")).json()
+        client.post(f"/bids/{trip_id}", json={"amount": 250}, headers=bearer_headers(bala, "driver"))
+        dispatched()
+        countered = client.post(f"/bids/{first['id']}/counter", json={"amount": 230}, headers=bearer_headers(passenger)).json()
+        dispatched()
+        client.post(f"/bids/{countered['id']}/accept", headers=bearer_headers(asha, "driver"))
+        dispatched()
+    finally:
+        manager.active_connections.pop(str(asha), None)
+        manager.active_connections.pop(str(bala), None)
+
+    assert [(m["type"], m["data"]["seq"]) for m in room.sent] == [
+        ("bid_added", 1), ("bid_added", 2), ("bid_removed", 3), ("bids_closed", 4),
+    ]
+    assert room.sent[0]["data"]["bid"]["driver_name"] == "Asha"
+    assert room.sent[3]["data"]["accepted_bid_id"] == countered["id"]
+    # Drivers also get outbox notifications on the same socket
+    asha_updates = [m["data"] for m in asha_socket.sent if m["type"] == "bid_status_update"]
+    bala_updates = [m["data"] for m in bala_socket.sent if m["type"] == "bid_status_update"]
+    assert [u["status"] for u in asha_updates] == ["countered", "accepted"]
+    assert bala_updates == [{"trip_id": str(trip_id), "status": "rejected"}]
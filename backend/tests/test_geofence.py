@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from services import geofence
+from services.geofence import (
+    CHARUSAT_SERVICE_POLYGON,
+    GeofenceEngine,
+    ServiceArea,
+    _ray_cast_contains,
+    validate_ride_coordinates,
+)
+
+SQUARE_WITH_HOLE = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "properties": {"name": "Square City"},
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [
+                    [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]],
+                    [[4, 4], [6, 4], [6, 6], [4, 6], [4, 4]],
+                ],
+            },
+        },
+        {
+            "type": "Feature",
+            "properties": {"name": "Charusat"},
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [[[lng, lat] for lat, lng in CHARUSAT_SERVICE_POLYGON]],
+            },
+        },
+    ],
+}
+
+
+@pytest.fixture
+def multi_region_engine():
+    engine = GeofenceEngine.from_geojson(SQUARE_WITH_HOLE)
+    geofence.set_geofence_engine(engine)
+    yield engine
+    geofence.set_geofence_engine(None)
+
+
+class TestGeofenceEngine:
+    def test_default_engine_matches_reference_ray_cast(self):
+        engine = geofence.get_geofence_engine()
+        rng = random.Random(7)
+        for _ in range(2000):
+            lat = rng.uniform(22.3, 22.9)
+            lng = rng.uniform(72.6, 73.1)
+            assert engine.contains(lat, lng) == _ray_cast_contains(CHARUSAT_SERVICE_POLYGON, lat, lng)
+
+    def test_holes_and_multiple_regions(self, multi_region_engine):
+        assert multi_region_engine.find_area(2, 2).name == "Square City"
+        assert not multi_region_engine.contains(5, 5)  # inside the hole
+        assert multi_region_engine.find_area(22.6005, 72.8194).name == "Charusat"
+        assert not multi_region_engine.contains(23.0225, 72.5714)  # Ahmedabad
+
+    def test_contains_many_matches_scalar_checks(self, multi_region_engine):
+        rng = random.Random(11)
+        lats = [rng.uniform(-1, 11) for _ in range(500)] + [rng.uniform(22.3, 22.9) for _ in range(500)]
+        lngs = [rng.uniform(-1, 11) for _ in range(500)] + [rng.uniform(72.6, 73.1) for _ in range(500)]
+
+        batch = multi_region_engine.contains_many(lats, lngs)
+
+        assert [bool(v) for v in batch] == [multi_region_engine.contains(a, b) for a, b in zip(lats, lngs)]
+
+    def test_validation_message_lists_all_regions(self, multi_region_engine):
+        with pytest.raises(ValueError) as exc:
+            validate_ride_coordinates(5, 5, 2, 2)
+        assert "Your pickup location is outside" in str(exc.value)
+        assert "Square City and Charusat" in str(exc.value)
+
+    def test_geojson_export_round_trips(self):
+        area = ServiceArea("Box", [(0, 0), (0, 1), (1, 1), (1, 0)], holes=[[(0.4, 0.4), (0.4, 0.6), (0.6, 0.6)]])
+        feature = area.to_geojson_feature()
+
+        engine = GeofenceEngine.from_geojson(feature)
+
+        assert engine.contains(0.2, 0.2)
+        assert not engine.contains(0.45, 0.5)
+        assert feature["geometry"]["coordinates"][0][0] == feature["geometry"]["coordinates"][0][-1]
+
+    def test_single_region_export_is_a_feature(self):
+        assert geofence.get_service_area_geojson()["type"] == "Feature"
@@ -0,0 +1,70 @@
+import gzip
+import json
+import math
+
+import pytest
+
+from services import geofence
+from services.geofence import GeofenceEngine, ServiceArea
+from services.geofence_boundary import (
+    douglas_peucker,
+    get_boundary_payload,
+    simplify_ring,
+    zoom_tolerance,
+)
+
+
+def _circle(points=720, radius=0.1):
+    return [
+        (22.6 + radius * math.sin(2 * math.pi * i / points), 72.8 + radius * math.cos(2 * math.pi * i / points))
+        for i in range(points)
+    ]
+
+
+@pytest.fixture
+def dense_engine():
+    geofence.set_geofence_engine(GeofenceEngine([ServiceArea("Circle", _circle())]))
+    yield
+    geofence.set_geofence_engine(None)
+
+
+class TestSimplification:
+    def test_douglas_peucker_drops_collinear_points(self):
+        line = [(0, 0), (0, 1), (0, 2), (0, 3), (1, 3)]
+        assert douglas_peucker(line, 0.01) == [(0, 0), (0, 3), (1, 3)]
+
+    def test_simplify_ring_never_degenerates(self):
+        ring = _circle(points=32)
+        assert len(simplify_ring(ring, 10.0)) >= 3
+        assert simplify_ring(ring, 0) == ring
+
+    def test_lower_zoom_levels_are_smaller(self, dense_engine):
+        coarse = get_boundary_payload(4)
+        full = get_boundary_payload(None)
+
+        assert len(coarse.body) < len(full.body)
+        assert coarse.etag != full.etag
+        vertices = len(json.loads(coarse.body)["geometry"]["coordinates"][0])
+        assert 4 <= vertices < 720
+        assert zoom_tolerance(4) > zoom_tolerance(14)
+
+
+class TestBoundaryEndpoint:
+    def test_boundary_served_with_cache_headers_and_gzip(self, client):
+        response = client.get("/geofence/boundary", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "max-age" in response.headers["cache-control"]
+        assert response.json()["type"] == "Feature"
+        payload = get_boundary_payload(None)
+        assert gzip.decompress(payload.gzipped) == payload.body
+
+    def test_if_none_match_returns_304(self, client):
+        first = client.get("/geofence/boundary", headers={"Accept-Encoding": "identity"})
+        etag = first.headers["etag"]
+
+        second = client.get("/geofence/boundary", headers={"If-None-Match": etag, "Accept-Encoding": "identity"})
+
+        assert second.status_code == 304
+        assert second.content == b""
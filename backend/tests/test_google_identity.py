@@ -0,0 +1,152 @@
+import time
+import uuid
+
+import models
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from routers import auth_router
+from services import google_identity
+from services.google_identity import GoogleKeyCache, parse_max_age, verify_with_cache
+
+CLIENT_ID = "commuto-test.apps.googleusercontent.com"
+
+
+def _keypair(kid):
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public = jwk.construct(pem, "RS256").public_key().to_dict()
+    public["kid"] = kid
+    return pem, public
+
+
+class FakeKeySource:
+    def __init__(self, *keys, max_age=3600):
+        self.keys = {key["kid"]: key for key in keys}
+        self.max_age = max_age
+        self.fetches = 0
+        self.fail = False
+
+    def fetch(self):
+        self.fetches += 1
+        if self.fail:
+            raise ConnectionError("google unreachable")
+        return dict(self.keys), self.max_age
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+PEM, PUBLIC = _keypair("k1")
+
+
+def _token(pem=PEM, kid="k1", **overrides):
+    claims = {
+        "iss": "https://accounts.google.com",
+        "aud": CLIENT_ID,
+        "sub": "1234",
+        "email": "rider@gmail.com",
+        "name": "Rider",
+        "iat": int(time.time()),
+        "exp": int(time.time()) + 600,
+        "at_hash": "ignored",
+    }
+    claims.update(overrides)
+    return jwt.encode(claims, pem, algorithm="RS256", headers={"kid": kid})
+
+
+def test_parse_max_age():
+    assert parse_max_age("public, max-age=19934, must-revalidate, no-transform") == 19934
+    assert parse_max_age("no-cache") is None
+    assert parse_max_age(None) is None
+
+
+def test_logins_verify_against_cached_keys():
+    source = FakeKeySource(PUBLIC)
+    cache = GoogleKeyCache(source)
+
+    for _ in range(5):
+        claims = verify_with_cache(cache, _token(), CLIENT_ID)
+
+    assert claims["email"] == "rider@gmail.com"
+    assert source.fetches == 1
+
+
+@pytest.mark.parametrize("overrides", [
+    {"aud": "someone-else"},
+    {"iss": "https://evil.example"},
+    {"exp": int(time.time()) - 60},
+])
+def test_rejects_invalid_claims(overrides):
+    cache = GoogleKeyCache(FakeKeySource(PUBLIC))
+
+    with pytest.raises(ValueError):
+        verify_with_cache(cache, _token(**overrides), CLIENT_ID)
+
+
+def test_rejects_token_signed_by_other_key():
+    other_pem, _ = _keypair("k1")
+    cache = GoogleKeyCache(FakeKeySource(PUBLIC))
+
+    with pytest.raises(ValueError):
+        verify_with_cache(cache, _token(pem=other_pem), CLIENT_ID)
+
+
+def test_rotated_key_is_fetched_once_and_junk_kids_are_throttled():
+    clock = FakeClock()
+    source = FakeKeySource(PUBLIC)
+    cache = GoogleKeyCache(source, clock=clock)
+    verify_with_cache(cache, _token(), CLIENT_ID)
+
+    new_pem, new_public = _keypair("k2")
+    source.keys["k2"] = new_public
+    clock.now += google_identity.MIN_REFETCH_SECONDS
+    assert verify_with_cache(cache, _token(pem=new_pem, kid="k2"), CLIENT_ID)["sub"] == "1234"
+    assert source.fetches == 2
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            verify_with_cache(cache, _token(kid="junk"), CLIENT_ID)
+    assert source.fetches == 2
+
+
+def test_expiry_follows_max_age_and_outage_serves_stale_keys():
+    clock = FakeClock()
+    source = FakeKeySource(PUBLIC, max_age=120)
+    cache = GoogleKeyCache(source, clock=clock)
+    verify_with_cache(cache, _token(), CLIENT_ID)
+
+    clock.now += 119
+    verify_with_cache(cache, _token(), CLIENT_ID)
+    assert source.fetches == 1
+
+    clock.now += 2
+    source.fail = True
+    assert verify_with_cache(cache, _token(), CLIENT_ID)["email"] == "rider@gmail.com"
+    assert source.fetches == 2
+
+
+def test_google_login_uses_key_cache(client, db, monkeypatch):
+    source = FakeKeySource(PUBLIC)
+    monkeypatch.setattr(google_identity, "_cache", GoogleKeyCache(source))
+    monkeypatch.setattr(auth_router, "GOOGLE_CLIENT_ID", CLIENT_ID)
+    db.add(models.User(id=uuid.uuid4(), email="rider@gmail.com", full_name="Rider", hashed_password="x", role="passenger"))
+    db.commit()
+
+    for _ in range(2):
+        response = client.post("/auth/google", json={"token": _token()})
+        assert response.status_code == 200
+        assert response.json()["token_type"] == "bearer"
+    assert source.fetches == 1
+
+    response = client.post("/auth/google", json={"token": _token(aud="someone-else")})
+    assert response.status_code == 401
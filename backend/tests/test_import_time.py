@@ -0,0 +1,16 @@
+from tests.bench import bench_import_time
+
+
+def test_importing_main_leaves_integrations_unloaded():
+    modules = bench_import_time.import_once("main")
+
+    assert modules["main"][1] > 0
+    assert bench_import_time.lazy_modules_imported(modules) == []
+
+
+def test_parse_importtime_reads_self_and_cumulative_time():
+    stderr = "import time: self [us] | cumulative | imported package\n" \
+        "import time:       120 |        120 |   orjson\n" \
+        "import time:      3000 |       3120 | main\n"
+
+    assert bench_import_time.parse_importtime(stderr) == {"orjson": (120, 120), "main": (3000, 3120)}
@@ -0,0 +1,22 @@
+import json
+
+import pytest
+
+from services import integrations
+
+
+def test_load_imports_once_and_reports_loaded(monkeypatch):
+    monkeypatch.setitem(integrations.INTEGRATIONS, "stdlib_json", "json")
+    monkeypatch.setattr(integrations, "_loaded", {})
+
+    assert integrations.loaded()["stdlib_json"] is False
+    assert integrations.load("stdlib_json") is json
+    assert integrations.load("stdlib_json") is json
+    assert integrations.loaded()["stdlib_json"] is True
+
+
+def test_missing_integration_raises_import_error(monkeypatch):
+    monkeypatch.setitem(integrations.INTEGRATIONS, "missing", "commuto_not_installed_sdk")
+
+    with pytest.raises(ImportError, match="commuto_not_installed_sdk"):
+        integrations.load("missing")
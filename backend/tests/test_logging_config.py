@@ -0,0 +1,110 @@
+import json
+import logging
+import queue
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from utils.logging_config import (
+    ACCESS_LOGGER,
+    AccessLogMiddleware,
+    DeferredQueueHandler,
+    JsonFormatter,
+    SamplingFilter,
+)
+
+
+def _record(level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord("test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestHandlers:
+    def test_queue_handler_snapshots_message_only(self):
+        log_queue = queue.SimpleQueue()
+        handler = DeferredQueueHandler(log_queue)
+        record = _record(http_status=201)
+
+        handler.handle(record)
+
+        queued = log_queue.get_nowait()
+        assert queued.msg == "hello world" and queued.args is None
+        assert queued.http_status == 201 and not hasattr(queued, "message")
+        # The caller's record (seen by any other handler) is left alone
+        assert record.msg == "hello %s" and record.args == ("world",)
+
+    def test_sampled_out_records_are_not_queued(self):
+        log_queue = queue.SimpleQueue()
+        handler = DeferredQueueHandler(log_queue)
+        handler.addFilter(SamplingFilter(0.0))
+
+        handler.handle(_record(level=logging.DEBUG))
+        handler.handle(_record(level=logging.INFO))
+
+        assert log_queue.qsize() == 1
+
+    def test_json_formatter_includes_extra_fields(self):
+        line = JsonFormatter().format(_record(http_status=201, duration_ms=3.5))
+        payload = json.loads(line)
+
+        assert payload["message"] == "hello world"
+        assert payload["level"] == "INFO"
+        assert payload["http_status"] == 201
+        assert payload["duration_ms"] == 3.5
+        assert "args" not in payload
+
+    def test_sampling_filter_only_drops_low_levels(self):
+        drop_all = SamplingFilter(0.0)
+
+        assert not drop_all.filter(_record(level=logging.DEBUG))
+        assert drop_all.filter(_record(level=logging.INFO))
+        assert SamplingFilter(1.0).filter(_record(level=logging.DEBUG))
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(AccessLogMiddleware)
+
+    @app.get("/rides/{ride_id}")
+    def ride(ride_id: str):
+        return {"id": ride_id}
+
+    return app
+
+
+class TestAccessLog:
+    def test_one_record_per_request_with_timing(self, caplog):
+        caplog.set_level(logging.INFO, logger=ACCESS_LOGGER)
+        client = TestClient(_app())
+
+        client.get("/rides/abc", headers={"Origin": "http://localhost:3000"})
+
+        records = [r for r in caplog.records if r.name == ACCESS_LOGGER]
+        assert len(records) == 1
+        record = records[0]
+        assert record.http_route == "/rides/{ride_id}"
+        assert record.http_path == "/rides/abc"
+        assert record.http_status == 200
+        assert record.duration_ms >= 0
+        assert record.origin == "http://localhost:3000"
+
+    def test_skipped_when_access_logger_disabled(self, caplog):
+        caplog.set_level(logging.WARNING, logger=ACCESS_LOGGER)
+        client = TestClient(_app())
+
+        client.get("/rides/abc")
+
+        assert not [r for r in caplog.records if r.name == ACCESS_LOGGER]
+
+
+def test_app_logs_cors_request_once(client, caplog):
+    caplog.set_level(logging.INFO)
+
+    client.get("/", headers={"Origin": "http://localhost:3000"})
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert not any(m.startswith(("RESPONSE:", "CORS Check:")) for m in messages)
+    access = [r for r in caplog.records if r.name == ACCESS_LOGGER]
+    assert len(access) == 1
+    assert access[0].cors_allow_origin == "http://localhost:3000"
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+import time
+
+from anyio import to_thread
+
+from utils import loop_monitor, metrics
+from utils.loop_monitor import LoopMonitor
+
+
+def _blocking_handler():
+    time.sleep(0.3)
+
+
+def test_stall_is_counted_and_loop_stack_dumped(caplog):
+    caplog.set_level(logging.WARNING, logger="utils.loop_monitor")
+    stalls_before = metrics.EVENT_LOOP_STALLS.values().get((), 0)
+
+    async def scenario():
+        monitor = LoopMonitor(interval=0.02, threshold=0.1)
+        await monitor.start()
+        await asyncio.sleep(0.05)
+        _blocking_handler()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(scenario())
+
+    assert monitor.max_lag >= 0.1
+    assert monitor.stalls_dumped == 1
+    assert metrics.EVENT_LOOP_STALLS.values()[()] == stalls_before + 1
+    dump = next(r.getMessage() for r in caplog.records if "Event loop blocked" in r.getMessage())
+    assert "_blocking_handler" in dump
+
+
+def test_threadpool_size_and_usage():
+    async def scenario():
+        limiter = to_thread.current_default_thread_limiter()
+        monitor = LoopMonitor(interval=0.05, threshold=1.0, threadpool_size=3)
+        await monitor.start()
+        try:
+            during = []
+            worker = asyncio.create_task(to_thread.run_sync(time.sleep, 0.1))
+            await asyncio.sleep(0.02)
+            during.append(monitor.threadpool_stats())
+            await worker
+            return limiter.total_tokens, during[0], monitor.threadpool_stats()
+        finally:
+            await monitor.stop()
+
+    total, during, after = asyncio.run(scenario())
+
+    assert total == 3
+    assert during == {"total": 3, "in_use": 1, "waiting": 0}
+    assert after["in_use"] == 0
+
+
+def test_threadpool_size_read_from_env(monkeypatch):
+    monkeypatch.setenv("THREADPOOL_SIZE", "64")
+
+    assert LoopMonitor().threadpool_size == 64
+
+
+def test_app_lifespan_exports_loop_metrics(client):
+    assert loop_monitor.current_monitor() is not None
+
+    body = client.get("/metrics").text
+
+    assert "commuto_event_loop_lag_seconds" in body
+    assert 'commuto_threadpool_tokens{state="total"}' in body
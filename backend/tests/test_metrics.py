@@ -0,0 +1,130 @@
+import asyncio
+import threading
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+import rate_limiter
+from rate_limiter import rate_limit
+from utils import metrics
+from utils.metrics import Counter, Histogram, MetricsMiddleware, Registry
+from websocket_manager import ConnectionManager
+
+
+class TestCollectors:
+    def test_counter_sums_per_thread_shards(self):
+        counter = Counter("test_total", "test", ("kind",))
+
+        def work():
+            for _ in range(1000):
+                counter.inc("a")
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        counter.inc("b", amount=2)
+
+        assert counter.values() == {("a",): 4000.0, ("b",): 2.0}
+        assert len(counter._all_shards()) == 5
+
+    def test_histogram_exposition_is_cumulative(self):
+        registry = Registry()
+        hist = registry.register(Histogram("test_seconds", "latency", ("route",), buckets=(0.1, 1.0)))
+        hist.observe(0.05, "/a")
+        hist.observe(0.1, "/a")
+        hist.observe(5, "/a")
+
+        text = registry.render()
+
+        assert "# TYPE test_seconds histogram" in text
+        assert 'test_seconds_bucket{route="/a",le="0.1"} 2' in text
+        assert 'test_seconds_bucket{route="/a",le="1"} 2' in text
+        assert 'test_seconds_bucket{route="/a",le="+Inf"} 3' in text
+        assert 'test_seconds_count{route="/a"} 3' in text
+
+    def test_duplicate_registration_rejected(self):
+        registry = Registry()
+        registry.register(Counter("dup_total", "x"))
+        try:
+            registry.register(Counter("dup_total", "x"))
+        except ValueError:
+            return
+        raise AssertionError("duplicate metric name accepted")
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/things/{thing_id}")
+    def thing(thing_id: int):
+        return {"id": thing_id}
+
+    @app.get("/limited")
+    @rate_limit(max_requests=1, window_seconds=60, key_suffix="metrics_test_limited")
+    async def limited(request: Request):
+        return {"ok": True}
+
+    return app
+
+
+class TestHttpMetrics:
+    def test_duration_recorded_by_route_template(self):
+        client = TestClient(_app())
+        client.get("/things/1")
+        client.get("/things/2")
+
+        key = ("GET", "/things/{thing_id}", "200")
+        counts, _total = metrics.HTTP_REQUEST_DURATION.values()[key]
+        assert sum(counts) >= 2
+
+    def test_rate_limit_rejections_counted(self):
+        rate_limiter._rate_limit_storage.clear()
+        before = metrics.RATE_LIMIT_REJECTIONS.values().get(("metrics_test_limited",), 0)
+        client = TestClient(_app())
+
+        assert client.get("/limited").status_code == 200
+        assert client.get("/limited").status_code == 429
+        assert metrics.RATE_LIMIT_REJECTIONS.values()[("metrics_test_limited",)] == before + 1
+        rate_limiter._rate_limit_storage.clear()
+
+
+class _FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+
+def test_trip_fanout_observed():
+    manager = ConnectionManager()
+    sockets = {_FakeSocket() for _ in range(3)}
+    manager.trip_connections["trip-1"] = set(sockets)
+    before = metrics.WEBSOCKET_FANOUT_RECIPIENTS.values().get(("trip",), 0)
+
+    asyncio.run(manager.broadcast_to_trip("trip-1", {"type": "ping"}))
+
+    assert all(len(s.sent) == 1 for s in sockets)
+    assert metrics.WEBSOCKET_FANOUT_RECIPIENTS.values()[("trip",)] == before + 3
+    assert ("trip",) in metrics.WEBSOCKET_FANOUT_DURATION.values()
+
+
+class TestEndpoint:
+    def test_metrics_endpoint_exposes_text_format(self, client):
+        client.get("/health")
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == metrics.CONTENT_TYPE
+        assert 'commuto_http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in response.text
+        assert "commuto_websocket_active" in response.text
+
+    def test_metrics_token_required_when_configured(self, client, monkeypatch):
+        monkeypatch.setenv("METRICS_TOKEN", "scrape-secret")
+
+        assert client.get("/metrics").status_code == 401
+        ok = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+        assert ok.status_code == 200
@@ -0,0 +1,72 @@
+import uuid
+
+import sqlalchemy as sa
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+import models  # noqa: F401  (registers the tables)
+from database import Base
+from init_db import ALEMBIC_INI
+from migrations import online
+
+
+def _upgrade(url):
+    config = Config(ALEMBIC_INI)
+    config.attributes["database_url"] = url
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+
+def _drift(engine):
+    with engine.connect() as conn:
+        context = MigrationContext.configure(conn, opts={"compare_type": False})
+        return compare_metadata(context, Base.metadata)
+
+
+def test_upgrade_head_matches_the_models(tmp_path):
+    url = f"sqlite:///{tmp_path}/fresh.db"
+    _upgrade(url)
+    engine = sa.create_engine(url)
+
+    assert _drift(engine) == []
+    assert "ix_trip_bids_book" in {ix["name"] for ix in sa.inspect(engine).get_indexes("trip_bids")}
+    engine.dispose()
+
+
+def test_upgrade_runs_on_a_database_built_by_create_all(tmp_path):
+    url = f"sqlite:///{tmp_path}/legacy.db"
+    engine = sa.create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(sa.text("CREATE INDEX idx_users_verification_token ON users(verification_token)"))
+
+    _upgrade(url)
+
+    assert _drift(engine) == []
+    assert "idx_users_verification_token" not in {ix["name"] for ix in sa.inspect(engine).get_indexes("users")}
+    with engine.connect() as conn:
+        assert conn.execute(sa.text("SELECT version_num FROM alembic_version")).scalar() == "0006"
+    engine.dispose()
+
+
+def test_backfill_commits_in_batches(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path}/backfill.db")
+    with engine.begin() as conn:
+        conn.execute(sa.text("CREATE TABLE t (id VARCHAR PRIMARY KEY, total NUMERIC, per_seat NUMERIC)"))
+        for i in range(5):
+            conn.execute(sa.text("INSERT INTO t VALUES (:id, NULL, :p)"), {"id": uuid.uuid4().hex, "p": i})
+
+    statements = []
+    sa.event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    with engine.connect() as conn:
+        with Operations.context(MigrationContext.configure(conn)):
+            updated = online.backfill("t", "total = per_seat", "total IS NULL", batch_size=2, pause=0)
+
+    assert updated == 5
+    assert len([s for s in statements if s.startswith("UPDATE t")]) == 3
+    with engine.connect() as conn:
+        assert conn.execute(sa.text("SELECT COUNT(*) FROM t WHERE total = per_seat")).scalar() == 5
+    engine.dispose()
@@ -0,0 +1,121 @@
+import os
+import uuid
+from datetime import datetime, timedelta
+from urllib.parse import quote
+
+import models
+import pytest
+import sqlalchemy as sa
+from services import notification_retention
+from services.notification_retention import parse_ttls, purge_expired
+from utils import unread_counts
+
+NOW = datetime(2026, 6, 15, 12, 0)
+
+
+def _notification(db, user_id, notification_type, days_old, is_read=True):
+    db.add(models.Notification(
+        id=uuid.uuid4(), user_id=user_id, title="t", message="m", type=notification_type,
+        is_read=is_read, created_at=NOW - timedelta(days=days_old),
+    ))
+
+
+def test_parse_ttls():
+    assert parse_ttls("") == {"default": 90}
+    assert parse_ttls("default=30, new_bid=7") == {"default": 30, "new_bid": 7}
+    with pytest.raises(ValueError):
+        parse_ttls("new_bid")
+
+
+def test_purge_applies_ttl_per_type(db, make_user):
+    user_id = make_user("Rider")
+    _notification(db, user_id, "new_bid", days_old=20)
+    _notification(db, user_id, "new_bid", days_old=5)
+    _notification(db, user_id, "ride_status", days_old=20)
+    _notification(db, user_id, "ride_status", days_old=100)
+    db.commit()
+
+    deleted = purge_expired(db, {"default": 90, "new_bid": 14}, pause=0, now=NOW)
+
+    assert deleted == {"new_bid": 1, "default": 1}
+    remaining = sorted((n.type, (NOW - n.created_at).days) for n in db.query(models.Notification))
+    assert remaining == [("new_bid", 5), ("ride_status", 20)]
+
+
+def test_purge_runs_in_batches_and_adjusts_unread_counts(db, make_user):
+    user_id = make_user("Rider")
+    for _ in range(7):
+        _notification(db, user_id, "new_bid", days_old=30, is_read=False)
+    _notification(db, user_id, "new_bid", days_old=1, is_read=False)
+    db.commit()
+    unread_counts.cache.set(user_id, 8)
+
+    deleted = purge_expired(db, {"default": 14}, batch_size=3, pause=0, now=NOW, max_batches=2)
+    assert deleted == {"default": 6}
+
+    assert purge_expired(db, {"default": 14}, batch_size=3, pause=0, now=NOW) == {"default": 1}
+    assert db.query(models.Notification).count() == 1
+    assert unread_counts.cache.get(user_id) == 1
+
+
+def test_partition_maintenance_is_noop_off_postgres(db, monkeypatch):
+    monkeypatch.setattr(notification_retention, "PARTITIONING", True)
+
+    assert notification_retention.maintain_partitions(db) == {}
+
+
+def test_month_arithmetic():
+    assert notification_retention._add_months(datetime(2026, 11, 1), 3) == datetime(2027, 2, 1)
+    assert notification_retention.partition_name(datetime(2027, 2, 1)) == "notifications_2027_02"
+
+
+# A scratch PostgreSQL database, e.g. postgresql://postgres@localhost/commuto_test
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+@pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+def test_convert_to_partitioned_on_a_migrated_schema():
+    from alembic import command
+    from alembic.config import Config
+
+    from init_db import ALEMBIC_INI
+
+    schema = f"partition_{uuid.uuid4().hex[:8]}"
+    admin = sa.create_engine(POSTGRES_URL)
+    with admin.begin() as conn:
+        conn.execute(sa.text(f"CREATE SCHEMA {schema}"))
+    separator = "&" if "?" in POSTGRES_URL else "?"
+    url = f"{POSTGRES_URL}{separator}options={quote(f'-csearch_path={schema}')}"
+    engine = sa.create_engine(url)
+    try:
+        config = Config(ALEMBIC_INI)
+        config.attributes["database_url"] = url
+        config.attributes["configure_logger"] = False
+        command.upgrade(config, "head")
+        user_id = str(uuid.uuid4())
+        with engine.begin() as conn:
+            conn.execute(sa.text(
+                "INSERT INTO users (id, email, full_name, hashed_password, role) "
+                "VALUES (:id, 'rider@test.com', 'Rider', 'x', 'passenger')"
+            ), {"id": user_id})
+            for days_old in (0, 40, 75):
+                conn.execute(sa.text(
+                    "INSERT INTO notifications (id, user_id, title, message, type, is_read, created_at) "
+                    "VALUES (:id, :user_id, 't', 'm', 'new_bid', false, :created_at)"
+                ), {"id": str(uuid.uuid4()), "user_id": user_id, "created_at": NOW - timedelta(days=days_old)})
+
+        with engine.begin() as conn:
+            notification_retention.convert_to_partitioned(conn, now=NOW)
+
+        with engine.connect() as conn:
+            assert notification_retention.is_partitioned(conn)
+            assert conn.execute(sa.text("SELECT count(*) FROM notifications")).scalar() == 3
+            indexes = set(conn.execute(sa.text(
+                "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = 'notifications'"
+            )).scalars())
+        assert {"ix_notifications_user_created", "ix_notifications_type_created", "ix_notifications_unread_user"} <= indexes
+    finally:
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(sa.text(f"DROP SCHEMA {schema} CASCADE"))
+        admin.dispose()
@@ -0,0 +1,126 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+import auth
+import models
+from services.geofence import SERVICE_AREA_NAME
+from utils import notifications
+from utils.notifications import NotificationTemplate, create_notifications_bulk
+from utils.query_stats import track_queries
+from websocket_manager import manager
+
+CHARUSAT = (22.6005, 72.8194)
+ANAND = (22.5645, 72.9289)
+AHMEDABAD = (23.0225, 72.5714)
+SURAT = (21.1702, 72.8311)
+
+
+def test_bulk_create_uses_chunked_inserts_and_one_fanout(db, monkeypatch, make_user, fake_websocket):
+    monkeypatch.setattr(notifications, "BULK_INSERT_CHUNK", 1000)
+    users = [make_user(f"User {i}") for i in range(2500)]
+    db.commit()
+    online = str(users[7])
+    socket = fake_websocket()
+    manager.active_connections[online] = {socket}
+    template = NotificationTemplate("Service alert", "Heavy rain on NH-48", "service_alert")
+
+    try:
+        with track_queries() as stats:
+            count = asyncio.run(create_notifications_bulk(db, users + [users[0]], template))
+    finally:
+        manager.active_connections.pop(online, None)
+
+    assert count == 2500
+    assert db.query(models.Notification).count() == 2500
+    inserts = [s for s in stats.statements if s.lstrip().upper().startswith("INSERT")]
+    assert sum(stats.statements[s] for s in inserts) == 3
+    assert len(socket.sent) == 1
+    frame = socket.sent[0]
+    stored = db.get(models.Notification, uuid.UUID(frame["data"]["id"]))
+    assert str(stored.user_id) == online
+    assert frame["data"]["title"] == "Service alert"
+
+
+@pytest.fixture
+def past_ride(make_shared_trip):
+    """``past_ride(creator_id, origin, dest, days_ago=1)``: a completed ride between two points"""
+    def make(creator_id, origin, dest, days_ago=1):
+        return make_shared_trip(
+            creator_id, origin_lat=origin[0], origin_lng=origin[1], dest_lat=dest[0], dest_lng=dest[1],
+            start_time=datetime.utcnow() - timedelta(days=days_ago), status="completed",
+        )
+    return make
+
+
+class TestBroadcastEndpoint:
+    def test_region_broadcast_reaches_recent_riders_only(self, client, db, monkeypatch, make_user, bearer_headers, past_ride):
+        operator = make_user("Ops")
+        monkeypatch.setattr(auth, "OPERATOR_USER_IDS", frozenset({str(operator)}))
+        local_creator = make_user("Local")
+        local_rider = make_user("Rider")
+        local = past_ride(local_creator, CHARUSAT, ANAND)
+        past_ride(make_user("Stale"), CHARUSAT, ANAND, days_ago=90)
+        past_ride(make_user("Away"), AHMEDABAD, SURAT)
+        db.add(models.Booking(
+            id=uuid.uuid4(), trip_id=local, passenger_id=local_rider, seats_booked=1,
+            total_price=100, status="confirmed",
+        ))
+        db.commit()
+
+        response = client.post(
+            "/notifications/broadcast",
+            json={"title": "Road closed", "message": "Use the Petlad bypass", "region": SERVICE_AREA_NAME},
+            headers=bearer_headers(operator),
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"recipients": 2, "region": SERVICE_AREA_NAME}
+        notified = {n.user_id for n in db.query(models.Notification).all()}
+        assert notified == {local_creator, local_rider}
+
+    def test_requires_operator_allow_list(self, client, db, monkeypatch, make_user, bearer_headers):
+        rider = make_user("Rider")
+        # The role column alone grants nothing
+        admin = make_user("Admin", role="admin")
+        monkeypatch.setattr(auth, "OPERATOR_USER_IDS", frozenset({str(uuid.uuid4())}))
+        db.commit()
+        for user_id, role in ((rider, "passenger"), (admin, "admin")):
+            response = client.post(
+                "/notifications/broadcast",
+                json={"title": "Hi", "message": "Hello"},
+                headers=bearer_headers(user_id, role),
+            )
+
+            assert response.status_code == 403
+
+    def test_everyone_broadcast(self, client, db, monkeypatch, make_user, bearer_headers):
+        operator = make_user("Ops")
+        riders = [make_user(f"Rider {i}") for i in range(3)]
+        monkeypatch.setattr(auth, "OPERATOR_USER_IDS", frozenset({str(operator)}))
+        db.commit()
+
+        response = client.post(
+            "/notifications/broadcast",
+            json={"title": "Maintenance", "message": "App down 2-3am"},
+            headers=bearer_headers(operator),
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"recipients": 4, "region": None}
+        assert {n.user_id for n in db.query(models.Notification)} == {operator, *riders}
+
+    def test_unknown_region(self, client, db, monkeypatch, make_user, bearer_headers):
+        operator = make_user("Ops")
+        monkeypatch.setattr(auth, "OPERATOR_USER_IDS", frozenset({str(operator)}))
+        db.commit()
+
+        response = client.post(
+            "/notifications/broadcast",
+            json={"title": "Hi", "message": "Hello", "region": "Atlantis"},
+            headers=bearer_headers(operator),
+        )
+
+        assert response.status_code == 404
@@ -0,0 +1,146 @@
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import auth
+import models
+from utils import outbox
+
+
+class TestEnqueue:
+    def test_rollback_discards_event(self, db, make_user):
+        user_id = make_user("Rider")
+        db.commit()
+
+        outbox.enqueue_notification(db, [user_id], "Hi", "Hello", "test")
+        db.rollback()
+
+        assert db.query(models.OutboxEvent).count() == 0
+
+    def test_one_row_for_many_recipients(self, db, make_user):
+        users = [make_user(f"Rider {i}") for i in range(3)]
+        db.commit()
+
+        outbox.enqueue_notification(db, users + [users[0], None], "Hi", "Hello", "test")
+        db.commit()
+
+        event = db.query(models.OutboxEvent).one()
+        assert event.payload["recipients"] == [str(u) for u in users]
+
+
+class TestClaimBatch:
+    def test_persists_notifications_and_marks_dispatched(self, db, make_user):
+        users = [make_user(f"Rider {i}") for i in range(2)]
+        db.commit()
+        outbox.enqueue_notification(db, users, "Trip Cancelled", "Sorry", "trip_cancelled", "/passenger/trips/x")
+        outbox.enqueue_trip_message(db, "trip-1", {"type": "seat_update"})
+        db.commit()
+
+        deliveries = outbox.claim_batch(db)
+
+        assert db.query(models.Notification).count() == 2
+        assert db.query(models.OutboxEvent).filter(models.OutboxEvent.dispatched_at.is_(None)).count() == 0
+        personal = [d for d in deliveries if d[0] == outbox.PERSONAL]
+        assert {d[1] for d in personal} == {str(u) for u in users}
+        assert personal[0][2]["type"] == "notification"
+        assert personal[0][2]["data"]["link"] == "/passenger/trips/x"
+        assert (outbox.TRIP, "trip-1", {"type": "seat_update"}) in deliveries
+        assert outbox.claim_batch(db) == []
+
+    def test_bad_event_retried_then_abandoned(self, db, monkeypatch):
+        monkeypatch.setattr(outbox, "MAX_ATTEMPTS", 2)
+        db.add(models.OutboxEvent(id=uuid.uuid4(), kind="bogus", payload={}, created_at=datetime.utcnow()))
+        db.commit()
+
+        assert outbox.claim_batch(db) == []
+        event = db.query(models.OutboxEvent).one()
+        assert event.attempts == 1 and event.dispatched_at is None and "bogus" in event.last_error
+
+        outbox.claim_batch(db)
+        db.refresh(event)
+        assert event.attempts == 2 and event.dispatched_at is not None
+
+    def test_failed_insert_holds_back_only_the_bad_event(self, db, monkeypatch, make_user):
+        monkeypatch.setattr(outbox, "MAX_ATTEMPTS", 2)
+        users = [make_user(f"Rider {i}") for i in range(2)]
+        db.commit()
+        outbox.enqueue_notification(db, [users[0]], "Hi", "Hello", "test")
+        bad = outbox.enqueue_notification(db, [users[1]], None, "No title", "test")
+        outbox.enqueue_trip_message(db, "trip-1", {"type": "seat_update"})
+        db.commit()
+
+        deliveries = outbox.claim_batch(db)
+
+        assert [d[0] for d in deliveries] == [outbox.PERSONAL, outbox.TRIP]
+        assert db.query(models.Notification).count() == 1
+        db.refresh(bad)
+        assert bad.attempts == 1 and bad.dispatched_at is None and bad.last_error
+
+        assert outbox.claim_batch(db) == []
+        db.refresh(bad)
+        assert bad.attempts == 2 and bad.dispatched_at is not None
+
+
+def test_purge_dispatched_keeps_pending_and_recent_rows(db):
+    now = datetime.utcnow()
+    for dispatched_at in (None, now - timedelta(days=1), now - timedelta(days=10), now - timedelta(days=30)):
+        db.add(models.OutboxEvent(
+            id=uuid.uuid4(), kind=outbox.TRIP, payload={}, created_at=now - timedelta(days=40), dispatched_at=dispatched_at,
+        ))
+    db.commit()
+
+    assert outbox.purge_dispatched(db, retention_days=7, batch_size=1, now=now) == 2
+    remaining = {event.dispatched_at for event in db.query(models.OutboxEvent)}
+    assert remaining == {None, now - timedelta(days=1)}
+
+
+def test_commit_with_outbox_rows_wakes_the_dispatcher(db, monkeypatch, make_user):
+    woken = []
+    monkeypatch.setattr(outbox, "_dispatcher", SimpleNamespace(wake=lambda: woken.append(True)))
+    user_id = make_user("Listener")
+    db.commit()
+    assert woken == []
+
+    outbox.enqueue_notification(db, [user_id], "Passenger Joined", "Asha joined", "passenger_joined")
+    db.commit()
+
+    assert woken == [True]
+
+
+def test_claimed_notifications_are_pushed(client, db, make_user):
+    user_id = make_user("Listener")
+    db.commit()
+    token = auth.create_access_token({"sub": str(user_id), "role": "passenger"})
+
+    with client.websocket_connect(f"/ws?token={token}") as ws:
+        ws.send_text("ping")
+        assert ws.receive_json()["type"] == "pong"
+
+        outbox.enqueue_notification(db, [user_id], "Passenger Joined", "Asha joined", "passenger_joined")
+        db.commit()
+        client.portal.call(outbox.deliver, outbox.claim_batch(db))
+
+        frame = ws.receive_json()
+
+    assert frame["type"] == "notification"
+    assert frame["data"]["title"] == "Passenger Joined"
+    assert db.query(models.Notification).filter(models.Notification.user_id == user_id).count() == 1
+
+
+def test_cancel_ride_writes_one_outbox_row_for_all_passengers(client, db, make_user, make_shared_trip, bearer_headers):
+    creator = make_user("Creator")
+    riders = [make_user(f"Rider {i}") for i in range(3)]
+    trip_id = make_shared_trip(creator, available_seats=0, start_time=datetime.utcnow() + timedelta(days=1))
+    for rider in riders:
+        db.add(models.Booking(
+            id=uuid.uuid4(), trip_id=trip_id, passenger_id=rider, seats_booked=1,
+            total_price=100, status="confirmed", payment_status="pending",
+        ))
+    db.commit()
+
+    response = client.post(f"/rides/{trip_id}/cancel", headers=bearer_headers(creator))
+
+    assert response.status_code == 200
+    events = db.query(models.OutboxEvent).all()
+    assert len(events) == 1
+    assert sorted(events[0].payload["recipients"]) == sorted(str(r) for r in riders)
@@ -0,0 +1,87 @@
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from utils import query_stats
+from utils.query_stats import QueryStatsMiddleware, fingerprint, track_queries
+
+query_stats.install()
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+def _app(**middleware_kwargs):
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, **middleware_kwargs)
+
+    @app.get("/items/{count}")
+    def items(count: int):
+        with engine.connect() as conn:
+            for i in range(count):
+                conn.execute(text("SELECT :i"), {"i": i})
+        return {"count": count}
+
+    return app
+
+
+class TestFingerprint:
+    def test_collapses_literals_and_in_lists(self):
+        a = fingerprint("SELECT * FROM trips WHERE id IN (1, 2, 3) AND status = 'pending'")
+        b = fingerprint("SELECT *  FROM trips\nWHERE id IN (?, ?) AND status = 'active'")
+
+        assert a == b == "SELECT * FROM trips WHERE id IN (...) AND status = ?"
+
+
+class TestTracking:
+    def test_track_queries_counts_statements_in_block(self):
+        with track_queries() as stats:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+
+        assert stats.count == 2
+        assert stats.duration >= 0
+        assert stats.max_repeats == 2
+
+    def test_nothing_recorded_outside_a_tracked_block(self):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        assert query_stats.current_query_stats() is None
+
+
+class TestMiddleware:
+    def test_dev_headers_report_statement_count(self):
+        client = TestClient(_app(expose_headers=True))
+
+        response = client.get("/items/3")
+
+        assert response.headers[query_stats.QUERY_COUNT_HEADER] == "3"
+        assert response.headers[query_stats.MAX_REPEATS_HEADER] == "3"
+        assert float(response.headers[query_stats.QUERY_TIME_HEADER]) >= 0
+
+    def test_headers_hidden_in_production(self):
+        client = TestClient(_app(expose_headers=False))
+
+        response = client.get("/items/1")
+
+        assert query_stats.QUERY_COUNT_HEADER not in response.headers
+
+    def test_repeated_statement_logs_warning_and_route_totals(self, caplog):
+        client = TestClient(_app(expose_headers=False, warn_threshold=4))
+        before = query_stats.route_query_snapshot().get(("GET", "/items/{count}"), {"requests": 0, "statements": 0})
+
+        with caplog.at_level(logging.WARNING, logger="utils.query_stats"):
+            client.get("/items/5")
+            client.get("/items/2")
+
+        warnings = [r for r in caplog.records if "Possible N+1" in r.getMessage()]
+        assert len(warnings) == 1
+        assert "GET /items/{count}" in warnings[0].getMessage()
+
+        after = query_stats.route_query_snapshot()[("GET", "/items/{count}")]
+        assert after["requests"] - before["requests"] == 2
+        assert after["statements"] - before["statements"] == 7
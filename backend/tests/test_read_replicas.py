@@ -0,0 +1,102 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from database import Base
+from main import app
+from utils import read_replicas
+from utils.read_replicas import Replica, ReplicaPool
+
+
+def _replica(title, user_ids):
+    """An in-memory replica whose only notification is *title*, for each user."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    for user_id in user_ids:
+        session.add(models.Notification(id=uuid.uuid4(), user_id=user_id, title=title, message=title, type="test"))
+    session.commit()
+    session.close()
+    return Replica("sqlite://", engine=engine)
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    def install(*replica_list):
+        monkeypatch.setattr(read_replicas, "pool", ReplicaPool(replica_list))
+    read_replicas.pins.clear()
+    yield install
+    read_replicas.pins.clear()
+
+
+def _titles(client, headers):
+    response = client.get("/notifications/", headers=headers)
+    assert response.status_code == 200
+    return [n["title"] for n in response.json()]
+
+
+def test_reads_rotate_over_healthy_replicas(client, db, replicas, make_user, bearer_headers):
+    asha = make_user("Asha")
+    db.add(models.Notification(id=uuid.uuid4(), user_id=asha, title="primary", message="primary", type="test"))
+    db.commit()
+    first, second = _replica("replica-1", [asha]), _replica("replica-2", [asha])
+    replicas(first, second)
+
+    served = [_titles(client, bearer_headers(asha))[0] for _ in range(4)]
+    assert served[0] != served[1] and served[:2] == served[2:]
+    assert sorted(served) == ["replica-1", "replica-1", "replica-2", "replica-2"]
+
+    second.healthy = False
+    assert [_titles(client, bearer_headers(asha)) for _ in range(3)] == [["replica-1"]] * 3
+    first.healthy = False
+    assert _titles(client, bearer_headers(asha)) == ["primary"]
+
+
+def test_unreachable_replica_falls_back_to_primary(client, db, replicas, tmp_path, make_user, bearer_headers):
+    asha = make_user("Asha")
+    db.add(models.Notification(id=uuid.uuid4(), user_id=asha, title="primary", message="primary", type="test"))
+    db.commit()
+    down = Replica(f"sqlite:///{tmp_path}/missing/replica.db")
+    replicas(down)
+
+    assert _titles(client, bearer_headers(asha)) == ["primary"]
+    assert down.healthy is False
+    assert read_replicas.pool.choose() is None
+    assert down.check() is False
+
+
+def test_writes_pin_the_user_to_the_primary(client, db, replicas, monkeypatch, make_user, bearer_headers):
+    asha, bala = make_user("Asha"), make_user("Bala")
+    for user_id in (asha, bala):
+        db.add(models.Notification(id=uuid.uuid4(), user_id=user_id, title="primary", message="primary", type="test"))
+    db.commit()
+    replicas(_replica("replica", [asha, bala]))
+    assert _titles(client, bearer_headers(asha)) == ["replica"]
+    # main installs the middleware only when DATABASE_REPLICA_URLS is set
+    writer = TestClient(read_replicas.ReadYourWritesMiddleware(app))
+
+    assert writer.post("/notifications/read-all", headers=bearer_headers(asha)).status_code == 200
+
+    assert _titles(client, bearer_headers(asha)) == ["primary"]
+    assert _titles(client, bearer_headers(bala)) == ["replica"]
+    # Once the pin lapses Asha reads from the replica again
+    read_replicas.pins.clear()
+    assert _titles(client, bearer_headers(asha)) == ["replica"]
+
+
+def test_write_pins_expire():
+    pins = read_replicas.WritePins(seconds=5, capacity=2)
+    pins.pin("a", now=100.0)
+    assert pins.is_pinned("a", now=104.9)
+    assert not pins.is_pinned("a", now=105.0)
+    for key in ("a", "b", "c"):
+        pins.pin(key, now=200.0)
+    assert not pins.is_pinned("a", now=201.0) and pins.is_pinned("c", now=201.0)
+    disabled = read_replicas.WritePins(seconds=0)
+    disabled.pin("a")
+    assert not disabled.is_pinned("a")
@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta
+
+import models
+from services import ride_expiry
+
+NOW = datetime(2026, 6, 15, 12, 0)
+
+
+def test_cancel_expired_only_touches_past_pending_rides(db, make_user, make_shared_trip):
+    creator = make_user("Rider")
+    past = make_shared_trip(creator, start_time=NOW - timedelta(minutes=5))
+    upcoming = make_shared_trip(creator, start_time=NOW + timedelta(hours=1))
+    started = make_shared_trip(creator, start_time=NOW - timedelta(minutes=5), status="active")
+    db.commit()
+
+    assert ride_expiry.cancel_expired(db, now=NOW) == [past]
+
+    db.expire_all()
+    assert {t.id: t.status for t in db.query(models.Trip)} == {
+        past: "cancelled", upcoming: "pending", started: "active",
+    }
+    assert ride_expiry.cancel_expired(db, now=NOW) == []
+
+
+def test_listing_reads_do_not_write(client, db, make_user, make_shared_trip, bearer_headers):
+    user_id = make_user("Asha")
+    make_shared_trip(make_user("Rider"), start_time=datetime.utcnow() - timedelta(minutes=5))
+    db.commit()
+
+    response = client.get("/rides/available", headers=bearer_headers(user_id))
+
+    assert response.status_code == 200
+    assert response.json() == []
+    db.expire_all()
+    assert db.query(models.Trip).one().status == "pending"
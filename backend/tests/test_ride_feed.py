@@ -0,0 +1,149 @@
+import asyncio
+import threading
+import uuid
+
+import pytest
+
+import models
+from services import ride_feed
+from services.event_feed import SequencedFeed
+from websocket_manager import manager
+
+
+@pytest.fixture
+def open_ride(db, make_user, make_shared_trip):
+    """A pending ride two hours out, as a loaded ``Trip``."""
+    trip_id = make_shared_trip(make_user("Rider"))
+    db.commit()
+    return db.get(models.Trip, trip_id)
+
+
+@pytest.fixture
+def fresh_feed(monkeypatch):
+    monkeypatch.setattr(ride_feed, "open_ride_feed", SequencedFeed(maxlen=3))
+    monkeypatch.setattr(ride_feed, "load_open_ride_snapshot", lambda user_id: [{"id": "snapshot-ride"}])
+    yield ride_feed.open_ride_feed
+    manager.channel_subscribers.pop(ride_feed.OPEN_RIDES_CHANNEL, None)
+
+
+class TestSequencedFeed:
+    def test_events_since_replays_buffered_events(self):
+        feed = SequencedFeed(maxlen=3)
+        for i in range(3):
+            feed.append("ride_added", {"n": i})
+
+        assert [e["seq"] for e in feed.events_since(1)] == [2, 3]
+        assert feed.events_since(3) == []
+
+    def test_events_since_reports_gap_when_buffer_overflowed(self):
+        feed = SequencedFeed(maxlen=2)
+        for i in range(5):
+            feed.append("ride_added", {"n": i})
+
+        assert feed.events_since(1) is None
+        assert [e["seq"] for e in feed.events_since(3)] == [4, 5]
+        # A sequence from the future (e.g. after a server restart) needs a snapshot
+        assert feed.events_since(99) is None
+
+
+class TestOpenRideFeed:
+    def test_subscribe_sends_snapshot_then_deltas(self, fresh_feed, open_ride, fake_websocket):
+        ws = fake_websocket()
+        trip = open_ride
+
+        async def scenario():
+            await ride_feed.subscribe_open_rides(ws, "driver-1")
+            await ride_feed.publish_ride_event(ride_feed.RIDE_ADDED, trip)
+            await ride_feed.publish_ride_event(ride_feed.RIDE_REMOVED, trip)
+
+        asyncio.run(scenario())
+
+        snapshot, added, removed = ws.sent
+        assert snapshot["type"] == "open_rides_snapshot"
+        assert snapshot["data"] == {"seq": 0, "rides": [{"id": "snapshot-ride"}]}
+        assert added["type"] == "ride_added"
+        assert added["data"]["seq"] == 1
+        assert added["data"]["ride"]["id"] == str(trip.id)
+        assert added["data"]["ride"]["status"] == "requested"
+        assert removed["data"] == {"seq": 2, "ride_id": str(trip.id)}
+
+    def test_resume_replays_missed_events(self, fresh_feed, open_ride, fake_websocket):
+        trip = open_ride
+        asyncio.run(ride_feed.publish_ride_event(ride_feed.RIDE_ADDED, trip))
+        asyncio.run(ride_feed.publish_ride_event(ride_feed.RIDE_UPDATED, trip))
+
+        ws = fake_websocket()
+        asyncio.run(ride_feed.subscribe_open_rides(ws, "driver-1", resume_from=1))
+
+        assert [m["type"] for m in ws.sent] == ["ride_updated", "open_rides_resumed"]
+        assert ws.sent[0]["data"]["seq"] == 2
+        assert ws.sent[1]["data"] == {"seq": 2, "replayed": 1}
+
+    def test_resume_outside_buffer_falls_back_to_snapshot(self, fresh_feed, open_ride, fake_websocket):
+        trip = open_ride
+        for _ in range(5):
+            asyncio.run(ride_feed.publish_ride_event(ride_feed.RIDE_UPDATED, trip))
+
+        ws = fake_websocket()
+        asyncio.run(ride_feed.subscribe_open_rides(ws, "driver-1", resume_from=1))
+
+        assert ws.sent[0]["type"] == "open_rides_snapshot"
+        assert ws.sent[0]["data"]["seq"] == 5
+
+    def test_events_published_during_snapshot_follow_it(self, fresh_feed, monkeypatch, open_ride, fake_websocket):
+        trip = open_ride
+
+        def slow_snapshot(user_id):
+            # Another request publishes while the snapshot query runs
+            fresh_feed.append(ride_feed.RIDE_ADDED, {"ride": ride_feed.serialize_open_ride(trip)})
+            return []
+
+        monkeypatch.setattr(ride_feed, "load_open_ride_snapshot", slow_snapshot)
+        ws = fake_websocket()
+        asyncio.run(ride_feed.subscribe_open_rides(ws, "driver-1"))
+
+        assert [m["type"] for m in ws.sent] == ["open_rides_snapshot", "ride_added"]
+        assert ws.sent[0]["data"]["seq"] == 0 and ws.sent[1]["data"]["seq"] == 1
+        assert manager.is_subscribed(ws, ride_feed.OPEN_RIDES_CHANNEL)
+
+    def test_deltas_skip_drivers_the_ride_is_hidden_from(self, fresh_feed, db, monkeypatch, open_ride, make_user, fake_websocket):
+        bidder, other = make_user("Bidder", "driver"), make_user("Other", "driver")
+        trip = open_ride
+        db.add(models.TripBid(id=uuid.uuid4(), trip_id=trip.id, driver_id=bidder, bid_amount=250, status="pending"))
+        db.commit()
+        bidder_ws, other_ws = fake_websocket(), fake_websocket()
+        lookup_threads = []
+        hidden_from = ride_feed._hidden_from
+
+        def recording_hidden_from(trip):
+            lookup_threads.append(threading.get_ident())
+            return hidden_from(trip)
+
+        monkeypatch.setattr(ride_feed, "_hidden_from", recording_hidden_from)
+
+        async def scenario():
+            await ride_feed.subscribe_open_rides(bidder_ws, str(bidder))
+            await ride_feed.subscribe_open_rides(other_ws, str(other))
+            await ride_feed.publish_ride_event_async(ride_feed.RIDE_UPDATED, trip)
+            await ride_feed.publish_ride_event(ride_feed.RIDE_REMOVED, trip)
+
+        asyncio.run(scenario())
+
+        # The recipient lookup queried the database off the event loop
+        assert lookup_threads and threading.get_ident() not in lookup_threads
+
+        assert [m["type"] for m in bidder_ws.sent] == ["open_rides_snapshot", "ride_removed"]
+        assert [m["type"] for m in other_ws.sent] == ["open_rides_snapshot", "ride_updated", "ride_removed"]
+        # Replay applies the same filter
+        replayed = fake_websocket()
+        asyncio.run(ride_feed.subscribe_open_rides(replayed, str(bidder), resume_from=0))
+        assert [m["type"] for m in replayed.sent] == ["ride_removed", "open_rides_resumed"]
+
+    def test_disconnect_removes_feed_subscription(self, fresh_feed, fake_websocket):
+        ws = fake_websocket()
+        asyncio.run(ride_feed.subscribe_open_rides(ws, "driver-1"))
+        assert manager.is_subscribed(ws, ride_feed.OPEN_RIDES_CHANNEL)
+
+        manager.disconnect(ws, "driver-1")
+
+        assert not manager.is_subscribed(ws, ride_feed.OPEN_RIDES_CHANNEL)
@@ -0,0 +1,113 @@
+import uuid
+from datetime import datetime, timedelta
+
+import auth
+import models
+from services import ride_matching
+
+CHARUSAT = (22.6005, 72.8194)
+ANAND = (22.5645, 72.9289)
+# Two points on the Charusat → Anand corridor, in travel order
+EARLY_ON_ROUTE = (22.5915, 72.8468)
+LATE_ON_ROUTE = (22.5735, 72.9015)
+
+
+def _score(pickup, dropoff, start_offset_minutes=0, **kwargs):
+    departure = datetime(2030, 1, 1, 8, 0)
+    return ride_matching.score_corridor(
+        "trip", CHARUSAT, ANAND,
+        departure + timedelta(minutes=start_offset_minutes),
+        pickup, dropoff, departure, **kwargs,
+    )
+
+
+class TestScoreCorridor:
+    def test_points_on_route_in_travel_order_match(self):
+        match = _score(EARLY_ON_ROUTE, LATE_ON_ROUTE)
+
+        assert match is not None
+        assert match.pickup_detour_km < 0.2
+        assert match.dropoff_detour_km < 0.2
+        assert match.score > 0.95
+
+    def test_reverse_direction_is_rejected(self):
+        assert _score(LATE_ON_ROUTE, EARLY_ON_ROUTE) is None
+
+    def test_detour_beyond_limit_is_rejected(self):
+        off_route = (EARLY_ON_ROUTE[0] + 0.05, EARLY_ON_ROUTE[1])  # ~5.5 km north
+
+        assert _score(off_route, LATE_ON_ROUTE) is None
+        assert _score(off_route, LATE_ON_ROUTE, max_detour_km=10) is not None
+
+    def test_departure_outside_window_is_rejected(self):
+        assert _score(EARLY_ON_ROUTE, LATE_ON_ROUTE, start_offset_minutes=61) is None
+
+    def test_closer_departure_scores_higher(self):
+        near = _score(EARLY_ON_ROUTE, LATE_ON_ROUTE, start_offset_minutes=5)
+        far = _score(EARLY_ON_ROUTE, LATE_ON_ROUTE, start_offset_minutes=-45)
+
+        assert near.score > far.score
+        assert far.departure_offset_minutes == -45
+
+
+def _shared_trip(creator_id, start_time, origin=CHARUSAT, dest=ANAND, **overrides):
+    values = dict(
+        id=uuid.uuid4(),
+        creator_passenger_id=creator_id,
+        origin_address="Charusat",
+        origin_lat=origin[0],
+        origin_lng=origin[1],
+        dest_address="Anand",
+        dest_lat=dest[0],
+        dest_lng=dest[1],
+        start_time=start_time,
+        total_seats=4,
+        available_seats=3,
+        total_price=400,
+        price_per_seat=400,
+        status="pending",
+        payment_status="pending",
+    )
+    values.update(overrides)
+    return models.Trip(**values)
+
+
+class TestMatchEndpoint:
+    def _user(self, db, email):
+        user = models.User(
+            id=uuid.uuid4(), email=email, full_name=email.split("@")[0],
+            hashed_password="x", role="passenger",
+        )
+        db.add(user)
+        db.commit()
+        return user
+
+    def test_ranks_matching_trips_and_quotes_fare(self, client, db):
+        creator = self._user(db, "creator@test.com")
+        rider = self._user(db, "rider@test.com")
+        departure = datetime.utcnow().replace(microsecond=0) + timedelta(days=1)
+
+        best = _shared_trip(creator.id, departure + timedelta(minutes=5))
+        later = _shared_trip(creator.id, departure + timedelta(minutes=40))
+        wrong_way = _shared_trip(creator.id, departure, origin=ANAND, dest=CHARUSAT)
+        full = _shared_trip(creator.id, departure, available_seats=0)
+        db.add_all([best, later, wrong_way, full])
+        db.commit()
+
+        token = auth.create_access_token({"sub": str(rider.id)})
+        response = client.get(
+            "/rides/match",
+            params={
+                "from_lat": EARLY_ON_ROUTE[0], "from_lng": EARLY_ON_ROUTE[1],
+                "to_lat": LATE_ON_ROUTE[0], "to_lng": LATE_ON_ROUTE[1],
+                "departure": departure.isoformat(),
+            },
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [ride["id"] for ride in body] == [str(best.id), str(later.id)]
+        assert body[0]["match_score"] > body[1]["match_score"]
+        # 400 split across the 1 existing passenger plus the joiner
+        assert body[0]["fare_if_joined"] == 200.0
@@ -0,0 +1,130 @@
+import uuid
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+import models
+from services import seat_holds
+
+
+def test_reserve_then_confirm_books_the_held_seat(client, db, make_user, bearer_headers, make_shared_trip, trip_fares):
+    creator, asha = make_user("Creator"), make_user("Asha")
+    trip_id = make_shared_trip(creator)
+    db.commit()
+
+    reserved = client.post(f"/rides/{trip_id}/reserve", headers=bearer_headers(asha))
+    assert reserved.status_code == 201, reserved.text
+    hold = reserved.json()
+    assert hold["available_seats"] == 2
+    # A retried reserve hands back the same hold instead of taking another seat
+    assert client.post(f"/rides/{trip_id}/reserve", headers=bearer_headers(asha)).json()["hold_token"] == hold["hold_token"]
+
+    confirmed = client.post(f"/rides/{trip_id}/confirm", json={"hold_token": hold["hold_token"], "notes": "Gate 2"}, headers=bearer_headers(asha))
+
+    assert confirmed.status_code == 200, confirmed.text
+    assert confirmed.json()["available_seats"] == 2
+    assert trip_fares(trip_id) == {creator: (150.0, "cash"), asha: (150.0, "cash")}
+    assert db.get(models.SeatHold, uuid.UUID(hold["hold_token"])).status == "confirmed"
+    again = client.post(f"/rides/{trip_id}/confirm", json={"hold_token": hold["hold_token"]}, headers=bearer_headers(asha))
+    assert again.status_code == 400
+
+
+def test_lapsed_holds_are_released_and_cannot_be_confirmed(client, db, make_user, bearer_headers, make_shared_trip):
+    creator, asha, bala = make_user("Creator"), make_user("Asha"), make_user("Bala")
+    trip_id = make_shared_trip(creator, seats=2)
+    db.commit()
+
+    token = client.post(f"/rides/{trip_id}/reserve", headers=bearer_headers(asha)).json()["hold_token"]
+    assert client.post(f"/rides/{trip_id}/reserve", headers=bearer_headers(bala)).status_code == 400
+
+    released = seat_holds.release_expired(db, now=datetime.utcnow() + timedelta(seconds=seat_holds.HOLD_TTL + 1))
+
+    assert released == {trip_id: 1}
+    db.expire_all()
+    assert db.get(models.Trip, trip_id).available_seats == 1
+    assert db.get(models.SeatHold, uuid.UUID(token)).status == "expired"
+    assert client.post(f"/rides/{trip_id}/confirm", json={"hold_token": token}, headers=bearer_headers(asha)).status_code == 410
+    assert client.post(f"/rides/{trip_id}/reserve", headers=bearer_headers(bala)).status_code == 201
+
+
+def test_held_seats_do_not_dilute_fares(client, db, make_user, bearer_headers, make_shared_trip, trip_fares):
+    creator, asha, bala = make_user("Creator"), make_user("Asha"), make_user("Bala")
+    trip_id = make_shared_trip(creator)
+    db.commit()
+
+    client.post(f"/rides/{trip_id}/reserve", headers=bearer_headers(asha))
+    assert client.post(f"/rides/{trip_id}/join", headers=bearer_headers(bala)).json()["available_seats"] == 1
+
+    # Split over the two confirmed riders, not the unconfirmed hold
+    assert trip_fares(trip_id) == {creator: (150.0, "cash"), bala: (150.0, "cash")}
+
+
+def test_one_open_hold_per_passenger(client, db, monkeypatch, make_user, bearer_headers, make_shared_trip):
+    creator, asha = make_user("Creator"), make_user("Asha")
+    trip_id = make_shared_trip(creator)
+    db.commit()
+    first = client.post(f"/rides/{trip_id}/reserve", headers=bearer_headers(asha)).json()
+
+    # A second reserve that raced past the existing-hold check loses on the unique index
+    real_active_hold, calls = seat_holds.active_hold, []
+
+    def active_hold(*args):
+        calls.append(args)
+        return real_active_hold(*args) if len(calls) > 1 else None
+
+    monkeypatch.setattr(seat_holds, "active_hold", active_hold)
+    raced = client.post(f"/rides/{trip_id}/reserve", headers=bearer_headers(asha))
+    monkeypatch.undo()
+
+    assert raced.status_code == 201, raced.text
+    assert len(calls) == 2
+    assert raced.json()["hold_token"] == first["hold_token"]
+    assert raced.json()["available_seats"] == 2
+    db.expire_all()
+    assert db.query(models.SeatHold).filter(models.SeatHold.status == "held").count() == 1
+    with pytest.raises(IntegrityError):
+        seat_holds.reserve(db, trip_id, asha, datetime.utcnow())
+        db.flush()
+    db.rollback()
+
+    # A lapsed hold the reaper has not reached yet is replaced, not stacked
+    db.get(models.SeatHold, uuid.UUID(first["hold_token"])).expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    renewed = client.post(f"/rides/{trip_id}/reserve", headers=bearer_headers(asha))
+    assert renewed.status_code == 201
+    assert renewed.json()["hold_token"] != first["hold_token"]
+    assert renewed.json()["available_seats"] == 2
+    db.expire_all()
+    assert db.get(models.SeatHold, uuid.UUID(first["hold_token"])).status == "expired"
+
+
+def test_only_open_rides_take_holds(client, db, make_user, bearer_headers, make_shared_trip):
+    creator, asha = make_user("Creator"), make_user("Asha")
+    cancelled, past = make_shared_trip(creator), make_shared_trip(creator)
+    db.commit()
+    db.get(models.Trip, cancelled).status = "cancelled"
+    db.get(models.Trip, past).start_time = datetime.utcnow() - timedelta(minutes=5)
+    db.commit()
+
+    for trip_id in (cancelled, past):
+        response = client.post(f"/rides/{trip_id}/reserve", headers=bearer_headers(asha))
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Ride is no longer open for booking"
+    assert db.query(models.SeatHold).count() == 0
+
+
+def test_reaper_removes_rides_that_left_the_open_set(db, make_user, make_shared_trip, monkeypatch):
+    creator, asha = make_user("Creator"), make_user("Asha")
+    still_open, cancelled = make_shared_trip(creator), make_shared_trip(creator)
+    db.commit()
+    for trip_id in (still_open, cancelled):
+        seat_holds.reserve(db, trip_id, asha, datetime.utcnow() - timedelta(seconds=seat_holds.HOLD_TTL + 1))
+    db.get(models.Trip, cancelled).status = "cancelled"
+    db.commit()
+    monkeypatch.setattr(seat_holds, "publish_ride_event", lambda event_type, trip: (event_type, trip.id))
+
+    published = seat_holds.HoldReaper(lambda: nullcontext(db)).run_once()
+
+    assert sorted(published) == sorted([("ride_updated", still_open), ("ride_removed", cancelled)])
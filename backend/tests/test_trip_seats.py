@@ -0,0 +1,69 @@
+
+import models
+from services import trip_seats
+from utils.metrics import SEAT_CAS_CONFLICTS
+
+
+def test_join_and_leave_swap_seats_on_the_version(client, db, sql_statements, make_user, bearer_headers, make_shared_trip, trip_fares):
+    creator, asha, bala = make_user("Creator"), make_user("Asha"), make_user("Bala")
+    trip_id = make_shared_trip(creator)
+    db.commit()
+
+    assert client.post(f"/rides/{trip_id}/join", headers=bearer_headers(asha)).json()["available_seats"] == 2
+    with sql_statements as statements:
+        response = client.post(f"/rides/{trip_id}/join", json={"notes": "Gate 2"}, headers=bearer_headers(bala))
+
+    assert response.json()["available_seats"] == 1
+    trip_updates = [s for s in statements if s.startswith("UPDATE TRIPS")]
+    assert len(trip_updates) == 1 and "VERSION = ?" in trip_updates[0].split("WHERE")[1]
+    assert len([s for s in statements if s.startswith("UPDATE BOOKINGS")]) == 1
+    assert trip_fares(trip_id) == {creator: (100.0, "cash"), asha: (100.0, "cash"), bala: (100.0, "cash")}
+
+    assert client.post(f"/rides/{trip_id}/leave", headers=bearer_headers(asha)).json()["available_seats"] == 2
+    assert trip_fares(trip_id) == {creator: (150.0, "cash"), bala: (150.0, "cash")}
+    trip = db.get(models.Trip, trip_id)
+    assert (trip.available_seats, trip.version, float(trip.price_per_seat)) == (2, 3, 150.0)
+    assert client.post(f"/rides/{trip_id}/leave", headers=bearer_headers(asha)).status_code == 400
+
+
+def test_join_retries_when_the_trip_changed_first(client, db, monkeypatch, make_user, bearer_headers, make_shared_trip):
+    creator, asha = make_user("Creator"), make_user("Asha")
+    trip_id = make_shared_trip(creator)
+    db.commit()
+    attempts = []
+    swap = trip_seats.swap_seats
+
+    def racing_swap(session, trip, delta, price_per_seat):
+        attempts.append(trip.version)
+        if len(attempts) == 1:
+            # A concurrent writer bumps the version between our read and our swap
+            session.execute(models.Trip.__table__.update().where(models.Trip.id == trip.id).values(version=models.Trip.version + 1))
+        return swap(session, trip, delta, price_per_seat)
+
+    monkeypatch.setattr(trip_seats, "swap_seats", racing_swap)
+    monkeypatch.setattr(trip_seats, "backoff_delay", lambda attempt: 0)
+
+    response = client.post(f"/rides/{trip_id}/join", headers=bearer_headers(asha))
+
+    assert response.status_code == 200
+    assert attempts == [0, 0]  # the losing attempt was rolled back, so it re-read version 0
+    db.expire_all()
+    assert db.get(models.Trip, trip_id).version == 1
+
+
+def test_join_gives_up_after_max_attempts(client, db, monkeypatch, make_user, bearer_headers, make_shared_trip):
+    creator, asha = make_user("Creator"), make_user("Asha")
+    trip_id = make_shared_trip(creator)
+    db.commit()
+    calls = []
+    conflicts_before = SEAT_CAS_CONFLICTS.values().get(("join",), 0)
+    monkeypatch.setattr(trip_seats, "swap_seats", lambda *args: calls.append(args) and False)
+    monkeypatch.setattr(trip_seats, "backoff_delay", lambda attempt: 0)
+
+    response = client.post(f"/rides/{trip_id}/join", headers=bearer_headers(asha))
+
+    assert response.status_code == 409
+    assert len(calls) == trip_seats.MAX_ATTEMPTS
+    assert SEAT_CAS_CONFLICTS.values()[("join",)] - conflicts_before == trip_seats.MAX_ATTEMPTS
+    db.expire_all()
+    assert db.query(models.Booking).filter_by(trip_id=trip_id).count() == 1
@@ -0,0 +1,64 @@
+import asyncio
+import uuid
+
+import models
+from utils import unread_counts
+from utils.notifications import NotificationTemplate, create_notifications_bulk
+
+
+def _notification(db, user_id, is_read=False):
+    notification = models.Notification(id=uuid.uuid4(), user_id=user_id, title="t", message="m", type="test", is_read=is_read)
+    db.add(notification)
+    db.commit()
+    return notification
+
+
+def test_count_is_cached_and_reconciled(client, db, make_user, bearer_headers):
+    user_id = make_user("Rider")
+    _notification(db, user_id)
+    _notification(db, user_id)
+    _notification(db, user_id, is_read=True)
+
+    assert client.get("/notifications/unread-count", headers=bearer_headers(user_id)).json() == {"unread": 2}
+
+    # Written behind the cache's back: the badge stays cached until reconcile
+    _notification(db, user_id)
+    assert client.get("/notifications/unread-count", headers=bearer_headers(user_id)).json() == {"unread": 2}
+    assert unread_counts.reconcile(db) >= 1
+    assert client.get("/notifications/unread-count", headers=bearer_headers(user_id)).json() == {"unread": 3}
+
+
+def test_writers_keep_counter_in_step(client, db, make_user, bearer_headers):
+    user_id = make_user("Rider")
+    first = _notification(db, user_id)
+    _notification(db, user_id)
+    headers = bearer_headers(user_id)
+    assert client.get("/notifications/unread-count", headers=headers).json()["unread"] == 2
+
+    client.post(f"/notifications/{first.id}/read", headers=headers)
+    client.post(f"/notifications/{first.id}/read", headers=headers)
+    assert unread_counts.cache.get(user_id) == 1
+
+    asyncio.run(create_notifications_bulk(db, [user_id], NotificationTemplate("a", "b", "test"), fanout=False))
+    assert unread_counts.cache.get(user_id) == 2
+
+    client.post("/notifications/read-all", headers=headers)
+    assert client.get("/notifications/unread-count", headers=headers).json()["unread"] == 0
+    assert unread_counts.count_unread(db, user_id) == 0
+
+
+def test_requires_valid_token(client):
+    response = client.get("/notifications/unread-count", headers={"Authorization": "Bearer nope"})
+
+    assert response.status_code == 401
+
+
+def test_cache_evicts_least_recently_set():
+    cache = unread_counts.UnreadCountCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    cache.incr(["a", "c"])
+
+    assert cache.get("a") is None
+    assert cache.get("c") == 4
@@ -79,3 +79,62 @@ class TestWebSocketManager:
         assert hasattr(manager, 'disconnect')
         assert hasattr(manager, 'send_personal_message')
         assert hasattr(manager, 'send_to_drivers')
+
+
+class TestConnectionManagerFanout:
+    """Broadcasts encode once and send the same text frame to every socket"""
+
+    class _RecordingSocket:
+        def __init__(self):
+            self.frames = []
+
+        async def send_text(self, text):
+            self.frames.append(text)
+
+    def test_broadcast_to_trip_sends_identical_frames(self):
+        from websocket_manager import ConnectionManager
+        import json
+
+        local_manager = ConnectionManager()
+        sockets = [self._RecordingSocket() for _ in range(3)]
+        local_manager.trip_connections["trip-1"] = set(sockets)
+
+        asyncio.run(local_manager.broadcast_to_trip("trip-1", {"type": "seat_update", "available_seats": 2}))
+
+        frames = [frame for s in sockets for frame in s.frames]
+        assert len(frames) == 3
+        assert len(set(frames)) == 1
+        assert json.loads(frames[0]) == {"type": "seat_update", "available_seats": 2}
+
+    def test_json_codec_handles_decimal_and_uuid(self):
+        from decimal import Decimal
+        from uuid import UUID
+        from utils.json_codec import FastJSONResponse
+        import json
+
+        trip_id = UUID("12345678-1234-5678-1234-567812345678")
+        response = FastJSONResponse({"id": trip_id, "fare": Decimal("33.33"), "name": "Anand ₹"})
+
+        assert json.loads(response.body) == {"id": str(trip_id), "fare": 33.33, "name": "Anand ₹"}
+
+    def test_json_codec_orjson_matches_stdlib_bytes(self, monkeypatch):
+        from datetime import datetime
+        from decimal import Decimal
+        from uuid import UUID
+        from utils import json_codec
+
+        if json_codec.orjson is None:
+            pytest.skip("orjson not installed")
+        payload = {
+            "id": UUID("12345678-1234-5678-1234-567812345678"),
+            "fare": Decimal("33.33"),
+            "start_time": datetime(2026, 6, 15, 12, 0, 5, 123456),
+            "name": "Anand ₹",
+            "seats": [1, 2.5, None, True],
+            "route": {"from": "CHARUSAT", "to": "Anand"},
+        }
+
+        fast = json_codec.dumps_bytes(payload)
+        monkeypatch.setattr(json_codec, "orjson", None)
+
+        assert fast == json_codec.dumps_bytes(payload)
@@ -0,0 +1,57 @@
+"""
+Fast JSON encoding for HTTP responses and WebSocket frames.
+
+Uses orjson when it is installed and falls back to the stdlib ``json``
+module otherwise, so the app still runs in environments without the
+compiled wheel.  Output matches Starlette's ``JSONResponse``/``send_json``
+(compact separators, UTF-8, no ASCII escaping).
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without the wheel
+    orjson = None
+
+
+def _default(value: Any):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps_bytes(content: Any) -> bytes:
+    """Encode *content* to UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def dumps(content: Any) -> str:
+    """Encode *content* to a JSON string (for WebSocket text frames)."""
+    return dumps_bytes(content).decode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: same wire format as ``JSONResponse``, faster encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
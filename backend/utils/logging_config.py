@@ -0,0 +1,193 @@
+"""
+logging_config – non-blocking logging setup and the per-request access log.
+
+``configure_logging()`` replaces the old ``basicConfig(StreamHandler)``: the
+root logger gets a ``QueueHandler`` and a ``QueueListener`` thread owns the
+real stream handler, so the event loop only appends a record to a queue.
+The caller interpolates the message (``msg % args``) before queueing, so the
+listener never touches live objects such as ORM instances owned by another
+thread; timestamps, JSON and tracebacks are rendered on the listener.  Call
+sites should still pass arguments (``logger.info("x=%s", x)``) rather than
+f-strings, so records below the level (or sampled out) cost nothing.
+
+``AccessLogMiddleware`` emits one ``commuto.access`` record per HTTP request
+with method, route template, status, duration and CORS fields attached as
+attributes (``LOG_FORMAT=json`` renders them as structured fields).
+
+Environment:
+
+* ``LOG_LEVEL`` – root level (default ``INFO``)
+* ``LOG_FORMAT`` – ``text`` (default) or ``json``
+* ``LOG_DEBUG_SAMPLE_RATE`` – fraction of DEBUG records kept (default ``1``)
+* ``ACCESS_LOG`` – ``0`` disables the access log
+"""
+from __future__ import annotations
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+ACCESS_LOGGER = "commuto.access"
+access_logger = logging.getLogger(ACCESS_LOGGER)
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# LogRecord attributes that are not user-supplied ``extra`` fields
+_RESERVED = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; ``extra=`` fields become top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only *rate* of the records at or below *max_level* (higher levels always pass)."""
+
+    def __init__(self, rate: float, max_level: int = logging.DEBUG):
+        super().__init__()
+        self.rate = rate
+        self.max_level = max_level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level or self.rate >= 1:
+            return True
+        return random.random() < self.rate
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves everything but ``msg % args`` to the listener thread.
+
+    The stock ``prepare()`` runs the full formatter (and traceback rendering)
+    in the caller, the event loop here.  Only the message is snapshotted, so
+    the record the listener formats no longer refers to the call's arguments.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None, stream=None) -> logging.handlers.QueueListener:
+    """Route the root logger through a background queue listener (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    fmt = (fmt or os.getenv("LOG_FORMAT", "text")).lower()
+
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    # Sample on the caller's side so dropped DEBUG records are never built or queued
+    sample_rate = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1"))
+    if sample_rate < 1:
+        queue_handler.addFilter(SamplingFilter(sample_rate))
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        if isinstance(existing, logging.handlers.QueueHandler):
+            root.removeHandler(existing)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    if os.getenv("ACCESS_LOG", "1") == "0":
+        access_logger.disabled = True
+
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+
+
+class AccessLogMiddleware:
+    """Pure ASGI middleware writing a single access record per HTTP request."""
+
+    def __init__(self, app, logger: logging.Logger = access_logger):
+        self.app = app
+        self.logger = logger
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.logger.isEnabledFor(logging.INFO):
+            await self.app(scope, receive, send)
+            return
+
+        response = {"status": 500, "allow_origin": None}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name == b"access-control-allow-origin":
+                        response["allow_origin"] = value.decode("latin-1")
+                        break
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self._emit(scope, response, time.perf_counter() - started)
+
+    def _emit(self, scope, response: dict, elapsed: float):
+        origin = None
+        for name, value in scope.get("headers", ()):
+            if name == b"origin":
+                origin = value.decode("latin-1")
+                break
+        route = scope.get("route")
+        client = scope.get("client")
+        status = response["status"]
+        level = logging.ERROR if status >= 500 else logging.INFO
+        self.logger.log(
+            level,
+            "%s %s -> %d in %.1f ms",
+            scope["method"], scope["path"], status, elapsed * 1000,
+            extra={
+                "http_method": scope["method"],
+                "http_path": scope["path"],
+                "http_route": getattr(route, "path", None) or "unmatched",
+                "http_status": status,
+                "duration_ms": round(elapsed * 1000, 2),
+                "client_ip": client[0] if client else None,
+                "origin": origin,
+                "cors_allow_origin": response["allow_origin"],
+            },
+        )
@@ -0,0 +1,158 @@
+"""
+loop_monitor – event-loop lag and threadpool saturation monitor.
+
+Two cooperating pieces, started from ``main.lifespan``:
+
+* a task on the event loop that sleeps ``LOOP_MONITOR_INTERVAL_MS`` and
+  records how late it woke up (scheduling lag) into
+  ``commuto_event_loop_lag_seconds``;
+* a watchdog thread that notices when that task has not checked in for
+  ``LOOP_LAG_THRESHOLD_MS`` past its deadline – i.e. something is running
+  on the loop without yielding – and logs the loop thread's current stack
+  (once per stall), which points straight at the blocking call.
+
+The AnyIO default thread limiter (used by sync routes and dependencies) is
+resized from ``THREADPOOL_SIZE`` at startup; its total/in-use/waiting counts
+are exported as ``commuto_threadpool_tokens``.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, Optional
+
+from anyio import to_thread
+
+from utils.metrics import EVENT_LOOP_LAG, EVENT_LOOP_STALLS
+
+logger = logging.getLogger(__name__)
+
+INTERVAL = int(os.getenv("LOOP_MONITOR_INTERVAL_MS", "250")) / 1000
+LAG_THRESHOLD = int(os.getenv("LOOP_LAG_THRESHOLD_MS", "200")) / 1000
+
+
+def _threadpool_size() -> Optional[int]:
+    value = os.getenv("THREADPOOL_SIZE")
+    return int(value) if value else None
+
+
+class LoopMonitor:
+    def __init__(self, interval: float = INTERVAL, threshold: float = LAG_THRESHOLD, threadpool_size: Optional[int] = None):
+        self.interval = interval
+        self.threshold = threshold
+        self.threadpool_size = threadpool_size if threadpool_size is not None else _threadpool_size()
+        self.max_lag = 0.0
+        self.stalls_dumped = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._limiter = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._heartbeat = time.monotonic()
+
+    async def start(self):
+        """Start the lag probe and watchdog on the running loop."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._limiter = to_thread.current_default_thread_limiter()
+        if self.threadpool_size:
+            self._limiter.total_tokens = self.threadpool_size
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._probe(), name="loop-lag-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=self.interval * 4)
+            self._watchdog = None
+
+    async def _probe(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._heartbeat = time.monotonic()
+            EVENT_LOOP_LAG.observe(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+            if lag > self.threshold:
+                EVENT_LOOP_STALLS.inc()
+                logger.warning("Event loop lag %.0f ms (threshold %.0f ms)", lag * 1000, self.threshold * 1000)
+
+    def _watch(self):
+        dumped_for = None
+        while not self._stop.wait(min(self.interval, self.threshold) / 2):
+            heartbeat = self._heartbeat
+            overdue = time.monotonic() - heartbeat - self.interval
+            if overdue <= self.threshold or dumped_for == heartbeat:
+                continue
+            dumped_for = heartbeat
+            self._dump_loop_stack(overdue)
+
+    def _dump_loop_stack(self, overdue: float):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        task = _running_task(self._loop)
+        self.stalls_dumped += 1
+        logger.warning(
+            "Event loop blocked for %.0f ms by %s; loop thread stack:\n%s",
+            overdue * 1000,
+            task.get_name() if task is not None else "a callback",
+            "".join(traceback.format_stack(frame)),
+        )
+
+    def threadpool_stats(self) -> Dict[str, int]:
+        if self._limiter is None:
+            return {}
+        stats = self._limiter.statistics()
+        return {"total": int(stats.total_tokens), "in_use": stats.borrowed_tokens, "waiting": stats.tasks_waiting}
+
+
+def _running_task(loop) -> Optional[asyncio.Task]:
+    # Read from another thread; a stale answer only mislabels one log line
+    current = getattr(asyncio.tasks, "_current_tasks", None)
+    return current.get(loop) if current is not None else None
+
+
+_monitor: Optional[LoopMonitor] = None
+
+
+def current_monitor() -> Optional[LoopMonitor]:
+    return _monitor
+
+
+async def start_monitor(**kwargs) -> Optional[LoopMonitor]:
+    """Start the process-wide monitor unless ``LOOP_MONITOR=0``."""
+    global _monitor
+    if os.getenv("LOOP_MONITOR", "1") == "0":
+        return None
+    if _monitor is not None:
+        await _monitor.stop()
+    _monitor = LoopMonitor(**kwargs)
+    await _monitor.start()
+    return _monitor
+
+
+async def stop_monitor():
+    global _monitor
+    if _monitor is not None:
+        await _monitor.stop()
+        _monitor = None
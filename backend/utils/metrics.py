@@ -0,0 +1,377 @@
+"""
+metrics – low-overhead in-process metrics with Prometheus text exposition.
+
+Counters and histograms are sharded per thread: each thread increments its
+own ``threading.local`` dict, so the request path never takes a lock (the
+only lock guards registering a new thread's shard, once per thread).  A
+scrape sums the shards; values may be a few increments behind under load,
+which is fine for monitoring.  Gauges are callbacks evaluated at scrape time
+(DB pool, WebSocket connections) or per-thread up/down counters (in-flight
+requests).
+
+``render()`` produces the Prometheus text format served at ``GET /metrics``.
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+FANOUT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Sharded:
+    """Per-thread storage; the hot path only touches the calling thread's dict."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            self._local.shard = shard
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def _all_shards(self) -> List[dict]:
+        with self._lock:
+            return list(self._shards)
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__()
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def values(self) -> Dict[LabelValues, float]:
+        totals: Dict[LabelValues, float] = {}
+        for shard in self._all_shards():
+            for labels, value in list(shard.items()):
+                totals[labels] = totals.get(labels, 0.0) + value
+        return totals
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in sorted(self.values().items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class UpDownGauge(Counter):
+    """Gauge built from per-thread deltas (inc on one side, dec on the other)."""
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+
+class CallbackMetric:
+    """Values computed at scrape time (pool state, socket counts, totals kept elsewhere)."""
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], Dict[LabelValues, float]], labelnames: Sequence[str] = (), kind: str = "gauge"):
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self.callback = callback
+        self.kind = kind
+
+    def samples(self) -> Iterable[str]:
+        try:
+            values = self.callback()
+        except Exception:
+            return
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__()
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str):
+        shard = self._shard()
+        state = shard.get(labels)
+        if state is None:
+            # [per-bucket counts (last is +Inf), sum]
+            state = shard[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def time(self, *labels: str):
+        return _Timer(self, labels)
+
+    def values(self) -> Dict[LabelValues, Tuple[List[int], float]]:
+        merged: Dict[LabelValues, Tuple[List[int], float]] = {}
+        for shard in self._all_shards():
+            for labels, (counts, total) in list(shard.items()):
+                if labels in merged:
+                    prev_counts, prev_total = merged[labels]
+                    merged[labels] = ([a + b for a, b in zip(prev_counts, counts)], prev_total + total)
+                else:
+                    merged[labels] = (list(counts), total)
+        return merged
+
+    def samples(self) -> Iterable[str]:
+        for labels, (counts, total) in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: LabelValues):
+        self.histogram, self.labels = histogram, labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+        return False
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def unregister(self, name: str):
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return registry.register(Counter(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+    return registry.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def updown_gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> UpDownGauge:
+    return registry.register(UpDownGauge(name, documentation, labelnames))
+
+
+def callback_gauge(name: str, documentation: str, callback: Callable[[], Dict[LabelValues, float]], labelnames: Sequence[str] = ()) -> CallbackMetric:
+    return registry.register(CallbackMetric(name, documentation, callback, labelnames))
+
+
+def callback_counter(name: str, documentation: str, callback: Callable[[], Dict[LabelValues, float]], labelnames: Sequence[str] = ()) -> CallbackMetric:
+    return registry.register(CallbackMetric(name, documentation, callback, labelnames, kind="counter"))
+
+
+def render() -> str:
+    return registry.render()
+
+
+# ── Application metrics ────────────────────────────────────────────────────
+
+HTTP_REQUEST_DURATION = histogram(
+    "commuto_http_request_duration_seconds",
+    "HTTP request latency by route template and status code",
+    ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT = updown_gauge(
+    "commuto_http_requests_in_flight",
+    "HTTP requests currently being served",
+)
+WEBSOCKET_FANOUT_DURATION = histogram(
+    "commuto_websocket_fanout_seconds",
+    "Time to deliver one message to every recipient socket",
+    ("kind",),
+    buckets=FANOUT_BUCKETS,
+)
+WEBSOCKET_FANOUT_RECIPIENTS = counter(
+    "commuto_websocket_fanout_recipients_total",
+    "Sockets a fanout message was sent to",
+    ("kind",),
+)
+RATE_LIMIT_REJECTIONS = counter(
+    "commuto_rate_limit_rejections_total",
+    "Requests rejected with 429 by the in-memory rate limiter",
+    ("limit",),
+)
+NOTIFICATION_DISPATCH_FAILURES = counter(
+    "commuto_notification_dispatch_failures_total",
+    "Notifications that failed to persist or be delivered",
+    ("stage",),
+)
+GOOGLE_JWKS_FETCHES = counter(
+    "commuto_google_jwks_fetches_total",
+    "Fetches of Google's ID-token signing keys (logins verify against the cached set)",
+    ("result",),
+)
+SEAT_CAS_CONFLICTS = counter(
+    "commuto_seat_cas_conflicts_total",
+    "Join/leave attempts retried because the trip's version changed first",
+    ("operation",),
+)
+READ_ROUTING = counter(
+    "commuto_read_routing_total",
+    "Read-only requests with replicas configured, by where they ran (replica, pinned, fallback)",
+    ("target",),
+)
+
+EVENT_LOOP_LAG = histogram(
+    "commuto_event_loop_lag_seconds",
+    "How late the loop monitor woke up relative to its schedule",
+    buckets=LAG_BUCKETS,
+)
+EVENT_LOOP_STALLS = counter(
+    "commuto_event_loop_stalls_total",
+    "Loop monitor wake-ups later than LOOP_LAG_THRESHOLD_MS",
+)
+
+
+def _db_pool_values() -> Dict[LabelValues, float]:
+    from database import engine
+
+    pool = engine.pool
+    values = {}
+    for state in ("size", "checkedin", "checkedout", "overflow"):
+        reader = getattr(pool, state, None)
+        if callable(reader):
+            values[(state,)] = reader()
+    return values
+
+
+def _websocket_values() -> Dict[LabelValues, float]:
+    from websocket_manager import manager
+
+    return {
+        ("connections",): sum(len(sockets) for sockets in list(manager.active_connections.values())),
+        ("users",): len(manager.active_connections),
+        ("trip_rooms",): len(manager.trip_connections),
+        ("trip_room_members",): sum(len(sockets) for sockets in list(manager.trip_connections.values())),
+        ("channels",): len(manager.channel_subscribers),
+        ("channel_subscribers",): sum(len(sockets) for sockets in list(manager.channel_subscribers.values())),
+    }
+
+
+def _threadpool_values() -> Dict[LabelValues, float]:
+    from utils.loop_monitor import current_monitor
+
+    monitor = current_monitor()
+    return {(state,): value for state, value in monitor.threadpool_stats().items()} if monitor else {}
+
+
+def _db_statement_values(field: str) -> Callable[[], Dict[LabelValues, float]]:
+    def collect():
+        from utils.query_stats import route_query_snapshot
+
+        return {key: totals[field] for key, totals in route_query_snapshot().items()}
+    return collect
+
+
+callback_gauge("commuto_db_pool_connections", "SQLAlchemy connection pool state", _db_pool_values, ("state",))
+callback_gauge("commuto_websocket_active", "Live WebSocket connections, users, rooms and feed subscriptions", _websocket_values, ("kind",))
+callback_gauge("commuto_threadpool_tokens", "AnyIO worker thread limiter: total, in_use and waiting", _threadpool_values, ("state",))
+# Per-route SQL totals kept by utils.query_stats
+callback_counter("commuto_db_statements_total", "SQL statements issued by route", _db_statement_values("statements"), ("method", "route"))
+callback_counter("commuto_db_time_seconds_total", "Time spent executing SQL by route", _db_statement_values("db_seconds"), ("method", "route"))
+callback_counter(
+    "commuto_db_repeated_statement_warnings_total",
+    "Repeated-statement (N+1) warnings by route",
+    _db_statement_values("n_plus_one_warnings"),
+    ("method", "route"),
+)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording duration and status per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_holder = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                getattr(route, "path", None) or "unmatched",
+                str(status_holder[0]),
+            )
@@ -1,11 +1,123 @@
 import models
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from routers.websocket_router import manager
+from anyio import to_thread
+from websocket_manager import manager
 import logging
-from typing import Optional
+from utils.metrics import NOTIFICATION_DISPATCH_FAILURES
+from utils.unread_counts import cache as unread_count_cache
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Rows per INSERT ... RETURNING statement (8 bind params per row keeps a chunk
+# well under PostgreSQL's 65535-parameter limit)
+BULK_INSERT_CHUNK = 1000
+
+
+@dataclass(frozen=True)
+class NotificationTemplate:
+    """Title/message/type/link shared by every recipient of a bulk notification."""
+    title: str
+    message: str
+    type: str
+    link: Optional[str] = None
+
+
+def notification_message(notification_id, title, message, notification_type, link, created_at) -> Dict[str, Any]:
+    """WebSocket frame for a stored notification."""
+    return {
+        "type": "notification",
+        "data": {
+            "id": str(notification_id),
+            "title": title,
+            "message": message,
+            "type": notification_type,
+            "link": link,
+            "created_at": created_at.isoformat()
+        }
+    }
+
+
+def _unique_user_ids(recipients: Iterable[Any]) -> List[uuid.UUID]:
+    seen = dict.fromkeys(str(user_id) for user_id in recipients if user_id)
+    return [uuid.UUID(user_id) for user_id in seen]
+
+
+def insert_notifications(db: Session, recipients: Iterable[Any], template: NotificationTemplate) -> Dict[str, Dict[str, Any]]:
+    """Insert one notification per recipient with multi-row INSERT ... RETURNING (no commit).
+
+    Returns the WebSocket frame for each recipient, keyed by user id.
+    """
+    user_ids = _unique_user_ids(recipients)
+    if not user_ids:
+        return {}
+    now = datetime.utcnow()
+    statement = insert(models.Notification).returning(models.Notification.id, sort_by_parameter_order=True)
+    frames: Dict[str, Dict[str, Any]] = {}
+    for start in range(0, len(user_ids), BULK_INSERT_CHUNK):
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "title": template.title,
+                "message": template.message,
+                "type": template.type,
+                "link": template.link,
+                "is_read": False,
+                "created_at": now,
+            }
+            for user_id in user_ids[start:start + BULK_INSERT_CHUNK]
+        ]
+        # RETURNING comes back in parameter order; ids are generated here, so
+        # each returned row confirms the matching input row was stored
+        for row, _returned in zip(rows, db.execute(statement, rows)):
+            frames[str(row["user_id"])] = notification_message(
+                row["id"], template.title, template.message, template.type, template.link, now
+            )
+    return frames
+
+
+async def create_notifications_bulk(
+    db: Session,
+    recipients: Iterable[Any],
+    template: NotificationTemplate,
+    *,
+    fanout: bool = True,
+) -> int:
+    """
+    Creates the same notification for many users: chunked multi-row
+    INSERT ... RETURNING, one commit, then one WebSocket fanout call.
+
+    The inserts run in a worker thread so thousands of recipients never stall
+    the event loop. Returns the number of notifications stored.
+    """
+    def persist() -> Dict[str, Dict[str, Any]]:
+        frames = insert_notifications(db, recipients, template)
+        db.commit()
+        return frames
+
+    try:
+        frames = await to_thread.run_sync(persist)
+    except Exception as e:
+        logger.error("Error creating %s notifications in bulk: %s", template.type, e)
+        NOTIFICATION_DISPATCH_FAILURES.inc("persist")
+        db.rollback()
+        raise
+
+    unread_count_cache.incr(frames)
+    if fanout and frames:
+        try:
+            await manager.send_personal_messages(frames)
+        except Exception as e:
+            NOTIFICATION_DISPATCH_FAILURES.inc("dispatch")
+            logger.warning("Bulk notification fanout failed: %s", e)
+    return len(frames)
+
+
 async def create_notification(
     db: Session,
     user_id: str,
@@ -18,9 +130,9 @@ async def create_notification(
     Creates a notification in the database and sends it via WebSocket if user is connected.
     """
     try:
-        # 1. Create DB record
+        # 1. Create DB record (UUID column; callers pass str ids)
         db_notification = models.Notification(
-            user_id=user_id,
+            user_id=uuid.UUID(str(user_id)),
             title=title,
             message=message,
             type=notification_type,
@@ -29,25 +141,19 @@ async def create_notification(
         db.add(db_notification)
         db.commit()
         db.refresh(db_notification)
-        
+        unread_count_cache.incr([user_id])
+
         # 2. Prepare WebSocket message
-        ws_message = {
-            "type": "notification",
-            "data": {
-                "id": str(db_notification.id),
-                "title": title,
-                "message": message,
-                "type": notification_type,
-                "link": link,
-                "created_at": db_notification.created_at.isoformat()
-            }
-        }
-        
+        ws_message = notification_message(
+            db_notification.id, title, message, notification_type, link, db_notification.created_at
+        )
+
         # 3. Send via WebSocket
         await manager.send_personal_message(ws_message, str(user_id))
-        
+
         return db_notification
     except Exception as e:
         logger.error(f"Error creating notification for user {user_id}: {str(e)}")
+        NOTIFICATION_DISPATCH_FAILURES.inc("persist")
         db.rollback()
         return None
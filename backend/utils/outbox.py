@@ -0,0 +1,353 @@
+"""
+outbox – transactional outbox for notifications and WebSocket events.
+
+Request handlers call ``enqueue_notification`` / ``enqueue_trip_message`` /
+``enqueue_personal_message`` / ``enqueue_drivers_message`` *before* their
+``db.commit()``, so the event row is written atomically with the business
+change (and vanishes with it on rollback).  One row covers every recipient.
+
+``OutboxDispatcher`` is a single task started in ``main.lifespan``.  A
+Session ``after_commit`` hook wakes it immediately; otherwise it polls every
+``OUTBOX_POLL_INTERVAL_MS``.  Each round claims up to ``OUTBOX_BATCH_SIZE``
+pending rows in a worker thread, bulk-inserts the ``Notification`` rows for
+all of them, marks them dispatched in the same commit, and then fans the
+messages out over WebSocket on the loop.  Persisted notifications are
+therefore exactly-once; the socket push is best effort (clients re-fetch
+``/notifications`` on reconnect).
+
+An event that cannot be expanded, or whose notification rows fail to
+insert (e.g. a recipient deleted since), is retried on later rounds and
+abandoned after ``OUTBOX_MAX_ATTEMPTS``; the rest of its batch goes out.
+Dispatched rows are deleted after ``OUTBOX_RETENTION_DAYS`` by
+``purge_dispatched``, which the notification retention worker runs.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, ContextManager, Dict, Iterable, List, Optional, Tuple
+
+from anyio import to_thread
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+import models
+from database import SessionLocal
+from utils.metrics import NOTIFICATION_DISPATCH_FAILURES
+from utils.notifications import notification_message
+from utils.unread_counts import cache as unread_count_cache
+from websocket_manager import manager
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "200"))
+POLL_INTERVAL = int(os.getenv("OUTBOX_POLL_INTERVAL_MS", "1000")) / 1000
+MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", "7"))
+PURGE_BATCH_SIZE = 5000
+
+NOTIFICATION = "notification"
+TRIP = "trip"
+PERSONAL = "personal"
+DRIVERS = "drivers"
+
+_PENDING_FLAG = "outbox_pending"
+
+# (kind, target, message) – target is a user id, trip id, or driver id to exclude
+Delivery = Tuple[str, Optional[str], Dict[str, Any]]
+
+
+def _enqueue(db: Session, kind: str, payload: Dict[str, Any]) -> models.OutboxEvent:
+    outbox_event = models.OutboxEvent(id=uuid.uuid4(), kind=kind, payload=payload, created_at=datetime.utcnow())
+    db.add(outbox_event)
+    db.info[_PENDING_FLAG] = True
+    return outbox_event
+
+
+def enqueue_notification(
+    db: Session,
+    recipients: Iterable[Any],
+    title: str,
+    message: str,
+    notification_type: str,
+    link: Optional[str] = None,
+) -> Optional[models.OutboxEvent]:
+    """Queue one persistent notification for every recipient (no commit)."""
+    user_ids = list(dict.fromkeys(str(user_id) for user_id in recipients if user_id))
+    if not user_ids:
+        return None
+    return _enqueue(db, NOTIFICATION, {
+        "recipients": user_ids,
+        "title": title,
+        "message": message,
+        "type": notification_type,
+        "link": link,
+    })
+
+
+def enqueue_trip_message(db: Session, trip_id: Any, message: Dict[str, Any]) -> models.OutboxEvent:
+    """Queue a broadcast to everyone in the trip's WebSocket room (no commit)."""
+    return _enqueue(db, TRIP, {"trip_id": str(trip_id), "message": message})
+
+
+def enqueue_personal_message(db: Session, user_id: Any, message: Dict[str, Any]) -> models.OutboxEvent:
+    return _enqueue(db, PERSONAL, {"user_id": str(user_id), "message": message})
+
+
+def enqueue_drivers_message(db: Session, message: Dict[str, Any], exclude_user_id: Any = None) -> models.OutboxEvent:
+    return _enqueue(db, DRIVERS, {
+        "message": message,
+        "exclude_user_id": str(exclude_user_id) if exclude_user_id else None,
+    })
+
+
+def _expand(outbox_event: models.OutboxEvent, now: datetime) -> Tuple[List[Dict[str, Any]], List[Delivery]]:
+    """Notification rows to insert and messages to send for one outbox row."""
+    payload = outbox_event.payload
+    if outbox_event.kind == NOTIFICATION:
+        rows, deliveries = [], []
+        for user_id in payload["recipients"]:
+            row = {
+                "id": uuid.uuid4(),
+                "user_id": uuid.UUID(user_id),
+                "title": payload["title"],
+                "message": payload["message"],
+                "type": payload["type"],
+                "link": payload.get("link"),
+                "is_read": False,
+                "created_at": now,
+            }
+            rows.append(row)
+            deliveries.append((PERSONAL, user_id, notification_message(
+                row["id"], row["title"], row["message"], row["type"], row["link"], now,
+            )))
+        return rows, deliveries
+    if outbox_event.kind == TRIP:
+        return [], [(TRIP, payload["trip_id"], payload["message"])]
+    if outbox_event.kind == PERSONAL:
+        return [], [(PERSONAL, payload["user_id"], payload["message"])]
+    if outbox_event.kind == DRIVERS:
+        return [], [(DRIVERS, payload.get("exclude_user_id"), payload["message"])]
+    raise ValueError(f"Unknown outbox event kind: {outbox_event.kind}")
+
+
+def _record_failure(outbox_event: models.OutboxEvent, exc: Exception, now: datetime, stage: str):
+    """Count a failed attempt; abandon the event (mark it dispatched) at ``MAX_ATTEMPTS``."""
+    outbox_event.last_error = str(exc)[:1000]
+    NOTIFICATION_DISPATCH_FAILURES.inc("outbox")
+    logger.error("Outbox event %s could not be %s: %s", outbox_event.id, stage, exc)
+    if outbox_event.attempts >= MAX_ATTEMPTS:
+        outbox_event.dispatched_at = now
+
+
+def _insert_notifications(db: Session, rows: List[Dict[str, Any]]) -> Optional[Exception]:
+    """Insert *rows* in a savepoint; the error, if any, leaves the batch transaction usable."""
+    if not rows:
+        return None
+    try:
+        with db.begin_nested():
+            db.execute(insert(models.Notification), rows)
+    except SQLAlchemyError as exc:
+        return exc
+    return None
+
+
+def claim_batch(db: Session, batch_size: int = BATCH_SIZE) -> List[Delivery]:
+    """Persist one batch of pending events and return what to send.
+
+    Notification rows and the ``dispatched_at`` marks are committed together;
+    ``SKIP LOCKED`` lets several workers drain the same table on PostgreSQL.
+    """
+    pending = (
+        db.query(models.OutboxEvent)
+        .filter(models.OutboxEvent.dispatched_at.is_(None))
+        .order_by(models.OutboxEvent.created_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not pending:
+        db.rollback()
+        return []
+
+    now = datetime.utcnow()
+    expanded = []
+    for outbox_event in pending:
+        outbox_event.attempts = (outbox_event.attempts or 0) + 1
+        try:
+            event_rows, event_deliveries = _expand(outbox_event, now)
+        except Exception as exc:
+            _record_failure(outbox_event, exc, now, "expanded")
+            continue
+        expanded.append((outbox_event, event_rows, event_deliveries))
+
+    if _insert_notifications(db, [row for _, event_rows, _ in expanded for row in event_rows]) is not None:
+        # One bad event fails the bulk insert; retry event by event so only it is held back
+        inserted = []
+        for outbox_event, event_rows, event_deliveries in expanded:
+            error = _insert_notifications(db, event_rows)
+            if error is None:
+                inserted.append((outbox_event, event_rows, event_deliveries))
+            else:
+                _record_failure(outbox_event, error, now, "persisted")
+        expanded = inserted
+
+    rows: List[Dict[str, Any]] = []
+    deliveries: List[Delivery] = []
+    for outbox_event, event_rows, event_deliveries in expanded:
+        outbox_event.dispatched_at = now
+        rows.extend(event_rows)
+        deliveries.extend(event_deliveries)
+    db.commit()
+    unread_count_cache.incr(row["user_id"] for row in rows)
+    return deliveries
+
+
+def purge_dispatched(
+    db: Session,
+    retention_days: int = RETENTION_DAYS,
+    batch_size: int = PURGE_BATCH_SIZE,
+    now: Optional[datetime] = None,
+) -> int:
+    """Delete rows dispatched (or abandoned) more than *retention_days* ago, one batch per commit."""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    total = 0
+    while True:
+        expired = (
+            select(models.OutboxEvent.id)
+            .where(models.OutboxEvent.dispatched_at < cutoff)
+            .limit(batch_size)
+        )
+        deleted = db.execute(
+            delete(models.OutboxEvent)
+            .where(models.OutboxEvent.id.in_(expired))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            break
+    if total:
+        logger.info("Purged %d dispatched outbox events", total)
+    return total
+
+
+async def deliver(deliveries: Iterable[Delivery]) -> None:
+    """Send claimed messages; a dead socket never fails the batch."""
+    for kind, target, message in deliveries:
+        try:
+            if kind == PERSONAL:
+                await manager.send_personal_message(message, target)
+            elif kind == TRIP:
+                await manager.broadcast_to_trip(target, message)
+            elif kind == DRIVERS:
+                await manager.send_to_drivers(message, exclude_user_id=target)
+        except Exception as exc:
+            NOTIFICATION_DISPATCH_FAILURES.inc("dispatch")
+            logger.warning("Outbox delivery (%s) failed: %s", kind, exc)
+
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        session_scope: Callable[[], ContextManager[Session]],
+        batch_size: int = BATCH_SIZE,
+        poll_interval: float = POLL_INTERVAL,
+    ):
+        self.session_scope = session_scope
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="outbox-dispatcher")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # Deliver whatever committed while shutting down
+        await self.drain()
+
+    def wake(self):
+        """Thread-safe: schedule a drain as soon as the loop is free."""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _claim(self) -> List[Delivery]:
+        with self.session_scope() as db:
+            return claim_batch(db, self.batch_size)
+
+    async def drain(self) -> int:
+        """Claim and deliver batches until the outbox is empty; returns messages sent."""
+        sent = 0
+        while True:
+            try:
+                deliveries = await to_thread.run_sync(self._claim)
+            except Exception as exc:
+                NOTIFICATION_DISPATCH_FAILURES.inc("persist")
+                logger.error("Outbox batch failed: %s", exc)
+                return sent
+            if not deliveries:
+                return sent
+            await deliver(deliveries)
+            sent += len(deliveries)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.drain()
+
+
+_dispatcher: Optional[OutboxDispatcher] = None
+
+
+def current_dispatcher() -> Optional[OutboxDispatcher]:
+    return _dispatcher
+
+
+async def start_dispatcher(session_scope: Callable[[], ContextManager[Session]] = SessionLocal) -> OutboxDispatcher:
+    """Start the process-wide dispatcher; it opens its own sessions."""
+    global _dispatcher
+    if _dispatcher is not None:
+        await _dispatcher.stop()
+    _dispatcher = OutboxDispatcher(session_scope)
+    await _dispatcher.start()
+    return _dispatcher
+
+
+async def stop_dispatcher():
+    global _dispatcher
+    dispatcher, _dispatcher = _dispatcher, None
+    if dispatcher is not None:
+        await dispatcher.stop()
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_after_commit(session: Session):
+    if session.info.pop(_PENDING_FLAG, False) and _dispatcher is not None:
+        _dispatcher.wake()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _clear_after_rollback(session: Session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_FLAG, None)
@@ -0,0 +1,200 @@
+"""
+query_stats – per-request SQL statement accounting and N+1 detection.
+
+SQLAlchemy cursor events on every ``Engine`` feed a ``QueryStats`` object
+held in a contextvar for the current request (or any block wrapped in
+``track_queries()``).  ``QueryStatsMiddleware`` opens one per HTTP request
+and, when it finishes:
+
+* adds ``X-DB-Query-Count`` / ``X-DB-Time-Ms`` / ``X-DB-Max-Repeats``
+  response headers in development (or with ``DB_QUERY_HEADERS=1``),
+* folds the numbers into per-route totals (``route_query_snapshot()``),
+  which the metrics endpoint exports in production, and
+* logs a warning for every statement fingerprint that ran more than
+  ``DB_REPEATED_STATEMENT_WARN`` times – the signature of an N+1 loop.
+
+Outside a tracked block the listeners only pay for a contextvar lookup.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+REPEATED_STATEMENT_WARN = int(os.getenv("DB_REPEATED_STATEMENT_WARN", "10"))
+EXPOSE_HEADERS = os.getenv(
+    "DB_QUERY_HEADERS", "1" if os.getenv("APP_ENV") == "development" else "0"
+) == "1"
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Time-Ms"
+MAX_REPEATS_HEADER = "X-DB-Max-Repeats"
+RESPONSE_HEADERS = [QUERY_COUNT_HEADER, QUERY_TIME_HEADER, MAX_REPEATS_HEADER]
+
+_IN_LIST = re.compile(r"\bIN\s*\((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Normalise a SQL statement so the same query shape maps to one key."""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _IN_LIST.sub("IN (...)", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+class QueryStats:
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.duration += elapsed
+        self.statements[statement] += 1
+
+    def fingerprints(self) -> Counter:
+        counts: Counter = Counter()
+        for statement, n in self.statements.items():
+            counts[fingerprint(statement)] += n
+        return counts
+
+    def repeated(self, threshold: int = REPEATED_STATEMENT_WARN) -> List[Tuple[str, int]]:
+        return [(fp, n) for fp, n in self.fingerprints().most_common() if n > threshold]
+
+    @property
+    def max_repeats(self) -> int:
+        counts = self.fingerprints()
+        return max(counts.values()) if counts else 0
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries():
+    """Collect statements issued inside the block (WebSocket handlers, jobs, tests)."""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_stats_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_stats_start")
+    elapsed = time.perf_counter() - starts.pop() if starts else 0.0
+    stats.record(statement, elapsed)
+
+
+_installed = False
+
+
+def install():
+    """Attach the cursor listeners to every Engine (idempotent)."""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _installed = True
+
+
+# Per-route totals: (method, route) -> [requests, statements, db_seconds, n_plus_one_warnings]
+_route_totals: Dict[Tuple[str, str], List[float]] = {}
+_route_lock = threading.Lock()
+
+
+def record_route(method: str, route: str, stats: QueryStats, warnings: int = 0):
+    with _route_lock:
+        totals = _route_totals.setdefault((method, route), [0, 0, 0.0, 0])
+        totals[0] += 1
+        totals[1] += stats.count
+        totals[2] += stats.duration
+        totals[3] += warnings
+
+
+def route_query_snapshot() -> Dict[Tuple[str, str], dict]:
+    with _route_lock:
+        return {
+            key: {"requests": int(t[0]), "statements": int(t[1]), "db_seconds": t[2], "n_plus_one_warnings": int(t[3])}
+            for key, t in _route_totals.items()
+        }
+
+
+def route_template(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware: one QueryStats per HTTP request."""
+
+    def __init__(self, app, expose_headers: Optional[bool] = None, warn_threshold: Optional[int] = None):
+        self.app = app
+        self.expose_headers = EXPOSE_HEADERS if expose_headers is None else expose_headers
+        self.warn_threshold = REPEATED_STATEMENT_WARN if warn_threshold is None else warn_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers[QUERY_COUNT_HEADER] = str(stats.count)
+                headers[QUERY_TIME_HEADER] = f"{stats.duration * 1000:.2f}"
+                headers[MAX_REPEATS_HEADER] = str(stats.max_repeats)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers if self.expose_headers else send)
+        finally:
+            _current_stats.reset(token)
+            self._finish(scope, stats)
+
+    def _finish(self, scope, stats: QueryStats):
+        method, route = scope["method"], route_template(scope)
+        repeated = stats.repeated(self.warn_threshold) if stats.count > self.warn_threshold else []
+        for statement, n in repeated:
+            logger.warning(
+                "Possible N+1: %s %s ran one statement %d times (%d total, %.1f ms): %.300s",
+                method, route, n, stats.count, stats.duration * 1000, statement,
+            )
+        record_route(method, route, stats, len(repeated))
@@ -0,0 +1,273 @@
+"""
+read_replicas – send read-only endpoints to database replicas.
+
+``DATABASE_REPLICA_URLS`` (comma separated) lists the replicas.  Read-only
+routes depend on ``get_read_db`` instead of ``get_db``.  It hands out a
+session on the next healthy replica, round-robin, so the primary's CPU is
+left for bids, seats and settlement.  The route gets the primary session
+instead when any of these is true:
+
+* no replicas are configured (the default, and the test suite);
+* every replica is marked down;
+* the chosen replica refuses a connection (that replica is then marked
+  down until the next health check);
+* the caller made a write in the last ``READ_YOUR_WRITES_SECONDS``.  This
+  is read-your-writes: someone who just joined a ride must not get a
+  replica that has not replayed the join yet.  ``ReadYourWritesMiddleware``
+  records the writes.
+
+``ReplicaMonitor`` is started from ``main.lifespan`` when replicas are
+configured.  Every ``REPLICA_HEALTH_INTERVAL_SECONDS`` it runs ``SELECT 1``
+on each replica.  On PostgreSQL it also reads the replay lag and takes a
+replica out of rotation while it is more than ``REPLICA_MAX_LAG_SECONDS``
+behind.
+
+Write pins live in process memory, so with several workers a pin only
+covers requests that reach the same worker.  Sticky sessions or a shared
+store (Redis) are needed for multi-worker deployments.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+from anyio import to_thread
+from fastapi import Depends, Request
+from jose import JWTError, jwt
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from database import engine_options, get_db
+from utils.metrics import READ_ROUTING
+
+logger = logging.getLogger(__name__)
+
+REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+HEALTH_INTERVAL = float(os.getenv("REPLICA_HEALTH_INTERVAL_SECONDS", "10"))
+MAX_LAG = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+PIN_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+PIN_CAPACITY = 50_000
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+_PG_REPLAY_LAG = text(
+    "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+)
+
+
+class Replica:
+    def __init__(self, url: str, engine: Optional[Engine] = None):
+        self.engine = engine if engine is not None else create_engine(url, **engine_options(url))
+        self.name = self.engine.url.render_as_string(hide_password=True)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.healthy = True
+
+    def check(self, max_lag: float = MAX_LAG) -> bool:
+        """Ping the replica (and its replay lag on PostgreSQL); updates ``healthy``."""
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                lag = conn.execute(_PG_REPLAY_LAG).scalar() if self.engine.dialect.name == "postgresql" else 0
+        except Exception as exc:
+            self.mark_down(exc)
+            return False
+        if lag > max_lag:
+            if self.healthy:
+                logger.warning("Replica %s is %.1fs behind; reading from the others", self.name, lag)
+            self.healthy = False
+            return False
+        if not self.healthy:
+            logger.info("Replica %s is back in rotation", self.name)
+        self.healthy = True
+        return True
+
+    def mark_down(self, exc: Exception):
+        if self.healthy:
+            logger.warning("Replica %s is unavailable: %s", self.name, exc)
+        self.healthy = False
+
+
+class ReplicaPool:
+    """Round-robin over the replicas currently marked healthy."""
+
+    def __init__(self, replicas: Iterable[Replica] = ()):
+        self.replicas: List[Replica] = list(replicas)
+        self._turn = itertools.count()
+
+    def choose(self) -> Optional[Replica]:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._turn) % len(healthy)]
+
+    def check_all(self) -> int:
+        """Health-check every replica; returns how many are in rotation."""
+        return sum(replica.check() for replica in self.replicas)
+
+
+class WritePins:
+    """Users who wrote recently, kept on the primary until their pin lapses."""
+
+    def __init__(self, seconds: float = PIN_SECONDS, capacity: int = PIN_CAPACITY):
+        self.seconds = seconds
+        self.capacity = capacity
+        self._until: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def pin(self, user_key: str, now: Optional[float] = None):
+        if self.seconds <= 0:
+            return
+        until = (now if now is not None else time.monotonic()) + self.seconds
+        with self._lock:
+            self._until[user_key] = until
+            self._until.move_to_end(user_key)
+            while len(self._until) > self.capacity:
+                self._until.popitem(last=False)
+
+    def is_pinned(self, user_key: str, now: Optional[float] = None) -> bool:
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            until = self._until.get(user_key)
+            if until is None:
+                return False
+            if until <= now:
+                del self._until[user_key]
+                return False
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._until.clear()
+
+
+pool = ReplicaPool(Replica(url) for url in REPLICA_URLS)
+pins = WritePins()
+
+
+def request_user_key(request: Request) -> Optional[str]:
+    """The bearer token's ``sub``, used only to pick a database, never to authorize."""
+    header = request.headers.get("authorization", "")
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.get_unverified_claims(token).get("sub")
+    except JWTError:
+        return None
+
+
+class ReadYourWritesMiddleware:
+    """Pure ASGI middleware pinning the caller to the primary after a successful write.
+
+    The pin is taken when the response starts, before the client can send
+    its next read.  ``main`` only installs it when replicas are configured.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_and_pin(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                user_key = request_user_key(Request(scope))
+                if user_key:
+                    pins.pin(user_key)
+            await send(message)
+
+        await self.app(scope, receive, send_and_pin)
+
+
+def get_read_db(request: Request, primary: Session = Depends(get_db)):
+    """Session for read-only routes: a healthy replica, else the primary."""
+    if not pool.replicas:
+        yield primary
+        return
+    user_key = request_user_key(request)
+    if user_key and pins.is_pinned(user_key):
+        READ_ROUTING.inc(("pinned",))
+        yield primary
+        return
+    replica = pool.choose()
+    if replica is None:
+        READ_ROUTING.inc(("fallback",))
+        yield primary
+        return
+
+    db = replica.SessionLocal()
+    try:
+        # Connect now so a dead replica falls back before the route runs
+        db.connection()
+    except Exception as exc:
+        db.close()
+        replica.mark_down(exc)
+        READ_ROUTING.inc(("fallback",))
+        yield primary
+        return
+    READ_ROUTING.inc(("replica",))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+class ReplicaMonitor:
+    """Background task: health-check the replicas every ``REPLICA_HEALTH_INTERVAL_SECONDS``."""
+
+    def __init__(self, replica_pool: ReplicaPool, interval: float = HEALTH_INTERVAL):
+        self.pool = replica_pool
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run(), name="replica-monitor")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await to_thread.run_sync(self.pool.check_all)
+            except Exception as exc:
+                logger.error("Replica health check failed: %s", exc)
+            await asyncio.sleep(self.interval)
+
+
+_monitor: Optional[ReplicaMonitor] = None
+
+
+async def start_monitor() -> Optional[ReplicaMonitor]:
+    global _monitor
+    if _monitor is not None:
+        await _monitor.stop()
+        _monitor = None
+    if not pool.replicas:
+        return None
+    _monitor = ReplicaMonitor(pool)
+    await _monitor.start()
+    return _monitor
+
+
+async def stop_monitor():
+    global _monitor
+    monitor, _monitor = _monitor, None
+    if monitor is not None:
+        await monitor.stop()
@@ -0,0 +1,191 @@
+"""
+unread_counts – cached per-user unread notification counters.
+
+``GET /notifications/unread-count`` reads the counter for the caller; a hit
+is a single dict lookup.  A miss runs one ``COUNT(*)`` served by the partial
+index ``ix_notifications_unread_user`` (``user_id WHERE is_read = false``)
+and caches the result.
+
+Writers adjust counters *after* their commit:
+
+* notification inserts (single, bulk, outbox) call ``incr``,
+* ``mark_as_read`` calls ``decr``, ``mark_all_as_read`` and
+  ``clear_notifications`` call ``reset``.
+
+Counters for users that are not cached are left alone, so the first read
+always starts from the database.  The cache is per process; like the rate
+limiter it should move to a shared store (Redis) for multi-worker
+deployments.  ``UnreadCountReconciler`` re-counts every cached user every
+``UNREAD_RECONCILE_SECONDS`` to correct drift (other workers, retention
+purges, rolled-back writers).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, ContextManager, Dict, Iterable, Optional
+
+from anyio import to_thread
+from sqlalchemy import false, func, select
+from sqlalchemy.orm import Session
+
+import models
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRIES = int(os.getenv("UNREAD_COUNT_CACHE_SIZE", "100000"))
+RECONCILE_INTERVAL = int(os.getenv("UNREAD_RECONCILE_SECONDS", "300"))
+RECONCILE_CHUNK = 1000
+
+
+class UnreadCountCache:
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: Any) -> Optional[int]:
+        return self._counts.get(str(user_id))
+
+    def set(self, user_id: Any, count: int):
+        key = str(user_id)
+        with self._lock:
+            self._counts[key] = max(0, count)
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+
+    def incr(self, user_ids: Iterable[Any], amount: int = 1):
+        with self._lock:
+            for user_id in user_ids:
+                key = str(user_id)
+                if key in self._counts:
+                    self._counts[key] += amount
+
+    def decr(self, user_id: Any, amount: int = 1):
+        key = str(user_id)
+        with self._lock:
+            if key in self._counts:
+                self._counts[key] = max(0, self._counts[key] - amount)
+
+    def reset(self, user_id: Any):
+        self.set(user_id, 0)
+
+    def invalidate(self, user_ids: Optional[Iterable[Any]] = None):
+        with self._lock:
+            if user_ids is None:
+                self._counts.clear()
+                return
+            for user_id in user_ids:
+                self._counts.pop(str(user_id), None)
+
+    def cached_user_ids(self):
+        with self._lock:
+            return list(self._counts)
+
+    def clear(self):
+        self.invalidate()
+
+
+cache = UnreadCountCache()
+
+
+def count_unread(db: Session, user_id) -> int:
+    """Unread count from the database (index-only on the partial index)."""
+    return db.scalar(
+        select(func.count())
+        .select_from(models.Notification)
+        .where(models.Notification.user_id == user_id, models.Notification.is_read == false())
+    ) or 0
+
+
+def get_unread_count(db: Session, user_id) -> int:
+    cached = cache.get(user_id)
+    if cached is not None:
+        return cached
+    count = count_unread(db, user_id)
+    cache.set(user_id, count)
+    return count
+
+
+def reconcile(db: Session) -> int:
+    """Re-count every cached user with one grouped query per chunk; returns corrections."""
+    user_ids = cache.cached_user_ids()
+    corrected = 0
+    for start in range(0, len(user_ids), RECONCILE_CHUNK):
+        chunk = user_ids[start:start + RECONCILE_CHUNK]
+        actual: Dict[str, int] = {
+            str(user_id): count
+            for user_id, count in db.execute(
+                select(models.Notification.user_id, func.count())
+                .where(
+                    models.Notification.user_id.in_([uuid.UUID(u) for u in chunk]),
+                    models.Notification.is_read == false(),
+                )
+                .group_by(models.Notification.user_id)
+            )
+        }
+        for user_id in chunk:
+            expected = actual.get(user_id, 0)
+            if cache.get(user_id) not in (None, expected):
+                corrected += 1
+                cache.set(user_id, expected)
+    if corrected:
+        logger.info("Reconciled %d drifted unread counters", corrected)
+    return corrected
+
+
+class UnreadCountReconciler:
+    def __init__(self, session_scope: Callable[[], ContextManager[Session]], interval: float = RECONCILE_INTERVAL):
+        self.session_scope = session_scope
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run(), name="unread-count-reconciler")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _reconcile(self) -> int:
+        with self.session_scope() as db:
+            return reconcile(db)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await to_thread.run_sync(self._reconcile)
+            except Exception as exc:
+                logger.error("Unread count reconcile failed: %s", exc)
+
+
+_reconciler: Optional[UnreadCountReconciler] = None
+
+
+async def start_reconciler(session_scope: Callable[[], ContextManager[Session]] = SessionLocal) -> UnreadCountReconciler:
+    global _reconciler
+    if _reconciler is not None:
+        await _reconciler.stop()
+    _reconciler = UnreadCountReconciler(session_scope)
+    await _reconciler.start()
+    return _reconciler
+
+
+async def stop_reconciler():
+    global _reconciler
+    reconciler, _reconciler = _reconciler, None
+    if reconciler is not None:
+        await reconciler.stop()
@@ -1,5 +1,14 @@
-from typing import Dict, Set
+import time
+from typing import Collection, Dict, List, Set, Union
 from fastapi import WebSocket
+from utils.json_codec import dumps
+from utils.metrics import WEBSOCKET_FANOUT_DURATION, WEBSOCKET_FANOUT_RECIPIENTS
+
+
+def _encode(message: Union[dict, str]) -> str:
+    """Encode a message once so fanout sends the same text frame to every socket."""
+    return message if isinstance(message, str) else dumps(message)
+
 
 class ConnectionManager:
     def __init__(self):
@@ -7,6 +16,8 @@ class ConnectionManager:
         self.active_connections: Dict[str, Set[WebSocket]] = {}
         # Map of trip_id -> websocket connections
         self.trip_connections: Dict[str, Set[WebSocket]] = {}
+        # Map of channel name -> subscribed websocket connections (live feeds)
+        self.channel_subscribers: Dict[str, Set[WebSocket]] = {}
     
     async def connect(self, websocket: WebSocket, user_id: str):
         await websocket.accept()
@@ -26,6 +37,10 @@ class ConnectionManager:
                 self.trip_connections[trip_id].discard(websocket)
                 if not self.trip_connections[trip_id]:
                     del self.trip_connections[trip_id]
+
+        # And from any live feed channels
+        for channel in list(self.channel_subscribers.keys()):
+            self.unsubscribe(websocket, channel)
     
     async def join_trip(self, websocket: WebSocket, trip_id: str):
         """Join a specific trip room for broadcasting updates"""
@@ -33,35 +48,82 @@ class ConnectionManager:
             self.trip_connections[trip_id] = set()
         self.trip_connections[trip_id].add(websocket)
     
-    async def send_personal_message(self, message: dict, user_id: str):
+    def subscribe(self, websocket: WebSocket, channel: str):
+        """Subscribe a connection to a named live feed channel"""
+        if channel not in self.channel_subscribers:
+            self.channel_subscribers[channel] = set()
+        self.channel_subscribers[channel].add(websocket)
+
+    def unsubscribe(self, websocket: WebSocket, channel: str):
+        if channel in self.channel_subscribers:
+            self.channel_subscribers[channel].discard(websocket)
+            if not self.channel_subscribers[channel]:
+                del self.channel_subscribers[channel]
+
+    def is_subscribed(self, websocket: WebSocket, channel: str) -> bool:
+        return websocket in self.channel_subscribers.get(channel, ())
+
+    async def _fanout(self, kind: str, connections: List[WebSocket], message: Union[dict, str]):
+        started = time.perf_counter()
+        text = _encode(message)
+        for connection in connections:
+            try:
+                await connection.send_text(text)
+            except:
+                pass
+        WEBSOCKET_FANOUT_DURATION.observe(time.perf_counter() - started, kind)
+        WEBSOCKET_FANOUT_RECIPIENTS.inc(kind, amount=len(connections))
+
+    async def send_personal_message(self, message: Union[dict, str], user_id: str):
         """Send message to a specific user (all their connections)"""
         if user_id in self.active_connections:
-            for connection in self.active_connections[user_id]:
+            await self._fanout("personal", list(self.active_connections[user_id]), message)
+    
+    async def send_personal_messages(self, messages: Dict[str, Union[dict, str]]):
+        """Send a different message to each of many users in one pass.
+
+        Offline users are skipped before encoding, so a broadcast to thousands
+        of recipients only serialises frames for those actually connected.
+        """
+        started = time.perf_counter()
+        sent = 0
+        for user_id, message in messages.items():
+            connections = self.active_connections.get(user_id)
+            if not connections:
+                continue
+            text = _encode(message)
+            for connection in list(connections):
                 try:
-                    await connection.send_json(message)
+                    await connection.send_text(text)
                 except:
                     pass
-    
-    async def broadcast_to_trip(self, trip_id: str, message: dict):
+                sent += 1
+        WEBSOCKET_FANOUT_DURATION.observe(time.perf_counter() - started, "bulk")
+        WEBSOCKET_FANOUT_RECIPIENTS.inc("bulk", amount=sent)
+
+    async def broadcast_to_trip(self, trip_id: str, message: Union[dict, str]):
         """Send message to all participants in a trip"""
         if trip_id in self.trip_connections:
-            for connection in self.trip_connections[trip_id]:
-                try:
-                    await connection.send_json(message)
-                except:
-                    pass
+            await self._fanout("trip", list(self.trip_connections[trip_id]), message)
+
+    async def broadcast_to_channel(self, channel: str, message: Union[dict, str], exclude: Collection[WebSocket] = ()):
+        """Send message to every connection subscribed to a live feed channel (except *exclude*)"""
+        subscribers = [ws for ws in self.channel_subscribers.get(channel, ()) if ws not in exclude]
+        if not subscribers:
+            return
+        await self._fanout("channel", subscribers, message)
 
-    async def send_to_drivers(self, message: dict, exclude_user_id: str = None):
+    async def send_to_drivers(self, message: Union[dict, str], exclude_user_id: str = None):
         """Broadcast message to all connected drivers (for new ride requests)"""
         # Note: This logic depends on knowing which user_id belongs to a driver.
         # Currently we don't store role in the manager, but websocket_router uses this.
         # We can implement a more robust role-based broadcast if needed.
-        for user_id, connections in self.active_connections.items():
-            if user_id != exclude_user_id:
-                for connection in connections:
-                    try:
-                        await connection.send_json(message)
-                    except:
-                        pass
+        connections = [
+            connection
+            for user_id, user_connections in list(self.active_connections.items())
+            if user_id != exclude_user_id
+            for connection in list(user_connections)
+        ]
+        await self._fanout("drivers", connections, message)
 
 manager = ConnectionManager()